@@ -1,34 +1,312 @@
+import random
+import time
+from .bitboard import CELLS, FULL, LINES_THROUGH, SIZE, empty_cells, from_board, has_won, won_by_move
+from .evaluation import LineThreats
+
+WIN_SCORE = 1000
+
+# Scores beyond this are forced wins; the remainder encodes the distance
+WIN_THRESHOLD = WIN_SCORE - CELLS - 1
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+DEFAULT_TABLE_SIZE = 1 << 18
+
+# Nodes searched between deadline checks
+CHECK_INTERVAL = 1024
+
+# Zobrist keys: one random 64-bit number per (player, cell), plus the side to move
+_keys = random.Random(5)
+ZOBRIST = tuple(tuple(_keys.getrandbits(64) for _ in range(CELLS)) for _ in range(2))
+SIDE_KEY = _keys.getrandbits(64)
+
+# Static move order: cells on more lines first, then closer to the centre
+MOVE_ORDER = tuple(sorted(range(CELLS), key=lambda cell: (-len(LINES_THROUGH[cell]),
+                                                          abs(cell // SIZE - SIZE // 2) + abs(cell % SIZE - SIZE // 2),
+                                                          cell)))
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out"""
+    pass
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results indexed by Zobrist key.
+    A slot is replaced when it is empty, holds the same position, was
+    written by an earlier search, or was searched no deeper than the new
+    result (depth-preferred replacement with aging).
+    """
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        """
+        :param size: Number of slots
+        """
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+
+    def new_search(self):
+        """Age every stored entry so new results may replace them"""
+        self.generation += 1
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) stored for a key, or None"""
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """Store a search result, following the replacement policy"""
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or entry[1] <= depth:
+            self.slots[index] = (key, depth, flag, score, move, self.generation)
+
+
+def find_best_move(board, time_limit=1.0, max_depth=None, table=None, stats=None, tablebase=None, heuristic=True):
+    """
+    Find the best move for the computer player ('O') using alpha-beta search
+    with iterative deepening under a time budget
+    :param board: Current game state (5x5 grid as a list)
+    :param time_limit: Seconds to search; the deepest completed iteration is used
+    :param max_depth: Optional depth limit (defaults to the number of empty cells)
+    :param table: Optional TranspositionTable to reuse between moves
+    :param stats: Optional dict, filled with depth, score, nodes and pv
+    :param tablebase: Optional Tablebase probed for exact endgame scores
+    :param heuristic: Score the leaves by open lines instead of as draws
+    :return: Best move index (0-24), or None if the board is full
+    """
+    o, x = from_board(board, 'O'), from_board(board, 'X')
+    search = AlphaBetaSearch(table, tablebase, heuristic)
+    move, _ = search.run(o, x, 0, time_limit, max_depth)
+    if stats is not None:
+        stats.update(search.stats)
+    return move
+
+
+def board_key(me, opp, side):
+    """Zobrist key of a position from the side to move's bitboards"""
+    key = SIDE_KEY if side else 0
+    for player, bits in ((side, me), (1 - side, opp)):
+        for cell in empty_cells(FULL & ~bits):
+            key ^= ZOBRIST[player][cell]
+    return key
+
+
+class AlphaBetaSearch:
+    """
+    Negamax alpha-beta over bitboards. `me` is always the side to move and
+    `side` (0 or 1) says which player that is, for the Zobrist keys.
+    """
+
+    def __init__(self, table=None, tablebase=None, heuristic=True):
+        """
+        :param table: Optional TranspositionTable shared between searches
+        :param tablebase: Optional Tablebase, probed at the root and at depth-limited leaves it covers
+        :param heuristic: Score the leaves with LineThreats instead of as draws
+        """
+        self.table = table if table is not None else TranspositionTable()
+        self.tablebase = tablebase
+        self.heuristic = heuristic
+        # Open-line counts for the position being searched, updated on make/unmake
+        self.threats = None
+        self.killers = [[None, None] for _ in range(CELLS + 1)]
+        self.nodes = 0
+        self.deadline = None
+        self.root_move = None
+        self.stats = {}
+
+    def run(self, me, opp, side, time_limit=1.0, max_depth=None):
+        """
+        Iteratively deepen until the time budget or depth limit is reached
+        :param me: Bitboard of the side to move
+        :param opp: Bitboard of the other side
+        :param side: 0 or 1, the player to move
+        :param time_limit: Seconds to search
+        :param max_depth: Optional depth limit
+        :return: Tuple of (best move, score) from the deepest completed iteration
+        """
+        occupied = me | opp
+        moves = list(empty_cells(occupied))
+        self.stats = {'depth': 0, 'score': 0, 'nodes': 0, 'pv': []}
+        if not moves:
+            return None, 0
+
+        if self.tablebase is not None:
+            solved = self.tablebase.probe(me, opp)
+            if solved is not None:
+                score, move = solved
+                self.stats.update(depth=len(moves), score=score, pv=[move])
+                return move, score
+
+        self.table.new_search()
+        key = board_key(me, opp, side)
+        max_depth = min(max_depth or len(moves), len(moves))
+        start = time.perf_counter()
+        best_move, best_score = self.ordered_moves(occupied, None, 0)[0], 0
+
+        for depth in range(1, max_depth + 1):
+            # The first iteration always completes, so there is always a move
+            self.deadline = start + time_limit if depth > 1 else None
+            self.reset_threats(me, opp)
+            try:
+                score = self.negamax(me, opp, key, side, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except SearchTimeout:
+                break
+
+            best_move, best_score = self.root_move, score
+            self.stats.update(depth=depth, score=score, pv=self.principal_variation(me, opp, key, side, depth))
+            if abs(score) > WIN_THRESHOLD:
+                # A forced result cannot change with more depth
+                break
+
+        self.stats['nodes'] = self.nodes
+        return best_move, best_score
+
+    def negamax(self, me, opp, key, side, depth, alpha, beta, ply):
+        """
+        Score a position (no completed line) for the side to move
+        :return: Score; forced wins are WIN_SCORE minus the ply they happen at
+        """
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        occupied = me | opp
+        if occupied == FULL:
+            return 0
+
+        # A winning move ends the game, whatever the remaining depth
+        for cell in empty_cells(occupied):
+            if won_by_move(me | 1 << cell, cell):
+                if ply == 0:
+                    self.root_move = cell
+                return WIN_SCORE - ply - 1
+
+        if depth == 0:
+            # Searching a covered subtree is cheap, so the tablebase only replaces leaf guesses
+            if self.tablebase is not None and CELLS - bin(occupied).count('1') <= self.tablebase.max_empties:
+                solved = self.probe_tablebase(me, opp, key)
+                if solved is not None:
+                    return _from_table(solved[0], ply)
+            return self.evaluate(me, opp)
+
+        original_alpha = alpha
+        table_move = None
+        entry = self.table.probe(key)
+        if entry is not None:
+            entry_depth, flag, score, table_move = entry
+            if entry_depth >= depth and ply > 0:
+                score = _from_table(score, ply)
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        best_score, best_move = -WIN_SCORE - 1, None
+        threats = self.threats
+        for cell in self.ordered_moves(occupied, table_move, ply):
+            if threats is not None:
+                threats.make(cell)
+            score = -self.negamax(opp, me | 1 << cell, key ^ ZOBRIST[side][cell] ^ SIDE_KEY, 1 - side,
+                                  depth - 1, -beta, -alpha, ply + 1)
+            if threats is not None:
+                threats.unmake(cell)
+            if score > best_score:
+                best_score, best_move = score, cell
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    # Quiet moves that refute a line are tried early at the same ply
+                    killers = self.killers[ply]
+                    if cell != killers[0]:
+                        killers[1], killers[0] = killers[0], cell
+                    break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, _to_table(best_score, ply), best_move)
+        if ply == 0:
+            self.root_move = best_move
+        return best_score
+
+    def probe_tablebase(self, me, opp, key):
+        """
+        Exact (score, move) for a position the tablebase covers, or None
+        Hits are kept in the transposition table at full depth, which is
+        cheaper to look up than the tablebase on later iterations.
+        """
+        entry = self.table.probe(key)
+        if entry is not None and entry[0] == CELLS and entry[1] == EXACT:
+            return entry[2:]
+        solved = self.tablebase.probe(me, opp)
+        if solved is not None:
+            self.table.store(key, CELLS, EXACT, solved[0], solved[1])
+        return solved
+
+    def reset_threats(self, me, opp):
+        """Count open lines afresh for a new search root (a timed-out search leaves them stale)"""
+        self.threats = LineThreats(me, opp) if self.heuristic else None
+
+    def evaluate(self, me, opp):
+        """Static score of a quiet position for the side to move; always inside the win threshold"""
+        return self.threats.evaluate() if self.threats is not None else 0
+
+    def ordered_moves(self, occupied, table_move, ply):
+        """Empty cells: the table (principal variation) move, then killers, then static order"""
+        moves = [cell for cell in MOVE_ORDER if not occupied >> cell & 1]
+        for cell in self.killers[ply][::-1] + [table_move]:
+            if cell is not None and not occupied >> cell & 1:
+                moves.remove(cell)
+                moves.insert(0, cell)
+        return moves
+
+    def principal_variation(self, me, opp, key, side, depth):
+        """Follow the stored best moves from the root"""
+        pv = []
+        while len(pv) < depth:
+            entry = self.table.probe(key)
+            if entry is None or entry[3] is None or (me | opp) >> entry[3] & 1:
+                break
+            cell = entry[3]
+            pv.append(cell)
+            if won_by_move(me | 1 << cell, cell):
+                break
+            me, opp = opp, me | 1 << cell
+            key ^= ZOBRIST[side][cell] ^ SIDE_KEY
+            side = 1 - side
+        return pv
+
+
+def _to_table(score, ply):
+    """Make win scores relative to the stored position"""
+    if score > WIN_THRESHOLD:
+        return score + ply
+    if score < -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply):
+    """Turn a stored win score back into one relative to the root"""
+    if score > WIN_THRESHOLD:
+        return score - ply
+    if score < -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
 def check_win(board, player):
     """Check if the given player has won by getting 5 in a row"""
-    # Check rows
-    for row in range(5):
-        for col in range(1):
-            if (board[row*5 + col] == player and 
-                board[row*5 + col+1] == player and 
-                board[row*5 + col+2] == player and 
-                board[row*5 + col+3] == player and 
-                board[row*5 + col+4] == player):
-                return True
-    
-    # Check columns
-    for col in range(5):
-        for row in range(1):
-            if (board[row*5 + col] == player and 
-                board[(row+1)*5 + col] == player and 
-                board[(row+2)*5 + col] == player and 
-                board[(row+3)*5 + col] == player and 
-                board[(row+4)*5 + col] == player):
-                return True
-    
-    # Check diagonals
-    # Top-left to bottom-right
-    if (board[0] == player and board[6] == player and 
-        board[12] == player and board[18] == player and board[24] == player):
-        return True
-    
-    # Top-right to bottom-left
-    if (board[4] == player and board[8] == player and 
-        board[12] == player and board[16] == player and board[20] == player):
-        return True
-    
-    return False
\ No newline at end of file
+    return has_won(from_board(board, player))
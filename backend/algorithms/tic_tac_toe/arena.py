@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from . import alphabeta, mcts, minimax
+from .bitboard import CELLS, FULL, canonical, from_board, has_won, to_board, won_by_move
+
+try:
+    import resource
+except ImportError:
+    # Peak memory is only reported where getrusage exists
+    resource = None
+
+# Stones placed at random before the engines take over
+DEFAULT_PLIES = 2
+
+# Search budget per move, in seconds
+DEFAULT_TIME_LIMIT = 0.1
+
+
+def _minimax_move(board, time_limit, stats):
+    # Minimax cannot stop mid-search, so it deepens only while the next depth,
+    # roughly one empty cell's worth of branching bigger, should still fit the budget
+    start = time.perf_counter()
+    empties = board.count('')
+    stats['nodes'] = 0
+    depth = 0
+    while True:
+        iteration_start = time.perf_counter()
+        iteration = {}
+        move = minimax.find_best_move(board, depth, stats=iteration)
+        stats['nodes'] += iteration['nodes']
+        now = time.perf_counter()
+        depth += 1
+        if depth >= empties or now - start + (now - iteration_start) * (empties - depth) > time_limit:
+            return move
+
+
+def _alphabeta_move(board, time_limit, stats):
+    return alphabeta.find_best_move(board, time_limit=time_limit, stats=stats)
+
+
+def _mcts_move(board, time_limit, stats):
+    move = mcts.find_best_move(board, time_limit=time_limit, stats=stats)
+    # A playout is the unit of work MCTS reports
+    stats['nodes'] = stats['playouts']
+    return move
+
+
+# Engines the arena can play: name -> function(board, time_limit, stats) choosing the move
+# for 'O' within the time limit and filling stats['nodes']
+ARENA_ENGINES = {
+    'minimax': _minimax_move,
+    'alphabeta': _alphabeta_move,
+    'mcts': _mcts_move,
+}
+
+
+def openings(count, plies=DEFAULT_PLIES, seed=0):
+    """
+    Distinct random openings, the same for every run with the same seed
+    :param count: Number of openings
+    :param plies: Stones on the board, placed alternately starting with 'X'
+    :param seed: Random seed
+    :return: List of boards (25-element lists)
+    """
+    rng = random.Random(seed)
+    seen, boards = set(), []
+    for _ in range(count * 100):
+        if len(boards) == count:
+            break
+        x = o = 0
+        for ply, cell in enumerate(rng.sample(range(CELLS), plies)):
+            if ply % 2 == 0:
+                x |= 1 << cell
+            else:
+                o |= 1 << cell
+        form = canonical(x, o)[:2]
+        if form not in seen and not has_won(x) and not has_won(o):
+            seen.add(form)
+            boards.append(to_board(x, o))
+    return boards
+
+
+def _peak_memory_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def play_game(task):
+    """
+    Play one game from an opening
+    :param task: Tuple of (opening board, engine playing 'X', engine playing 'O', time limit)
+    :return: Dictionary with the engines, winner ('X', 'O' or None), per-move records and peak memory
+    """
+    board, x_engine, o_engine, time_limit = task
+    board = list(board)
+    turn = 'X' if board.count('X') == board.count('O') else 'O'
+    moves = []
+    winner = None
+    while winner is None and from_board(board, 'X') | from_board(board, 'O') != FULL:
+        engine = x_engine if turn == 'X' else o_engine
+        # Engines play 'O', so 'X' sees the board with the colours swapped
+        view = board if turn == 'O' else ['O' if cell == 'X' else 'X' if cell == 'O' else '' for cell in board]
+        stats = {}
+        start = time.perf_counter()
+        move = ARENA_ENGINES[engine](view, time_limit, stats)
+        latency = time.perf_counter() - start
+        moves.append({'engine': engine, 'latency': latency, 'nodes': stats.get('nodes', 0)})
+
+        board[move] = turn
+        if won_by_move(from_board(board, turn), move):
+            winner = turn
+        turn = 'O' if turn == 'X' else 'X'
+
+    return {'x': x_engine, 'o': o_engine, 'winner': winner, 'moves': moves, 'peak_memory_kb': _peak_memory_kb()}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_arena(engines, games=10, plies=DEFAULT_PLIES, time_limit=DEFAULT_TIME_LIMIT, workers=1, seed=0):
+    """
+    Play two engines against each other, each opening once with either engine as 'X'
+    :param engines: Pair of names from ARENA_ENGINES
+    :param games: Number of openings (twice as many games are played)
+    :param plies: Stones in each opening
+    :param time_limit: Seconds per move for every engine
+    :param workers: Number of processes to play games in
+    :param seed: Seed for the openings
+    :return: JSON-serialisable report with win/draw/loss counts, nodes per second,
+             move latency percentiles and peak memory
+    """
+    for engine in engines:
+        if engine not in ARENA_ENGINES:
+            raise ValueError(f"engine must be one of: {', '.join(ARENA_ENGINES)}")
+    first, second = engines
+    if first == second:
+        raise ValueError("The two engines must differ")
+    tasks = [(board, x_engine, o_engine, time_limit)
+             for board in openings(games, plies, seed)
+             for x_engine, o_engine in ((first, second), (second, first))]
+
+    start = time.perf_counter()
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(play_game, tasks)
+    else:
+        results = [play_game(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'engines': list(engines),
+        'games': len(results),
+        'plies': plies,
+        'time_limit': time_limit,
+        'seed': seed,
+        'workers': workers,
+        'elapsed': elapsed,
+        'results': {},
+        'peak_memory_kb': max([_peak_memory_kb() or 0] + [result['peak_memory_kb'] or 0 for result in results]) or None
+    }
+    for engine in engines:
+        wins = sum(result['winner'] is not None and result[result['winner'].lower()] == engine for result in results)
+        draws = sum(result['winner'] is None for result in results)
+        moves = [move for result in results for move in result['moves'] if move['engine'] == engine]
+        latencies = [move['latency'] for move in moves]
+        search_time = sum(latencies)
+        report['results'][engine] = {
+            'wins': wins,
+            'draws': draws,
+            'losses': len(results) - wins - draws,
+            'moves': len(moves),
+            'nodes': sum(move['nodes'] for move in moves),
+            'nodes_per_second': sum(move['nodes'] for move in moves) / search_time if search_time else None,
+            'latency': {
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies)
+            } if latencies else None
+        }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe engines against each other and report as JSON")
+    parser.add_argument('engines', nargs=2, choices=sorted(ARENA_ENGINES), help="The two engines to play")
+    parser.add_argument('--games', type=int, default=10, help="Openings to play, each once per colour")
+    parser.add_argument('--plies', type=int, default=DEFAULT_PLIES, help="Random stones in each opening")
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT, help="Seconds per move")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help="Processes to play games in")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the openings")
+    parser.add_argument('--output', help="File to write the report to (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_arena(args.engines, args.games, args.plies, args.time_limit, args.workers, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
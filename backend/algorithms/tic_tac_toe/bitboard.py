@@ -0,0 +1,107 @@
+SIZE = 5
+CELLS = SIZE * SIZE
+
+# Every cell occupied
+FULL = (1 << CELLS) - 1
+
+
+def _line(cells):
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+# The 12 winning lines of five: rows, columns and both diagonals
+LINES = tuple(
+    [_line(row * SIZE + col for col in range(SIZE)) for row in range(SIZE)]
+    + [_line(row * SIZE + col for row in range(SIZE)) for col in range(SIZE)]
+    + [_line(i * SIZE + i for i in range(SIZE)), _line(i * SIZE + (SIZE - 1 - i) for i in range(SIZE))]
+)
+
+# Lines through each cell, so a move only re-checks the lines it touches
+LINES_THROUGH = tuple(tuple(line for line in LINES if line >> cell & 1) for cell in range(CELLS))
+
+
+def from_board(board, player):
+    """
+    Bitboard of one player's stones
+    :param board: 25-element list of 'X', 'O' or ''
+    :param player: 'X' or 'O'
+    :return: Integer with bit i set when board[i] == player
+    """
+    bits = 0
+    for cell, value in enumerate(board):
+        if value == player:
+            bits |= 1 << cell
+    return bits
+
+
+def to_board(x, o):
+    """Convert a pair of bitboards back to the 25-element list form"""
+    return ['X' if x >> cell & 1 else 'O' if o >> cell & 1 else '' for cell in range(CELLS)]
+
+
+def has_won(bits):
+    """Check whether a player's stones complete any line"""
+    for line in LINES:
+        if bits & line == line:
+            return True
+    return False
+
+
+def won_by_move(bits, cell):
+    """Check whether the stone just placed on `cell` completed a line"""
+    for line in LINES_THROUGH[cell]:
+        if bits & line == line:
+            return True
+    return False
+
+
+def empty_cells(occupied):
+    """Yield the index of every empty cell, lowest first"""
+    free = FULL & ~occupied
+    while free:
+        low = free & -free
+        yield low.bit_length() - 1
+        free ^= low
+
+
+def _symmetry(mapping):
+    return tuple(mapping(cell // SIZE, cell % SIZE) for cell in range(CELLS))
+
+
+_LAST = SIZE - 1
+
+# The eight rotations and reflections of the board, as cell -> image cell
+SYMMETRIES = tuple(_symmetry(mapping) for mapping in (
+    lambda r, c: r * SIZE + c,
+    lambda r, c: c * SIZE + (_LAST - r),
+    lambda r, c: (_LAST - r) * SIZE + (_LAST - c),
+    lambda r, c: (_LAST - c) * SIZE + r,
+    lambda r, c: r * SIZE + (_LAST - c),
+    lambda r, c: (_LAST - r) * SIZE + c,
+    lambda r, c: c * SIZE + r,
+    lambda r, c: (_LAST - c) * SIZE + (_LAST - r),
+))
+
+# INVERSE_SYMMETRIES[k] undoes SYMMETRIES[k]
+INVERSE_SYMMETRIES = tuple(tuple(sorted(range(CELLS), key=symmetry.__getitem__)) for symmetry in SYMMETRIES)
+
+
+def transform(bits, symmetry):
+    """Apply a cell mapping (one of SYMMETRIES) to a bitboard"""
+    image = 0
+    for cell in empty_cells(FULL & ~bits):
+        image |= 1 << symmetry[cell]
+    return image
+
+
+def canonical(x, o):
+    """
+    Smallest image of a position under the eight board symmetries
+    :param x: Bitboard of 'X' stones
+    :param o: Bitboard of 'O' stones
+    :return: Tuple of (canonical x, canonical o, index into SYMMETRIES that produces it)
+    """
+    return min((transform(x, symmetry), transform(o, symmetry), k) for k, symmetry in enumerate(SYMMETRIES))
@@ -0,0 +1,76 @@
+import time
+from . import alphabeta, mcts, minimax
+from .bitboard import FULL, INVERSE_SYMMETRIES, SYMMETRIES, canonical, from_board, has_won, to_board
+
+ENGINES = ('alphabeta', 'minimax', 'mcts')
+
+# Search budget per move for the alpha-beta and MCTS engines, in seconds
+DEFAULT_TIME_LIMIT = 0.5
+
+
+def computer_move(board, algorithm='alphabeta', time_limit=DEFAULT_TIME_LIMIT, cache=None, book=None,
+                  tablebase=None, parallel=None, monte_carlo=None):
+    """
+    Choose the computer's ('O') move, sharing results between symmetric positions
+    The engine searches the canonical image of the board under the eight
+    rotations and reflections, and the move is mapped back onto the
+    board as given, so every orientation of a position hits one cache entry.
+    MCTS moves are random and depend on the tree, so they are never cached.
+    :param board: Current game state (5x5 grid as a list)
+    :param algorithm: 'alphabeta', 'minimax' or 'mcts'
+    :param time_limit: Seconds the alpha-beta or MCTS engine may search
+    :param cache: Optional cache with get(key) and put(key, value), for the deterministic engines
+    :param book: Optional OpeningBook consulted before searching (alpha-beta only)
+    :param tablebase: Optional Tablebase the engines probe for exact endgame results
+    :param parallel: Optional ParallelSearch that runs the alpha-beta engine across processes
+    :param monte_carlo: Optional MonteCarloSearch kept between moves so its tree is reused
+    :return: Dictionary with move, algorithm, time_taken, cached and source ('book', 'cache' or 'search')
+    """
+    if algorithm not in ENGINES:
+        raise ValueError(f"algorithm must be one of: {', '.join(ENGINES)}")
+
+    x, o = from_board(board, 'X'), from_board(board, 'O')
+    if has_won(x) or has_won(o):
+        raise ValueError("Game is already over")
+    if x | o == FULL:
+        raise ValueError("Board is full")
+
+    canonical_x, canonical_o, symmetry = canonical(x, o)
+    key = (algorithm, canonical_x, canonical_o)
+    if algorithm == 'mcts':
+        cache = None
+    start = time.perf_counter()
+
+    source = 'search'
+    canonical_move = None
+    if book is not None and algorithm == 'alphabeta':
+        canonical_move = book.get(canonical_x, canonical_o)
+        if canonical_move is not None:
+            source = 'book'
+    if canonical_move is None and cache is not None:
+        canonical_move = cache.get(key)
+        if canonical_move is not None:
+            source = 'cache'
+
+    if canonical_move is None:
+        canonical_board = to_board(canonical_x, canonical_o)
+        if algorithm == 'mcts':
+            # The tree follows the game as played, so search the board as given
+            search = monte_carlo if monte_carlo is not None else mcts.MonteCarloSearch()
+            canonical_move = SYMMETRIES[symmetry][search.run(o, x, time_limit)]
+        elif algorithm == 'alphabeta' and parallel is not None:
+            canonical_move, _ = parallel.run(canonical_o, canonical_x, 0, time_limit)
+        elif algorithm == 'alphabeta':
+            canonical_move = alphabeta.find_best_move(canonical_board, time_limit=time_limit, tablebase=tablebase)
+        else:
+            canonical_move = minimax.find_best_move(canonical_board, tablebase=tablebase)
+        if cache is not None:
+            cache.put(key, canonical_move)
+
+    return {
+        'move': INVERSE_SYMMETRIES[symmetry][canonical_move],
+        'algorithm': algorithm,
+        'time_taken': time.perf_counter() - start,
+        'cached': source != 'search',
+        'source': source
+    }
@@ -0,0 +1,59 @@
+from .bitboard import CELLS, LINES
+
+# Value of a line holding n of a player's stones and none of the opponent's
+LINE_WEIGHTS = (0, 1, 4, 16, 64)
+
+# Largest possible score, every line held four-deep by one side
+MAX_SCORE = len(LINES) * LINE_WEIGHTS[-1]
+
+# Indexes into LINES of the lines through each cell
+LINE_INDEXES_THROUGH = tuple(tuple(i for i, line in enumerate(LINES) if line >> cell & 1) for cell in range(CELLS))
+
+
+class LineThreats:
+    """
+    Open-line counts for both players, kept up to date as moves are made
+    and unmade. A line counts for a player while the opponent has no stone
+    on it, weighted by how many stones the player has there, so a move only
+    changes the lines through its cell. Moves that complete a line end the
+    game and are never made here.
+    """
+
+    def __init__(self, me, opp):
+        """
+        :param me: Bitboard of the side to move
+        :param opp: Bitboard of the other side
+        """
+        self.counts = [[bin(line & bits).count('1') for line in LINES] for bits in (me, opp)]
+        self.scores = [sum(LINE_WEIGHTS[own] for own, other in zip(*pair) if not other)
+                       for pair in (self.counts, self.counts[::-1])]
+        # Index into counts of the side to move
+        self.turn = 0
+
+    def make(self, cell):
+        """Place a stone for the side to move"""
+        player = self.turn
+        own, other = self.counts[player], self.counts[1 - player]
+        for i in LINE_INDEXES_THROUGH[cell]:
+            if not other[i]:
+                self.scores[player] += LINE_WEIGHTS[own[i] + 1] - LINE_WEIGHTS[own[i]]
+            elif not own[i]:
+                # The opponent's open line is now blocked
+                self.scores[1 - player] -= LINE_WEIGHTS[other[i]]
+            own[i] += 1
+        self.turn = 1 - player
+
+    def unmake(self, cell):
+        """Take back the stone the previous side placed on `cell`"""
+        player = self.turn = 1 - self.turn
+        own, other = self.counts[player], self.counts[1 - player]
+        for i in LINE_INDEXES_THROUGH[cell]:
+            own[i] -= 1
+            if not other[i]:
+                self.scores[player] -= LINE_WEIGHTS[own[i] + 1] - LINE_WEIGHTS[own[i]]
+            elif not own[i]:
+                self.scores[1 - player] += LINE_WEIGHTS[other[i]]
+
+    def evaluate(self):
+        """Score of the position for the side to move, between -MAX_SCORE and MAX_SCORE"""
+        return self.scores[self.turn] - self.scores[1 - self.turn]
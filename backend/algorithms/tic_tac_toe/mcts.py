@@ -0,0 +1,179 @@
+import math
+import random
+import threading
+import time
+from .bitboard import FULL, empty_cells, from_board, won_by_move
+
+# UCT exploration constant (sqrt(2) for rewards in [0, 1])
+EXPLORATION = math.sqrt(2)
+
+# Rewards for the player who made a move
+WIN, DRAW, LOSS = 1.0, 0.5, 0.0
+
+# Plies below the previous root searched for the new position when reusing the tree
+REUSE_PLIES = 2
+
+
+class Node:
+    """
+    One position in the search tree. `me` is the side to move; `reward`
+    and `result` are from the view of the player who moved into the node.
+    """
+    __slots__ = ('move', 'parent', 'me', 'opp', 'children', 'untried', 'visits', 'reward', 'result')
+
+    def __init__(self, me, opp, move=None, parent=None, result=None, rng=random):
+        self.move = move
+        self.parent = parent
+        self.me = me
+        self.opp = opp
+        self.children = []
+        self.untried = list(empty_cells(me | opp)) if result is None else []
+        rng.shuffle(self.untried)
+        self.visits = 0
+        self.reward = 0.0
+        self.result = result
+
+    def select(self, exploration):
+        """Child with the highest upper confidence bound (UCT)"""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.reward / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def expand(self, rng):
+        """Add the node for one untried move"""
+        cell = self.untried.pop()
+        stone = 1 << cell
+        mover = self.me | stone
+        if won_by_move(mover, cell):
+            result = WIN
+        elif mover | self.opp == FULL:
+            result = DRAW
+        else:
+            result = None
+        child = Node(self.opp, mover, cell, self, result, rng)
+        self.children.append(child)
+        return child
+
+
+def playout(me, opp, rng=random):
+    """
+    Play uniformly random moves to the end of the game
+    :param me: Bitboard of the side to move
+    :param opp: Bitboard of the other side
+    :param rng: Random number generator
+    :return: Reward for the side to move
+    """
+    cells = list(empty_cells(me | opp))
+    rng.shuffle(cells)
+    players = [me, opp]
+    turn = 0
+    for cell in cells:
+        bits = players[turn] = players[turn] | 1 << cell
+        if won_by_move(bits, cell):
+            return WIN if turn == 0 else LOSS
+        turn ^= 1
+    return DRAW
+
+
+class MonteCarloSearch:
+    """
+    UCT search with random bitboard playouts. The tree is kept between
+    calls, and when the next position is a few plies below the previous
+    root (the computer's move and the player's reply) that subtree's
+    statistics are reused.
+    """
+
+    def __init__(self, exploration=EXPLORATION, seed=None):
+        """
+        :param exploration: UCT exploration constant
+        :param seed: Optional random seed, for reproducible searches
+        """
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def run(self, me, opp, time_limit=1.0, playouts=None):
+        """
+        Search until the wall-clock or playout budget runs out
+        :param me: Bitboard of the side to move
+        :param opp: Bitboard of the other side
+        :param time_limit: Seconds to search (None for no time limit)
+        :param playouts: Optional number of playouts to run
+        :return: Most visited move, or None if the board is full
+        """
+        if time_limit is None and playouts is None:
+            raise ValueError("A time limit or playout budget is required")
+
+        with self.lock:
+            start = time.perf_counter()
+            root = self.reuse(me, opp)
+            reused = root.visits
+            self.stats = {'playouts': 0, 'visits': 0, 'reused': reused, 'time_taken': 0.0}
+            if not root.untried and not root.children:
+                return None
+
+            deadline = start + time_limit if time_limit is not None else None
+            count = 0
+            while (playouts is None or count < playouts) and (deadline is None or time.perf_counter() < deadline):
+                self.iterate(root)
+                count += 1
+
+            best = max(root.children, key=lambda child: child.visits)
+            self.stats.update(playouts=count, visits=root.visits, best_visits=best.visits,
+                              win_rate=best.reward / best.visits, time_taken=time.perf_counter() - start)
+            return best.move
+
+    def iterate(self, root):
+        """One selection, expansion, playout and backup pass"""
+        node = root
+        while node.result is None and not node.untried:
+            node = node.select(self.exploration)
+        if node.result is None:
+            node = node.expand(self.rng)
+
+        if node.result is not None:
+            reward = node.result
+        else:
+            reward = 1.0 - playout(node.me, node.opp, self.rng)
+
+        while node is not None:
+            node.visits += 1
+            node.reward += reward
+            reward = 1.0 - reward
+            node = node.parent
+
+    def reuse(self, me, opp):
+        """
+        Make the node for a position the root, keeping its subtree if the
+        previous tree reaches it
+        """
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(REUSE_PLIES + 1):
+            for node in frontier:
+                if node.me == me and node.opp == opp:
+                    node.parent = None
+                    self.root = node
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+
+        self.root = Node(me, opp, rng=self.rng)
+        return self.root
+
+
+def find_best_move(board, time_limit=1.0, playouts=None, search=None, stats=None):
+    """
+    Find the best move for the computer player ('O') with Monte Carlo Tree Search
+    :param board: Current game state (5x5 grid as a list)
+    :param time_limit: Seconds to search (None for no time limit)
+    :param playouts: Optional number of playouts to run
+    :param search: Optional MonteCarloSearch kept between moves to reuse its tree
+    :param stats: Optional dict, filled with playouts, visits, reused, best_visits, win_rate and time_taken
+    :return: Best move index (0-24), or None if the board is full
+    """
+    search = search if search is not None else MonteCarloSearch()
+    move = search.run(from_board(board, 'O'), from_board(board, 'X'), time_limit, playouts)
+    if stats is not None:
+        stats.update(search.stats)
+    return move
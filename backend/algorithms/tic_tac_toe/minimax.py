@@ -1,81 +1,117 @@
-def find_best_move(board, depth=3):
+from .bitboard import CELLS, FULL, empty_cells, from_board, has_won, won_by_move
+from .evaluation import MAX_SCORE, LineThreats
+
+WIN_SCORE = 10
+
+def find_best_move(board, depth=3, tablebase=None, heuristic=True, stats=None):
     """
     Find the best move for the computer player using Minimax algorithm
     :param board: Current game state (5x5 grid as a list)
     :param depth: Depth to search in the game tree
+    :param tablebase: Optional Tablebase giving exact results near the end of the game
+    :param heuristic: Score positions at the depth limit by open lines instead of as draws
+    :param stats: Optional dict, filled with the number of nodes searched
     :return: Best move index (0-24)
     """
+    if stats is not None:
+        stats['nodes'] = 0
+    o, x = from_board(board, 'O'), from_board(board, 'X')
+    threats = LineThreats(o, x) if heuristic else None
     best_score = -float('inf')
     best_move = None
-    
-    for i in range(25):
-        if board[i] == '':
-            board[i] = 'O'  # Computer is 'O'
-            score = minimax(board, depth, False)
-            board[i] = ''  # Undo move
-            
-            if score > best_score:
-                best_score = score
-                best_move = i
-                
+
+    for cell in empty_cells(o | x):
+        stone = 1 << cell
+        # Computer is 'O'
+        if won_by_move(o | stone, cell):
+            score = WIN_SCORE
+        else:
+            if threats is not None:
+                threats.make(cell)
+            score = search(o | stone, x, depth, False, tablebase, threats, stats)
+            if threats is not None:
+                threats.unmake(cell)
+
+        if score > best_score:
+            best_score = score
+            best_move = cell
+
     return best_move
 
 def minimax(board, depth, is_maximizing):
     """
     Minimax algorithm implementation with depth limiting
     """
+    o, x = from_board(board, 'O'), from_board(board, 'X')
     # Check for terminal states
-    if check_win(board, 'O'):
-        return 10
-    if check_win(board, 'X'):
-        return -10
-    if check_draw(board) or depth == 0:
+    if has_won(o):
+        return WIN_SCORE
+    if has_won(x):
+        return -WIN_SCORE
+    return search(o, x, depth, is_maximizing)
+
+def search(o, x, depth, is_maximizing, tablebase=None, threats=None, stats=None):
+    """
+    Minimax over bitboards of a position with no completed line
+    Each move is checked for a win as it is made, so only the lines
+    through the new stone are tested.
+    :param o: Bitboard of the computer's stones
+    :param x: Bitboard of the player's stones
+    :param depth: Remaining depth
+    :param is_maximizing: True when the computer ('O') is to move
+    :param tablebase: Optional Tablebase; covered positions at the depth limit get their exact result
+    :param threats: Optional LineThreats for this position, used to score it at the depth limit
+    :param stats: Optional dict whose 'nodes' count is incremented for every position visited
+    :return: WIN_SCORE, -WIN_SCORE, or a score strictly between them
+    """
+    if stats is not None:
+        stats['nodes'] += 1
+    occupied = o | x
+    if occupied == FULL:
         return 0
-    
+
+    if depth == 0:
+        if tablebase is not None and CELLS - bin(occupied).count('1') <= tablebase.max_empties:
+            solved = tablebase.probe(o, x) if is_maximizing else tablebase.probe(x, o)
+            if solved is not None:
+                # Only the result matters here, not how far away it is
+                result = (solved[0] > 0) - (solved[0] < 0)
+                return result * WIN_SCORE if is_maximizing else -result * WIN_SCORE
+        if threats is None:
+            return 0
+        # Scaled to stay below a forced result
+        score = threats.evaluate() / MAX_SCORE
+        return score if is_maximizing else -score
+
     if is_maximizing:
-        best_score = -float('inf')
-        for i in range(25):
-            if board[i] == '':
-                board[i] = 'O'
-                score = minimax(board, depth - 1, False)
-                board[i] = ''
-                best_score = max(score, best_score)
+        best_score = -WIN_SCORE
+        for cell in empty_cells(occupied):
+            stone = 1 << cell
+            if won_by_move(o | stone, cell):
+                return WIN_SCORE
+            if threats is not None:
+                threats.make(cell)
+            best_score = max(search(o | stone, x, depth - 1, False, tablebase, threats, stats), best_score)
+            if threats is not None:
+                threats.unmake(cell)
         return best_score
     else:
-        best_score = float('inf')
-        for i in range(25):
-            if board[i] == '':
-                board[i] = 'X'
-                score = minimax(board, depth - 1, True)
-                board[i] = ''
-                best_score = min(score, best_score)
+        best_score = WIN_SCORE
+        for cell in empty_cells(occupied):
+            stone = 1 << cell
+            if won_by_move(x | stone, cell):
+                return -WIN_SCORE
+            if threats is not None:
+                threats.make(cell)
+            best_score = min(search(o, x | stone, depth - 1, True, tablebase, threats, stats), best_score)
+            if threats is not None:
+                threats.unmake(cell)
         return best_score
 
 def check_win(board, player):
     """Check if the given player has won (5 in a row)"""
-    # Check all possible 5-in-a-row combinations
-    # Rows (5x5)
-    for row in range(5):
-        for col in range(1):  # Only need to check starting positions where 5 fit
-            if all(board[row*5 + col + i] == player for i in range(5)):
-                return True
-    
-    # Columns (5x5)
-    for col in range(5):
-        for row in range(1):  # Only need to check starting positions where 5 fit
-            if all(board[(row + i)*5 + col] == player for i in range(5)):
-                return True
-    
-    # Diagonals (top-left to bottom-right)
-    if all(board[i*5 + i] == player for i in range(5)):
-        return True
-    
-    # Diagonals (top-right to bottom-left)
-    if all(board[i*5 + (4 - i)] == player for i in range(5)):
-        return True
-    
-    return False
+    return has_won(from_board(board, player))
 
 def check_draw(board):
     """Check if the game is a draw"""
-    return all(cell != '' for cell in board)
\ No newline at end of file
+    return all(cell != '' for cell in board)
@@ -0,0 +1,120 @@
+import mmap
+import os
+import struct
+
+MAGIC = b'TTTB'
+
+# Version 1 files have 64-bit integer keys; version 2 files have byte-string
+# keys of a fixed width, given right after the header
+INTEGER_KEYS, BYTES_KEYS = 1, 2
+
+# File header: magic, format version, record count
+HEADER = struct.Struct('<4sHI')
+
+# Key width in bytes, in version 2 files
+KEY_WIDTH = struct.Struct('<H')
+
+# One record: position key, score, best move, search depth
+RECORD = struct.Struct('<Qhbb')
+
+
+def bytes_record(key_size):
+    """Record layout for byte-string keys of a fixed width"""
+    return struct.Struct(f'<{key_size}shbb')
+
+
+def write_table(path, records, key_size=None):
+    """
+    Write records to a sorted binary table file, replacing it atomically
+    :param path: Output file path
+    :param records: Iterable of (key, score, move, depth) tuples with unique keys
+    :param key_size: Width of byte-string keys, which are padded with zero
+                     bytes up to it, or None for integer keys
+    """
+    if key_size is None:
+        records = sorted(records)
+        header = HEADER.pack(MAGIC, INTEGER_KEYS, len(records))
+        layout = RECORD
+    else:
+        padded = []
+        for key, *values in records:
+            if len(key) > key_size:
+                raise ValueError(f"Keys must be at most {key_size} bytes")
+            padded.append((key.ljust(key_size, b'\0'), *values))
+        records = sorted(padded)
+        header = HEADER.pack(MAGIC, BYTES_KEYS, len(records)) + KEY_WIDTH.pack(key_size)
+        layout = bytes_record(key_size)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as table:
+        table.write(header)
+        for record in records:
+            table.write(layout.pack(*record))
+    os.replace(temporary, path)
+
+
+class MappedTable:
+    """
+    Read-only view of a table file through mmap. Lookups binary-search the
+    sorted records in place, so every process mapping the file shares the
+    same page-cache pages and nothing is parsed up front.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Table file written by write_table
+        """
+        with open(path, 'rb') as table:
+            self._map = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path} is not a table file")
+        magic, version, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in (INTEGER_KEYS, BYTES_KEYS):
+            self._map.close()
+            raise ValueError(f"{path} is not a version {INTEGER_KEYS} or {BYTES_KEYS} table file")
+
+        self.key_size = None
+        self._layout, self._start = RECORD, HEADER.size
+        if version == BYTES_KEYS:
+            if len(self._map) < HEADER.size + KEY_WIDTH.size:
+                self._map.close()
+                raise ValueError(f"{path} is truncated")
+            self.key_size, = KEY_WIDTH.unpack_from(self._map, HEADER.size)
+            self._layout, self._start = bytes_record(self.key_size), HEADER.size + KEY_WIDTH.size
+        if len(self._map) != self._start + self.count * self._layout.size:
+            self._map.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """Record at a position in key order, as (key, score, move, depth)"""
+        return self._layout.unpack_from(self._map, self._start + index * self._layout.size)
+
+    def get(self, key):
+        """
+        Find the record for a key
+        :param key: Position key (bytes for tables with byte-string keys)
+        :return: Tuple of (score, move, depth), or None if the key is absent
+        """
+        if self.key_size is not None:
+            if len(key) > self.key_size:
+                return None
+            key = key.ljust(self.key_size, b'\0')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = self.record(middle)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return record[1:]
+        return None
+
+    def close(self):
+        """Unmap the file"""
+        self._map.close()
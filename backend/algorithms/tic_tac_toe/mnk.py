@@ -0,0 +1,406 @@
+import random
+import time
+from ...utils.cache import LRUCache
+from .alphabeta import EXACT, LOWER, UPPER, SearchTimeout, TranspositionTable
+
+# The game played on the page: 5x5 with five in a row
+DEFAULT_VARIANT = (5, 5, 5)
+
+# Largest board side accepted (19x19 is a go board)
+MAX_SIZE = 19
+
+# Only cells within this many rows and columns of a stone are searched
+NEIGHBOUR_RADIUS = 2
+
+# Nodes searched between deadline checks; nodes cost far more than on the
+# 5x5 bitboards (about 6k per second on 15x15), so the clock is read more often
+CHECK_INTERVAL = 64
+
+# Transposition table slots per search; each move gets its own table, and a
+# half-second search visits a few thousand nodes on the larger boards
+TABLE_SIZE = 1 << 16
+
+# Variants whose precomputed boards are kept (about 4,800 are valid)
+MAX_CACHED_BOARDS = 32
+
+# Directions a window can run in: across, down and both diagonals
+_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+_boards = LRUCache(MAX_CACHED_BOARDS)
+
+
+def get_board(width, height, k):
+    """Shared MNKBoard for a recently played variant, so its tables are built once (boards are read-only)"""
+    variant = (width, height, k)
+    board = _boards.get(variant)
+    if board is None:
+        board = MNKBoard(width, height, k)
+        _boards.put(variant, board)
+    return board
+
+
+class MNKBoard:
+    """
+    Precomputed tables for a width x height board won with k in a row:
+    every window of k cells, the windows through each cell, each cell's
+    neighbourhood, and Zobrist keys for the transposition table.
+    """
+
+    def __init__(self, width, height, k):
+        """
+        :param width: Number of columns
+        :param height: Number of rows
+        :param k: Stones in a row needed to win
+        """
+        if not 1 <= width <= MAX_SIZE or not 1 <= height <= MAX_SIZE:
+            raise ValueError(f"Board sides must be between 1 and {MAX_SIZE}")
+        if not 2 <= k <= max(width, height):
+            raise ValueError("k must be at least 2 and fit on the board")
+
+        self.width, self.height, self.k = width, height, k
+        self.cells = width * height
+        self.full = (1 << self.cells) - 1
+
+        windows = []
+        for row in range(height):
+            for col in range(width):
+                for dr, dc in _DIRECTIONS:
+                    end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                    if 0 <= end_row < height and 0 <= end_col < width:
+                        windows.append(sum(1 << ((row + dr * i) * width + col + dc * i) for i in range(k)))
+        self.windows = tuple(windows)
+        self.windows_through = tuple(tuple(i for i, window in enumerate(windows) if window >> cell & 1)
+                                     for cell in range(self.cells))
+
+        self.neighbours = tuple(
+            sum(1 << (r * width + c)
+                for r in range(max(0, cell // width - NEIGHBOUR_RADIUS), min(height, cell // width + NEIGHBOUR_RADIUS + 1))
+                for c in range(max(0, cell % width - NEIGHBOUR_RADIUS), min(width, cell % width + NEIGHBOUR_RADIUS + 1)))
+            for cell in range(self.cells))
+
+        # Centre first, so the opening move and ties favour the middle
+        centre_row, centre_col = (height - 1) / 2, (width - 1) / 2
+        self.centre_order = tuple(sorted(range(self.cells), key=lambda cell: (
+            abs(cell // width - centre_row) + abs(cell % width - centre_col), cell)))
+
+        # Weight of a window by the stones one player has in it; a full window ends the game
+        self.weights = (0,) + tuple(4 ** (n - 1) for n in range(1, k)) + (0,)
+        self.win_score = len(windows) * max(self.weights) + self.cells + 1
+        self.win_threshold = self.win_score - self.cells - 1
+
+        keys = random.Random(5)
+        self.zobrist = tuple(tuple(keys.getrandbits(64) for _ in range(self.cells)) for _ in range(2))
+        self.side_key = keys.getrandbits(64)
+
+
+class MNKState:
+    """
+    A position on an MNKBoard with per-window stone counts, updated as
+    moves are made and unmade. Player 0 is 'X' and player 1 is 'O'.
+    """
+
+    def __init__(self, board, x=0, o=0, turn=0):
+        """
+        :param board: MNKBoard with the variant's tables
+        :param x: Bitboard of 'X' stones
+        :param o: Bitboard of 'O' stones
+        :param turn: Player to move (0 for 'X', 1 for 'O')
+        """
+        self.board = board
+        self.bits = [x, o]
+        self.counts = [[bin(window & bits).count('1') for window in board.windows] for bits in (x, o)]
+        self.scores = [sum(board.weights[own] for own, other in zip(*pair) if not other)
+                       for pair in (self.counts, self.counts[::-1])]
+        self.turn = turn
+        self.key = board.side_key if turn else 0
+        for player in (0, 1):
+            for cell in range(board.cells):
+                if self.bits[player] >> cell & 1:
+                    self.key ^= board.zobrist[player][cell]
+
+    @property
+    def occupied(self):
+        return self.bits[0] | self.bits[1]
+
+    def winner(self):
+        """Player with k in a row, or None"""
+        for player in (0, 1):
+            if any(count == self.board.k for count in self.counts[player]):
+                return player
+        return None
+
+    def make(self, cell):
+        """
+        Place a stone for the side to move
+        :return: True if the move completes a window
+        """
+        player = self.turn
+        board = self.board
+        own, other = self.counts[player], self.counts[1 - player]
+        won = False
+        for i in board.windows_through[cell]:
+            if not other[i]:
+                self.scores[player] += board.weights[own[i] + 1] - board.weights[own[i]]
+            elif not own[i]:
+                self.scores[1 - player] -= board.weights[other[i]]
+            own[i] += 1
+            won = won or own[i] == board.k
+        self.bits[player] |= 1 << cell
+        self.key ^= board.zobrist[player][cell] ^ board.side_key
+        self.turn = 1 - player
+        return won
+
+    def unmake(self, cell):
+        """Take back the stone the previous side placed on `cell`"""
+        player = self.turn = 1 - self.turn
+        board = self.board
+        own, other = self.counts[player], self.counts[1 - player]
+        for i in board.windows_through[cell]:
+            own[i] -= 1
+            if not other[i]:
+                self.scores[player] -= board.weights[own[i] + 1] - board.weights[own[i]]
+            elif not own[i]:
+                self.scores[1 - player] += board.weights[other[i]]
+        self.bits[player] &= ~(1 << cell)
+        self.key ^= board.zobrist[player][cell] ^ board.side_key
+
+    def wins_at(self, cell, player):
+        """Check whether a stone for `player` on `cell` would complete a window"""
+        own, other = self.counts[player], self.counts[1 - player]
+        last = self.board.k - 1
+        return any(own[i] == last and not other[i] for i in self.board.windows_through[cell])
+
+    def candidates(self):
+        """Empty cells near a stone, in centre-first order (the centre alone on an empty board)"""
+        occupied = self.occupied
+        if not occupied:
+            return [self.board.centre_order[0]]
+        near = 0
+        remaining = occupied
+        while remaining:
+            low = remaining & -remaining
+            near |= self.board.neighbours[low.bit_length() - 1]
+            remaining ^= low
+        near &= ~occupied
+        if not near:
+            # Every cell near a stone is taken; fall back to the rest of the board
+            near = self.board.full & ~occupied
+        return [cell for cell in self.board.centre_order if near >> cell & 1]
+
+    def move_value(self, cell):
+        """How much a move for the side to move builds its windows and blocks the opponent's"""
+        board = self.board
+        own, other = self.counts[self.turn], self.counts[1 - self.turn]
+        value = 0
+        for i in board.windows_through[cell]:
+            if not other[i]:
+                value += board.weights[own[i] + 1] - board.weights[own[i]]
+            elif not own[i]:
+                value += board.weights[other[i]]
+        return value
+
+    def evaluate(self):
+        """Open-window score for the side to move"""
+        return self.scores[self.turn] - self.scores[1 - self.turn]
+
+
+class MNKSearch:
+    """Iterative-deepening negamax alpha-beta over an MNKState"""
+
+    def __init__(self, table=None):
+        """
+        :param table: Optional TranspositionTable reused between searches (never by two at once)
+        """
+        self.table = table if table is not None else TranspositionTable(TABLE_SIZE)
+        self.nodes = 0
+        self.deadline = None
+        self.root_move = None
+        self.stats = {}
+
+    def run(self, state, time_limit=1.0, max_depth=None):
+        """
+        Search the position for the side to move
+        :param state: MNKState with no completed window; restored when the search ends
+        :param time_limit: Seconds to search; the deepest completed iteration is used
+        :param max_depth: Optional depth limit (defaults to the number of empty cells)
+        :return: Tuple of (best move, score) from the deepest completed iteration
+        """
+        board = state.board
+        empty = board.cells - bin(state.occupied).count('1')
+        self.stats = {'depth': 0, 'score': 0, 'nodes': 0}
+        if not empty:
+            return None, 0
+
+        self.table.new_search()
+        max_depth = min(max_depth or empty, empty)
+        start = time.perf_counter()
+        best_move, best_score = state.candidates()[0], 0
+
+        for depth in range(1, max_depth + 1):
+            # The first iteration always completes, so there is always a move
+            self.deadline = start + time_limit if depth > 1 else None
+            try:
+                score = self.negamax(state, depth, -board.win_score - 1, board.win_score + 1, 0)
+            except SearchTimeout:
+                break
+
+            best_move, best_score = self.root_move, score
+            self.stats.update(depth=depth, score=score)
+            if abs(score) > board.win_threshold:
+                # A forced result cannot change with more depth
+                break
+
+        self.stats['nodes'] = self.nodes
+        return best_move, best_score
+
+    def negamax(self, state, depth, alpha, beta, ply):
+        """
+        Score the position (no completed window) for the side to move
+        :return: Score; forced wins are win_score minus the ply they happen at
+        """
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        board = state.board
+        moves = state.candidates()
+        if not moves:
+            return 0
+
+        # A winning move ends the game, whatever the remaining depth
+        player = state.turn
+        for cell in moves:
+            if state.wins_at(cell, player):
+                if ply == 0:
+                    self.root_move = cell
+                return board.win_score - ply - 1
+
+        if depth == 0:
+            return state.evaluate()
+
+        # Against a one-move threat only the blocking cells matter
+        threats = [cell for cell in moves if state.wins_at(cell, 1 - player)]
+        if threats:
+            moves = threats
+
+        original_alpha = alpha
+        key = state.key
+        table_move = None
+        entry = self.table.probe(key)
+        if entry is not None:
+            entry_depth, flag, score, table_move = entry
+            if entry_depth >= depth and ply > 0:
+                score = _from_table(score, ply, board.win_threshold)
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        moves.sort(key=lambda cell: (cell != table_move, -state.move_value(cell)))
+        best_score, best_move = -board.win_score - 1, None
+        for cell in moves:
+            state.make(cell)
+            try:
+                score = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                # Also unwinds the board when the search times out
+                state.unmake(cell)
+            if score > best_score:
+                best_score, best_move = score, cell
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, _to_table(best_score, ply, board.win_threshold), best_move)
+        if ply == 0:
+            self.root_move = best_move
+        return best_score
+
+
+def _to_table(score, ply, threshold):
+    """Make win scores relative to the stored position"""
+    if score > threshold:
+        return score + ply
+    if score < -threshold:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply, threshold):
+    """Turn a stored win score back into one relative to the root"""
+    if score > threshold:
+        return score - ply
+    if score < -threshold:
+        return score + ply
+    return score
+
+
+def from_board(board, width, height, k, turn=1):
+    """
+    Build a position from the list form of a board
+    :param board: width * height list of 'X', 'O' or ''
+    :param turn: Player to move (0 for 'X', 1 for 'O')
+    :return: MNKState
+    """
+    x = sum(1 << cell for cell, value in enumerate(board) if value == 'X')
+    o = sum(1 << cell for cell, value in enumerate(board) if value == 'O')
+    return MNKState(get_board(width, height, k), x, o, turn)
+
+
+def check_win(board, player, width, height, k):
+    """Check if the given player ('X' or 'O') has k in a row"""
+    return from_board(board, width, height, k).winner() == (0 if player == 'X' else 1)
+
+
+def find_best_move(board, width, height, k, time_limit=1.0, max_depth=None, table=None, stats=None):
+    """
+    Find the best move for the computer player ('O') on an m,n,k board
+    :param board: Current game state (width * height list)
+    :param width: Number of columns
+    :param height: Number of rows
+    :param k: Stones in a row needed to win
+    :param time_limit: Seconds to search
+    :param max_depth: Optional depth limit
+    :param table: Optional TranspositionTable (defaults to a new one for this search)
+    :param stats: Optional dict, filled with depth, score and nodes
+    :return: Best move index, or None if the board is full
+    """
+    search = MNKSearch(table)
+    move, _ = search.run(from_board(board, width, height, k), time_limit, max_depth)
+    if stats is not None:
+        stats.update(search.stats)
+    return move
+
+
+def computer_move(board, width, height, k, time_limit=1.0):
+    """
+    Choose the computer's ('O') move on an m,n,k board
+    :return: Dictionary with move, algorithm, time_taken, cached and source, as engine.computer_move
+    """
+    if len(board) != width * height:
+        raise ValueError(f"Board must have {width * height} cells")
+    state = from_board(board, width, height, k)
+    if state.winner() is not None:
+        raise ValueError("Game is already over")
+    if state.occupied == state.board.full:
+        raise ValueError("Board is full")
+
+    start = time.perf_counter()
+    move, _ = MNKSearch().run(state, time_limit)
+    return {
+        'move': move,
+        'algorithm': 'alphabeta',
+        'time_taken': time.perf_counter() - start,
+        'cached': False,
+        'source': 'search'
+    }
@@ -0,0 +1,98 @@
+import argparse
+from .alphabeta import AlphaBetaSearch, TranspositionTable
+from .bitboard import CELLS, canonical, empty_cells, won_by_move
+from .mmap_table import MappedTable, write_table
+
+# Stones on the board up to which positions are stored by default
+DEFAULT_PLIES = 3
+
+# Search budget per book position, in seconds
+DEFAULT_TIME_LIMIT = 5.0
+
+
+def position_key(x, o):
+    """Pack a pair of bitboards into one integer key"""
+    return x | o << CELLS
+
+
+def book_positions(plies):
+    """
+    Symmetry-distinct positions with the computer ('O') to move, reachable
+    from the empty board when the player ('X') moves first
+    :param plies: Largest number of stones on the board
+    :return: Sorted list of canonical (x, o) pairs
+    """
+    frontier = {(0, 0)}
+    positions = []
+    for ply in range(plies):
+        following = set()
+        for x, o in frontier:
+            for cell in empty_cells(x | o):
+                if ply % 2 == 0:
+                    x_next, o_next, mover = x | 1 << cell, o, x | 1 << cell
+                else:
+                    x_next, o_next, mover = x, o | 1 << cell, o | 1 << cell
+                # Finished games need no book move
+                if not won_by_move(mover, cell):
+                    following.add(canonical(x_next, o_next)[:2])
+        frontier = following
+        if ply % 2 == 0:
+            positions.extend(frontier)
+    return sorted(positions)
+
+
+def generate_book(path, plies=DEFAULT_PLIES, time_limit=DEFAULT_TIME_LIMIT, max_depth=None):
+    """
+    Deep-search every book position and write the results to a table file
+    :param path: Output file path
+    :param plies: Largest number of stones on the board
+    :param time_limit: Seconds of search per position
+    :param max_depth: Optional depth limit per position
+    :return: Number of positions written
+    """
+    table = TranspositionTable()
+    records = []
+    for x, o in book_positions(plies):
+        search = AlphaBetaSearch(table)
+        move, score = search.run(o, x, 0, time_limit, max_depth)
+        records.append((position_key(x, o), score, move, search.stats['depth']))
+    write_table(path, records)
+    return len(records)
+
+
+class OpeningBook:
+    """Opening moves looked up from a memory-mapped book file"""
+
+    def __init__(self, path):
+        """
+        :param path: Book file written by generate_book
+        """
+        self.table = MappedTable(path)
+
+    def __len__(self):
+        return len(self.table)
+
+    def get(self, x, o):
+        """
+        Book move for a canonical position with the computer ('O') to move
+        :param x: Canonical bitboard of 'X' stones
+        :param o: Canonical bitboard of 'O' stones
+        :return: Move index, or None if the position is not in the book
+        """
+        record = self.table.get(position_key(x, o))
+        return record[1] if record is not None else None
+
+    def close(self):
+        self.table.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the tic-tac-toe opening book")
+    parser.add_argument('output', help="Book file to write")
+    parser.add_argument('--plies', type=int, default=DEFAULT_PLIES, help="Largest number of stones on the board")
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT, help="Seconds of search per position")
+    parser.add_argument('--max-depth', type=int, default=None, help="Depth limit per position")
+    args = parser.parse_args()
+
+    count = generate_book(args.output, args.plies, args.time_limit, args.max_depth)
+    print(f"Wrote {count} positions to {args.output}")
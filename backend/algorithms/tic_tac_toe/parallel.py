@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import threading
+import time
+from .alphabeta import (DEFAULT_TABLE_SIZE, MOVE_ORDER, WIN_SCORE, WIN_THRESHOLD, AlphaBetaSearch, SearchTimeout,
+                        TranspositionTable, board_key)
+from .bitboard import empty_cells, from_board, won_by_move
+from .tablebase import Tablebase
+
+# Per-process worker state, set up by _init_worker
+_worker = {}
+
+
+def _init_worker(alpha, table_size, tablebase_path, heuristic):
+    """Keep the shared alpha bound and open the worker's own tables"""
+    _worker['alpha'] = alpha
+    _worker['heuristic'] = heuristic
+    _worker['table_size'] = table_size
+    _worker['tablebase'] = Tablebase(tablebase_path) if tablebase_path else None
+    _worker['search_id'] = None
+
+
+def _search_root_move(task):
+    """
+    Score one root move in a worker process against the shared alpha bound
+    The bound is read once, when the task starts; improvements other workers
+    make later only narrow the tasks started after them.
+    :param task: Tuple of (search id, me, opp, side, cell, depth, time.monotonic() deadline or None)
+    :return: Tuple of (cell, score, exact, nodes, pv); score is None if time ran out
+    """
+    search_id, me, opp, side, cell, depth, deadline = task
+    if search_id != _worker['search_id']:
+        # Entries left from another root position may be deeper than this search needs
+        _worker['table'] = TranspositionTable(_worker['table_size'])
+        _worker['search_id'] = search_id
+
+    search = AlphaBetaSearch(_worker['table'], _worker['tablebase'], _worker['heuristic'])
+    # The deadline is shared by every task of the iteration, however long it waited in the queue
+    if deadline is not None:
+        if time.monotonic() >= deadline:
+            return cell, None, False, 0, []
+        search.deadline = time.perf_counter() + deadline - time.monotonic()
+    alpha = _worker['alpha'].value
+    stone = 1 << cell
+    search.reset_threats(opp, me | stone)
+    key = board_key(opp, me | stone, 1 - side)
+    try:
+        # One below the bound, so a move that ties the best is still scored exactly
+        score = -search.negamax(opp, me | stone, key, 1 - side, depth - 1, -WIN_SCORE - 1, 1 - alpha, 1)
+    except SearchTimeout:
+        return cell, None, False, search.nodes, []
+
+    exact = score >= alpha
+    if exact:
+        shared = _worker['alpha']
+        with shared.get_lock():
+            if score > shared.value:
+                shared.value = score
+    pv = [cell] + search.principal_variation(opp, me | stone, key, 1 - side, depth - 1)
+    return cell, score, exact, search.nodes, pv
+
+
+class ParallelSearch:
+    """
+    Root-split alpha-beta over a process pool. Each iteration searches the
+    first root move on its own, then spreads the rest across the workers,
+    which share the best score so far through shared memory. Ties go to the
+    earliest move in the sequential search's order, so for the same depth the
+    result matches AlphaBetaSearch.run.
+    """
+
+    def __init__(self, workers=None, table_size=DEFAULT_TABLE_SIZE, tablebase_path=None, heuristic=True):
+        """
+        :param workers: Number of worker processes (defaults to the CPU count)
+        :param table_size: Transposition table slots per worker
+        :param tablebase_path: Optional tablebase file each worker probes
+        :param heuristic: Score the leaves by open lines, as AlphaBetaSearch does
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.heuristic = heuristic
+        self.table_size = table_size
+        self.tablebase_path = tablebase_path
+        self.tablebase = Tablebase(tablebase_path) if tablebase_path else None
+        self.alpha = multiprocessing.Value('i', -WIN_SCORE - 1)
+        self.pool = None
+        self.searches = 0
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the worker processes, if they are not running yet"""
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers, _init_worker,
+                                             (self.alpha, self.table_size, self.tablebase_path, self.heuristic))
+
+    def close(self):
+        """Stop the worker processes"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+
+    def run(self, me, opp, side, time_limit=1.0, max_depth=None):
+        """
+        Iteratively deepen until the time budget or depth limit is reached
+        :param me: Bitboard of the side to move
+        :param opp: Bitboard of the other side
+        :param side: 0 or 1, the player to move
+        :param time_limit: Seconds to search
+        :param max_depth: Optional depth limit
+        :return: Tuple of (best move, score) from the deepest completed iteration
+        """
+        with self.lock:
+            return self._run(me, opp, side, time_limit, max_depth)
+
+    def _run(self, me, opp, side, time_limit, max_depth):
+        occupied = me | opp
+        moves = list(empty_cells(occupied))
+        self.stats = {'depth': 0, 'score': 0, 'nodes': 0, 'pv': []}
+        if not moves:
+            return None, 0
+
+        # Positions the sequential search settles without searching
+        if self.tablebase is not None:
+            solved = self.tablebase.probe(me, opp)
+            if solved is not None:
+                self.stats.update(depth=len(moves), score=solved[0], pv=[solved[1]])
+                return solved[1], solved[0]
+        for cell in moves:
+            if won_by_move(me | 1 << cell, cell):
+                self.stats.update(depth=1, score=WIN_SCORE - 1, pv=[cell])
+                return cell, WIN_SCORE - 1
+
+        self.start()
+        self.searches += 1
+        search_id = (os.getpid(), id(self), self.searches)
+        max_depth = min(max_depth or len(moves), len(moves))
+        order = [cell for cell in MOVE_ORDER if not occupied >> cell & 1]
+        # monotonic, unlike perf_counter, is comparable between processes
+        end = time.monotonic() + time_limit
+        best_move, best_score = order[0], 0
+
+        for depth in range(1, max_depth + 1):
+            # The first iteration always completes, so there is always a move
+            deadline = end if depth > 1 else None
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            result = self.search_iteration(search_id, me, opp, side, depth, order, deadline)
+            if result is None:
+                break
+
+            best_move, best_score, pv = result
+            self.stats.update(depth=depth, score=best_score, pv=pv)
+            if abs(best_score) > WIN_THRESHOLD:
+                # A forced result cannot change with more depth
+                break
+            # The sequential search tries the previous best move first
+            order.remove(best_move)
+            order.insert(0, best_move)
+
+        return best_move, best_score
+
+    def search_iteration(self, search_id, me, opp, side, depth, order, deadline):
+        """
+        Search every root move to a fixed depth
+        :param deadline: time.monotonic() value by which every move must be searched, or None
+        :return: Tuple of (best move, score, pv), or None if time ran out
+        """
+        self.alpha.value = -WIN_SCORE - 1
+        tasks = [(search_id, me, opp, side, cell, depth, deadline) for cell in order]
+
+        # Young brothers wait: the eldest sets the bound the others search against
+        results = [self.pool.apply(_search_root_move, (tasks[0],))]
+        results.extend(self.pool.imap_unordered(_search_root_move, tasks[1:]))
+
+        self.stats['nodes'] += sum(result[3] for result in results)
+        if any(result[1] is None for result in results):
+            return None
+
+        rank = {cell: i for i, cell in enumerate(order)}
+        exact = [result for result in results if result[2]]
+        _, score, _, _, pv = max(exact, key=lambda result: (result[1], -rank[result[0]]))
+        return pv[0], score, pv
+
+
+def find_best_move(board, time_limit=1.0, max_depth=None, workers=None, stats=None):
+    """
+    Find the best move for the computer player ('O') with a one-off parallel search
+    Starting the pool costs more than a shallow search, so servers should keep
+    a ParallelSearch open between moves instead.
+    :param board: Current game state (5x5 grid as a list)
+    :param time_limit: Seconds to search
+    :param max_depth: Optional depth limit
+    :param workers: Number of worker processes (defaults to the CPU count)
+    :param stats: Optional dict, filled with depth, score, nodes and pv
+    :return: Best move index (0-24), or None if the board is full
+    """
+    o, x = from_board(board, 'O'), from_board(board, 'X')
+    with ParallelSearch(workers) as search:
+        move, _ = search.run(o, x, 0, time_limit, max_depth)
+    if stats is not None:
+        stats.update(search.stats)
+    return move
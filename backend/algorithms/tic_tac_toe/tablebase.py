@@ -0,0 +1,261 @@
+import argparse
+import random
+from itertools import permutations, product
+from .alphabeta import WIN_SCORE, WIN_THRESHOLD
+from .bitboard import CELLS, FULL, LINES, empty_cells, has_won
+from .mmap_table import MappedTable, write_table
+
+# Largest number of empty squares a table can cover; keys would allow 16,
+# but 500 samples at 12 already take about a minute to solve
+MAX_EMPTIES = 12
+
+DEFAULT_EMPTIES = 8
+
+# Random positions whose endgames are solved by default
+DEFAULT_SAMPLES = 100000
+
+# Bytes per needed set in a position key
+SET_BYTES = 2
+
+# Widest position key: empty count, size of the first family, then every
+# line's needed set for both sides
+KEY_SIZE = 2 + 2 * len(LINES) * SET_BYTES
+
+
+def residual_game(me, opp):
+    """
+    Reduce a position to what decides its outcome. Each line still open to a
+    player needs exactly its empty squares, so the game is fully described
+    by the empty squares and each side's family of needed sets.
+    :param me: Bitboard of the side to move
+    :param opp: Bitboard of the other side
+    :return: Tuple of (empty cells, my needed sets, opponent's needed sets),
+             sets as bitmasks over positions in the empty cell list
+    """
+    empties = list(empty_cells(me | opp))
+    mine, theirs = set(), set()
+    for line in LINES:
+        needed = 0
+        for i, cell in enumerate(empties):
+            if line >> cell & 1:
+                needed |= 1 << i
+        if not line & opp:
+            mine.add(needed)
+        if not line & me:
+            theirs.add(needed)
+    return empties, minimal_sets(mine), minimal_sets(theirs)
+
+
+def minimal_sets(family):
+    """Drop every set that contains another one; completing it would win later anyway"""
+    return frozenset(s for s in family if not any(t != s and t & s == t for t in family))
+
+
+def permute_set(s, permutation):
+    """Relabel the elements of a set bitmask (element i becomes permutation[i])"""
+    image = 0
+    for i, target in enumerate(permutation):
+        if s >> i & 1:
+            image |= 1 << target
+    return image
+
+
+def canonical_game(k, mine, theirs):
+    """
+    Canonical relabeling of a residual game over its k empty squares.
+    Squares are split into classes by repeatedly refining on the sets they
+    belong to, and only orderings within a class are tried; squares in
+    exactly the same sets are interchangeable, so they are never reordered
+    :return: Tuple of (position key, permutation taking local positions to canonical ones)
+    """
+    families = (sorted(mine), sorted(theirs))
+    colours, classes = [0] * k, 1
+    while True:
+        signatures = [(colours[square],) + tuple(
+            tuple(sorted(tuple(sorted(colours[i] for i in range(k) if s >> i & 1))
+                         for s in family if s >> square & 1))
+            for family in families) for square in range(k)]
+        ranks = {signature: rank for rank, signature in enumerate(sorted(set(signatures)))}
+        colours = [ranks[signature] for signature in signatures]
+        if len(ranks) == classes:
+            break
+        classes = len(ranks)
+
+    blocks = {}
+    for square in range(k):
+        membership = tuple(tuple(s >> square & 1 for s in family) for family in families)
+        blocks.setdefault((colours[square], membership), []).append(square)
+    by_colour = [[] for _ in range(classes)]
+    for (colour, _), block in blocks.items():
+        by_colour[colour].append(block)
+
+    best = None
+    for arrangement in product(*(permutations(colour_blocks) for colour_blocks in by_colour)):
+        permutation = [0] * k
+        order = (square for colour_blocks in arrangement for block in colour_blocks for square in block)
+        for position, square in enumerate(order):
+            permutation[square] = position
+        relabeled = tuple(tuple(sorted(permute_set(s, permutation) for s in family)) for family in families)
+        if best is None or relabeled < best[0]:
+            best = (relabeled, permutation)
+
+    (mine_sets, their_sets), permutation = best
+    key = bytes((k, len(mine_sets))) + b''.join(s.to_bytes(SET_BYTES, 'little') for s in mine_sets + their_sets)
+    return key, tuple(permutation)
+
+
+def random_position(rng, empties):
+    """
+    Random position with no completed line, as reached by alternate play
+    :param rng: random.Random
+    :param empties: Number of empty squares
+    :return: Tuple of (bitboard of the side to move, bitboard of the other side)
+    """
+    while True:
+        cells = rng.sample(range(CELLS), CELLS - empties)
+        x = sum(1 << cell for cell in cells[0::2])
+        o = sum(1 << cell for cell in cells[1::2])
+        if not has_won(x) and not has_won(o):
+            return (x, o) if len(cells) % 2 == 0 else (o, x)
+
+
+def play(k, mine, theirs, square):
+    """
+    Claim one square of a residual game
+    :return: None if the move wins, else the game from the opponent's side
+             as (k - 1, their sets, my sets) over the remaining squares
+    """
+    bit = 1 << square
+    if bit in mine:
+        return None
+
+    def drop(s):
+        # Close the gap the claimed square leaves in the numbering
+        low = s & (bit - 1)
+        return low | (s >> 1 & ~(bit - 1))
+
+    my_sets = minimal_sets(frozenset(drop(s & ~bit) for s in mine))
+    their_sets = minimal_sets(frozenset(drop(s) for s in theirs if not s & bit))
+    return k - 1, their_sets, my_sets
+
+
+def solve_tablebase(max_empties=DEFAULT_EMPTIES, samples=DEFAULT_SAMPLES, seed=0):
+    """
+    Solve the residual games of random positions with `max_empties` empty
+    squares, and of every position reachable from them
+    :param max_empties: Empty squares in the sampled positions (at most MAX_EMPTIES)
+    :param samples: Number of random positions
+    :param seed: Random seed, so a table can be regenerated exactly
+    :return: Dictionary of position key -> (score, best canonical square, empty squares),
+             scores relative to the side to move
+    """
+    if not 0 <= max_empties <= MAX_EMPTIES:
+        raise ValueError(f"max_empties must be between 0 and {MAX_EMPTIES}")
+
+    values, keys = {}, {}
+    rng = random.Random(seed)
+    for _ in range(samples):
+        empties, mine, theirs = residual_game(*random_position(rng, max_empties))
+        _solve(len(empties), mine, theirs, values, keys)
+    return values
+
+
+def _solve(k, mine, theirs, values, keys):
+    """
+    Solve a residual game and everything reachable from it, depth first
+    :param keys: Cache of (k, mine, theirs) -> canonical key and permutation
+    :return: Position key of the game
+    """
+    game = (k, mine, theirs)
+    if game not in keys:
+        keys[game] = canonical_game(k, mine, theirs)
+    key, permutation = keys[game]
+    if key in values:
+        return key
+
+    # Solve the canonical relabeling so stored moves are canonical squares
+    mine = frozenset(permute_set(s, permutation) for s in mine)
+    theirs = frozenset(permute_set(s, permutation) for s in theirs)
+    best_score, best_move = (0, -1) if k == 0 else (-WIN_SCORE - 1, -1)
+    for square in range(k):
+        child = play(k, mine, theirs, square)
+        if child is None:
+            best_score, best_move = WIN_SCORE - 1, square
+            break
+
+        score = -values[_solve(*child, values, keys)][0]
+        # One more ply until the game ends
+        if score > WIN_THRESHOLD:
+            score -= 1
+        elif score < -WIN_THRESHOLD:
+            score += 1
+        if score > best_score:
+            best_score, best_move = score, square
+    values[key] = (best_score, best_move, k)
+    return key
+
+
+def generate_tablebase(path, max_empties=DEFAULT_EMPTIES, samples=DEFAULT_SAMPLES, seed=0):
+    """
+    Solve the tablebase and write it to a table file
+    :return: Number of positions written
+    """
+    values = solve_tablebase(max_empties, samples, seed)
+    write_table(path, ((key, score, move, k) for key, (score, move, k) in values.items()), KEY_SIZE)
+    return len(values)
+
+
+class Tablebase:
+    """Exact results for positions with few empty squares, from a memory-mapped file"""
+
+    def __init__(self, path):
+        """
+        :param path: Tablebase file written by generate_tablebase
+        """
+        self.table = MappedTable(path)
+        # Positions with more empty squares are never covered; keys start with
+        # the number of empty squares, so the last record has the most
+        self.max_empties = self.table.record(len(self.table) - 1)[3] if len(self.table) else -1
+
+    def __len__(self):
+        return len(self.table)
+
+    def probe(self, me, opp):
+        """
+        Look up a position with no completed line
+        :param me: Bitboard of the side to move
+        :param opp: Bitboard of the other side
+        :return: Tuple of (score for the side to move, best cell), or None when not covered
+                 (positions with more than max_empties empty squares, or not reachable from
+                 the sampled ones)
+        """
+        if bin(FULL & ~(me | opp)).count('1') > self.max_empties:
+            return None
+
+        empties, mine, theirs = residual_game(me, opp)
+        key, permutation = canonical_game(len(empties), mine, theirs)
+        record = self.table.get(key)
+        if record is None:
+            return None
+
+        score, move, _ = record
+        if move < 0:
+            return score, None
+        return score, empties[permutation.index(move)]
+
+    def close(self):
+        self.table.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the tic-tac-toe endgame tablebase")
+    parser.add_argument('output', help="Tablebase file to write")
+    parser.add_argument('--empties', type=int, default=DEFAULT_EMPTIES,
+                        help=f"Largest number of empty squares (at most {MAX_EMPTIES})")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help="Random positions with that many empty squares to solve from")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    count = generate_tablebase(args.output, args.empties, args.samples, args.seed)
+    print(f"Wrote {count} positions to {args.output}")
@@ -0,0 +1,137 @@
+import random
+import time
+import numpy as np
+from .distance_matrix import as_distance_matrix
+from .genetic import PopulationEngine
+from .local_search import CANDIDATES, candidate_lists, improve_tour, make_polisher, nearest_neighbour_route, rotate_to_home
+
+ANYTIME_ALGORITHMS = ('genetic', 'local_search')
+
+# Longest deadline a streaming request may ask for, in seconds
+MAX_TIME_LIMIT = 30
+
+# Seconds without an improvement before a streaming consumer is sent a heartbeat
+HEARTBEAT_INTERVAL = 1.0
+
+
+def anytime_tsp(cities, distances, algorithm='genetic', time_limit=5.0, seed=None, stats=None, heartbeat=None,
+                **options):
+    """
+    Run a heuristic solver until a deadline, yielding every improvement
+    Stopping the generator (e.g. when a streaming client disconnects)
+    stops the search. A stream only notices a disconnect when it writes,
+    so with `heartbeat` set, (None, None, elapsed) is yielded whenever that
+    many seconds pass without an improvement.
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param algorithm: 'genetic' or 'local_search'
+    :param time_limit: Seconds before the search stops
+    :param seed: Optional random seed
+    :param stats: Optional dict, filled with iterations and stop_reason
+    :param heartbeat: Optional seconds between heartbeats while the search stalls
+    :param options: Extra genetic options (population_size, mutation_rate, generations, local_search)
+    :return: Generator of (route, distance, elapsed seconds) tuples, each shorter than the last,
+             plus heartbeats when requested
+    """
+    if algorithm not in ANYTIME_ALGORITHMS:
+        raise ValueError(f"algorithm must be one of: {', '.join(ANYTIME_ALGORITHMS)}")
+
+    start = time.perf_counter()
+    deadline = start + time_limit
+    stats = stats if stats is not None else {}
+    stats.update(iterations=0, stop_reason='deadline')
+
+    if len(cities) <= 1:
+        stats['stop_reason'] = 'converged'
+        yield cities, 0, 0.0
+        return
+
+    matrix = as_distance_matrix(cities, distances)
+    if len(cities) <= 3:
+        # Every route is optimal (or its own mirror image)
+        stats['stop_reason'] = 'converged'
+        route = list(range(len(cities))) + [0]
+        yield matrix.labels(route), matrix.route_length(route), time.perf_counter() - start
+        return
+
+    if algorithm == 'genetic':
+        search = _genetic_improvements(matrix, deadline, seed, stats, **options)
+    else:
+        search = _iterated_local_search(matrix, deadline, seed, stats)
+
+    last_yield = start
+    for improvement in search:
+        now = time.perf_counter()
+        if improvement is not None:
+            order, _ = improvement
+            route = [0] + order + [0]
+            last_yield = now
+            yield matrix.labels(route), matrix.route_length(route), now - start
+        elif heartbeat is not None and now - last_yield >= heartbeat:
+            last_yield = now
+            yield None, None, now - start
+
+
+def _genetic_improvements(matrix, deadline, seed, stats, population_size=100, mutation_rate=0.05,
+                          generations=None, local_search=False):
+    """Evolve a population, yielding (order, length) whenever the best route improves and None otherwise"""
+    polish = make_polisher(matrix.rows) if local_search else None
+    engine = PopulationEngine(matrix.array, population_size, mutation_rate, np.random.default_rng(seed), polish=polish)
+
+    order, best = engine.best()
+    yield order, best
+    while time.perf_counter() < deadline:
+        if generations is not None and stats['iterations'] >= generations:
+            stats['stop_reason'] = 'generations'
+            return
+        engine.step()
+        stats['iterations'] += 1
+        order, length = engine.best()
+        if length < best:
+            best = length
+            yield order, length
+        else:
+            yield None
+
+
+def _iterated_local_search(matrix, deadline, seed, stats):
+    """
+    Local search restarted from double-bridge kicks of the best tour,
+    yielding (order, length) whenever the best route improves and None
+    after every other kick
+    """
+    rows = matrix.rows
+    rng = random.Random(seed)
+    nearest = candidate_lists(rows, len(rows) - 1)
+    neighbours = [row[:CANDIDATES] for row in nearest]
+
+    tour = nearest_neighbour_route(rows, nearest)[:-1]
+    best = matrix.route_length(tour + tour[:1])
+    yield rotate_to_home(tour)[1:], best
+
+    tour = improve_tour(tour, rows, neighbours)
+    length = matrix.route_length(tour + tour[:1])
+    if length < best:
+        best = length
+        yield rotate_to_home(tour)[1:], best
+
+    # Double-bridge kicks need at least 8 cities to change anything
+    if len(tour) < 8:
+        stats['stop_reason'] = 'converged'
+        return
+
+    while time.perf_counter() < deadline:
+        candidate = improve_tour(_double_bridge(tour, rng), rows, neighbours)
+        stats['iterations'] += 1
+        length = matrix.route_length(candidate + candidate[:1])
+        if length < best:
+            tour, best = candidate, length
+            yield rotate_to_home(tour)[1:], best
+        else:
+            yield None
+
+
+def _double_bridge(tour, rng):
+    """Cut the tour into A B C D and reconnect it as A C B D"""
+    a, b, c = sorted(rng.sample(range(1, len(tour)), 3))
+    return tour[:a] + tour[b:c] + tour[a:b] + tour[c:]
@@ -0,0 +1,96 @@
+from .distance_matrix import as_distance_matrix
+from .local_search import CANDIDATES, improve_tour, nearest_neighbour_route, rotate_to_home
+
+# Maximum number of cached spanning-tree weights (keyed by unvisited subset)
+MST_CACHE_SIZE = 500000
+
+
+def branch_and_bound_tsp(cities, distances, stats=None):
+    """
+    Solve TSP exactly using depth-first branch and bound
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param stats: Optional dict, filled with nodes_expanded and nodes_pruned
+    :return: Tuple of (optimal route, optimal distance)
+    """
+    if len(cities) <= 1:
+        return cities, 0
+
+    matrix = as_distance_matrix(cities, distances)
+    rows = matrix.rows
+    n = len(cities)
+
+    # Children are tried nearest-first
+    nearest = [sorted((j for j in range(n) if j != i), key=rows[i].__getitem__) for i in range(n)]
+
+    # Seed the incumbent with a locally optimized nearest neighbour tour
+    tour = improve_tour(nearest_neighbour_route(rows, nearest)[:-1], rows,
+                        [row[:CANDIDATES] for row in nearest])
+    best_route = rotate_to_home(tour) + [0]
+    best = [matrix.route_length(best_route), best_route]
+    counters = {'nodes_expanded': 0, 'nodes_pruned': 0}
+    mst_cache = {}
+
+    def spanning_tree(unvisited):
+        """Weight of a minimum spanning tree over the unvisited cities (Prim)"""
+        weight = mst_cache.get(unvisited)
+        if weight is not None:
+            return weight
+
+        members = [i for i in range(n) if unvisited >> i & 1]
+        weight = 0
+        closest = {city: rows[members[0]][city] for city in members[1:]}
+        while closest:
+            city = min(closest, key=closest.get)
+            weight += closest.pop(city)
+            row = rows[city]
+            for other in closest:
+                if row[other] < closest[other]:
+                    closest[other] = row[other]
+
+        if len(mst_cache) < MST_CACHE_SIZE:
+            mst_cache[unvisited] = weight
+        return weight
+
+    def lower_bound(last, unvisited, cost):
+        """
+        The rest of the tour is a path last -> (all unvisited) -> home, so it
+        costs at least the MST of the unvisited cities plus the cheapest edge
+        leaving `last` and the cheapest edge back home
+        """
+        enter = next(rows[last][i] for i in nearest[last] if unvisited >> i & 1)
+        leave = next(rows[0][i] for i in nearest[0] if unvisited >> i & 1)
+        return cost + spanning_tree(unvisited) + enter + leave
+
+    route = [0]
+
+    def search(last, unvisited, cost):
+        if not unvisited:
+            total = cost + rows[last][0]
+            if total < best[0]:
+                best[0], best[1] = total, route + [0]
+            return
+
+        counters['nodes_expanded'] += 1
+        for city in nearest[last]:
+            if not unvisited >> city & 1:
+                continue
+
+            remaining = unvisited & ~(1 << city)
+            child_cost = cost + rows[last][city]
+            bound = lower_bound(city, remaining, child_cost) if remaining else child_cost + rows[city][0]
+            if bound >= best[0]:
+                counters['nodes_pruned'] += 1
+                continue
+
+            route.append(city)
+            search(city, remaining, child_cost)
+            route.pop()
+
+    search(0, ((1 << n) - 1) & ~1, 0)
+
+    if stats is not None:
+        stats.update(counters)
+
+    return matrix.labels(best[1]), best[0]
+
@@ -1,33 +1,105 @@
-import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .distance_matrix import as_distance_matrix
+from .local_search import nearest_neighbour_route
 
-def brute_force_tsp(cities, distances):
+# Below this many cities the search finishes before a process pool starts up
+PARALLEL_MIN_CITIES = 10
+
+def brute_force_tsp(cities, distances, workers=None):
     """
     Solve TSP using brute force (exhaustive search)
+    Routes are enumerated depth-first, each mirror-image pair only once, and
+    a branch is abandoned as soon as its prefix is no shorter than the best
+    route found so far.
     :param cities: List of cities to visit (including home city)
-    :param distances: Dictionary of distances between cities
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param workers: Number of processes to split the search over (defaults to CPU count)
     :return: Tuple of (optimal route, optimal distance)
     """
     if len(cities) <= 1:
         return cities, 0
-    
-    home = cities[0]
-    other_cities = cities[1:]
-    min_distance = float('inf')
-    best_route = None
-    
-    # Generate all possible permutations of the cities
-    for permutation in itertools.permutations(other_cities):
-        current_route = [home] + list(permutation) + [home]
-        current_distance = 0
-        
-        # Calculate total distance for this route
-        for i in range(len(current_route) - 1):
-            key = f"{current_route[i]}-{current_route[i+1]}"
-            current_distance += distances[key]
-        
-        # Update best route if this one is better
-        if current_distance < min_distance:
-            min_distance = current_distance
-            best_route = current_route
-    
-    return best_route, min_distance
\ No newline at end of file
+
+    matrix = as_distance_matrix(cities, distances)
+    rows = matrix.rows
+    n = len(cities)
+
+    # Start from a nearest neighbour route; the search only reports routes beating it
+    nearest = [sorted((j for j in range(n) if j != i), key=rows[i].__getitem__) for i in range(n)]
+    best_route = nearest_neighbour_route(rows, nearest)
+    min_distance = matrix.route_length(best_route)
+
+    # With one or two other cities every route is its own mirror image
+    if n <= 3:
+        return matrix.labels(best_route), min_distance
+
+    # Partition the search space by the city visited after home
+    bound = min_distance
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and n >= PARALLEL_MIN_CITIES:
+        with ProcessPoolExecutor(max_workers=min(workers, n - 1)) as pool:
+            results = list(pool.map(search_branch, [rows] * (n - 1), range(1, n), [bound] * (n - 1)))
+    else:
+        results = []
+        for first in range(1, n):
+            results.append(search_branch(rows, first, bound))
+            bound = min(bound, results[-1][0])
+
+    for distance, route in results:
+        if route is not None and distance < min_distance:
+            min_distance, best_route = distance, route
+
+    return matrix.labels(best_route), min_distance
+
+
+def search_branch(rows, first, bound):
+    """
+    Exhaustively search the routes that start home -> first
+    Only the orientation whose last city has a higher id than `first` is
+    visited, which skips the mirror image of every route.
+    :param rows: Distance matrix rows (home city is id 0)
+    :param first: City visited straight after home
+    :param bound: Only routes strictly shorter than this are reported
+    :return: Tuple of (distance, route) of the best route found, or (bound, None)
+    """
+    n = len(rows)
+    best = [bound, None]
+    route = [0, first]
+    visited = [False] * n
+    visited[0] = visited[first] = True
+
+    # Every city still to visit is entered through at least its cheapest edge
+    cheapest = [min(row[j] for j in range(n) if j != i) for i, row in enumerate(rows)]
+    nearest = [sorted(range(1, n), key=row.__getitem__) for row in rows]
+
+    def extend(last, cost, depth, above, remaining):
+        if depth == n:
+            total = cost + rows[last][0]
+            if last > first and total < best[0]:
+                best[0], best[1] = total, route + [0]
+            return
+
+        # The last city must have a higher id than `first`; give up once none is left
+        if not above:
+            return
+
+        row = rows[last]
+        for city in nearest[last]:
+            if visited[city]:
+                continue
+
+            # Prefix cost only grows, so a prefix that cannot beat the best route is a dead end
+            current_cost = cost + row[city]
+            if current_cost + remaining - cheapest[city] >= best[0]:
+                continue
+
+            visited[city] = True
+            route.append(city)
+            extend(city, current_cost, depth + 1, above - (city > first), remaining - cheapest[city])
+            route.pop()
+            visited[city] = False
+
+    # `remaining` covers the unvisited cities plus the final edge back home
+    remaining = sum(cheapest[city] for city in range(n) if not visited[city]) + cheapest[0]
+    extend(first, rows[0][first], 2, n - 1 - first, remaining)
+    return best[0], best[1]
@@ -0,0 +1,200 @@
+import hashlib
+import numpy as np
+
+# Largest instance whose remaining ties DistanceMatrix.canonical searches out,
+# and the most orderings of tied cities it compares before keeping the smallest seen
+CANONICAL_SEARCH_CITIES = 32
+CANONICAL_LEAVES = 120
+
+
+class DistanceMatrix:
+    """
+    Dense symmetric distance matrix over integer city ids.
+    City i is cities[i]; rows[i][j] is the distance between cities i and j.
+    """
+
+    def __init__(self, cities, rows):
+        """
+        :param cities: List of city labels, in id order
+        :param rows: Square list of lists of distances
+        """
+        self.cities = list(cities)
+        self.rows = [list(row) for row in rows]
+        self._ids = {city: i for i, city in enumerate(self.cities)}
+        self._array = None
+
+        n = len(self.cities)
+        if len(self._ids) != n:
+            raise ValueError("City labels must be unique")
+        if len(self.rows) != n or any(len(row) != n for row in self.rows):
+            raise ValueError(f"Distance matrix must be {n}x{n}")
+
+        for i in range(n):
+            self.rows[i][i] = 0
+            for j in range(i + 1, n):
+                if self.rows[i][j] is None or self.rows[j][i] is None:
+                    raise ValueError(f"Missing distance between {self.cities[i]} and {self.cities[j]}")
+                if self.rows[i][j] != self.rows[j][i]:
+                    raise ValueError(f"Distance between {self.cities[i]} and {self.cities[j]} is not symmetric")
+
+    @classmethod
+    def from_dict(cls, distances, cities=None):
+        """
+        Compile a client distance dictionary into a matrix
+        :param distances: Dictionary of distances keyed "A-B"
+        :param cities: Cities to include, in id order (defaults to every city in the keys, sorted)
+        :return: DistanceMatrix
+        """
+        if cities is None:
+            cities = sorted({city for key in distances for city in key.split('-', 1)})
+
+        rows = [[None] * len(cities) for _ in cities]
+        for i, a in enumerate(cities):
+            for j, b in enumerate(cities):
+                if i == j:
+                    continue
+                # Either direction is enough; the other is checked for symmetry if present
+                value = distances.get(f"{a}-{b}", distances.get(f"{b}-{a}"))
+                rows[i][j] = value
+        return cls(cities, rows)
+
+    def __len__(self):
+        return len(self.cities)
+
+    def __contains__(self, city):
+        return city in self._ids
+
+    def __getitem__(self, pair):
+        i, j = pair
+        return self.rows[i][j]
+
+    def index(self, city):
+        """Return the integer id of a city label"""
+        return self._ids[city]
+
+    @property
+    def array(self):
+        """The matrix as a float64 NumPy array, built on first use"""
+        if self._array is None:
+            self._array = np.array(self.rows, dtype=np.float64)
+        return self._array
+
+    def subset(self, cities):
+        """
+        Restrict (and reorder) the matrix to the given cities
+        :param cities: City labels, in the new id order
+        :return: DistanceMatrix
+        """
+        ids = [self._ids[city] for city in cities]
+        return DistanceMatrix(cities, [[self.rows[i][j] for j in ids] for i in ids])
+
+    def labels(self, order):
+        """Map a sequence of city ids back to city labels"""
+        return [self.cities[i] for i in order]
+
+    def route_length(self, order):
+        """
+        Total length of a route given as city ids
+        :param order: Sequence of city ids, walked in order (not closed automatically)
+        :return: Route distance
+        """
+        rows = self.rows
+        return sum(rows[order[i]][order[i + 1]] for i in range(len(order) - 1))
+
+    def canonical(self):
+        """
+        Relabeling-invariant form of the instance, with the home city (id 0) fixed.
+        Cities are split into classes by their distance from home and their sorted
+        distance profile, then classes are refined by how far each city is from
+        every class until none splits. On small instances, cities still tied are
+        singled out in turn and the smallest resulting matrix is kept; the key
+        hashes the matrix in that order, so equal keys always mean the same
+        instance up to relabeling.
+        :return: Tuple of (key, order) where order[k] is the city id at canonical position k
+        """
+        rows = self.rows
+        n = len(rows)
+        colours = _refine(rows, _rank([(i != 0, rows[0][i], tuple(sorted(rows[i]))) for i in range(n)]))
+        if len(set(colours)) < n and n <= CANONICAL_SEARCH_CITIES:
+            order = _smallest_order(rows, colours)
+        else:
+            # Ties left on large instances fall back to id order
+            order = sorted(range(n), key=lambda i: (colours[i], i))
+        body = ';'.join(','.join(repr(rows[i][j]) for j in order) for i in order)
+        return hashlib.sha256(body.encode()).hexdigest(), order
+
+    def to_dict(self):
+        """Convert back to the client's "A-B" dictionary form"""
+        return {f"{a}-{b}": self.rows[i][j]
+                for i, a in enumerate(self.cities)
+                for j, b in enumerate(self.cities) if i != j}
+
+
+def _rank(signatures):
+    """Number the distinct signatures in sorted order and give each city its number"""
+    distinct = sorted(set(signatures))
+    ranks = {signature: rank for rank, signature in enumerate(distinct)}
+    return [ranks[signature] for signature in signatures]
+
+
+def _refine(rows, colours):
+    """
+    Split classes of cities until each city's class, together with the
+    distances to every class, determines its class
+    :param rows: Square distance matrix
+    :param colours: Class number of each city
+    :return: Stable class numbers, ordered consistently with the input classes
+    """
+    n = len(rows)
+    while len(set(colours)) < n:
+        refined = _rank([(colours[i], tuple(sorted((rows[i][j], colours[j]) for j in range(n) if j != i)))
+                         for i in range(n)])
+        if len(set(refined)) == len(set(colours)):
+            break
+        colours = refined
+    return colours
+
+
+def _smallest_order(rows, colours):
+    """
+    Single out tied cities one at a time, refining after each, and return
+    the order giving the smallest matrix among the orderings reached
+    """
+    n = len(rows)
+    best = []
+    leaves = 0
+    # Each entry is a class numbering and the city to single out of its first tied class
+    stack = [(colours, None)]
+    while stack and leaves < CANONICAL_LEAVES:
+        colours, city = stack.pop()
+        if city is not None:
+            tied = colours[city]
+            colours = _refine(rows, _rank([(colour, colour == tied and i != city) for i, colour in enumerate(colours)]))
+
+        counts = {}
+        for colour in colours:
+            counts[colour] = counts.get(colour, 0) + 1
+        tied = min((colour for colour, count in counts.items() if count > 1), default=None)
+        if tied is None:
+            leaves += 1
+            order = sorted(range(n), key=colours.__getitem__)
+            body = [[rows[i][j] for j in order] for i in order]
+            if not best or body < best[0]:
+                best = [body, order]
+        else:
+            stack.extend((colours, i) for i in reversed(range(n)) if colours[i] == tied)
+    return best[1]
+
+
+def as_distance_matrix(cities, distances):
+    """
+    Adapt either distance form to a matrix whose ids follow `cities`
+    :param cities: List of cities to visit (home city first)
+    :param distances: DistanceMatrix or dictionary of distances keyed "A-B"
+    :return: DistanceMatrix with cities[i] at id i
+    """
+    if isinstance(distances, DistanceMatrix):
+        if distances.cities == list(cities):
+            return distances
+        return distances.subset(cities)
+    return DistanceMatrix.from_dict(distances, cities)
@@ -1,75 +1,179 @@
-import itertools
+import numpy as np
+from .distance_matrix import as_distance_matrix
+from .held_karp_disk import held_karp_on_disk
 
+# Upper bound on the in-memory Held-Karp table (float64 cost + int8 parent
+# per entry), roughly 20 cities
+MAX_TABLE_BYTES = 128 * 1024 * 1024
 
-def dynamic_programming_tsp(cities, distances):
+
+def dynamic_programming_tsp(cities, distances, table_dir=None):
     """
     Solve TSP using dynamic programming (Held-Karp algorithm)
     :param cities: List of cities to visit (including home city)
-    :param distances: Dictionary of distances between cities
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param table_dir: Optional directory for memory-mapped tables, used when
+                      the in-memory table would exceed MAX_TABLE_BYTES
     :return: Tuple of (optimal route, optimal distance)
     """
     if len(cities) <= 1:
         return cities, 0
-    
-    home = cities[0]
-    other_cities = cities[1:]
-    n = len(other_cities)
-    
-    # Memoization table: key=(subset, last_city), value=(distance, path)
-    memo = {}
-    
-    # Initialize memo table for subsets of size 1
-    for i, city in enumerate(other_cities):
-        key = (frozenset([city]), city)
-        memo[key] = (distances[f"{home}-{city}"], [home, city])
-    
-    # Iterate through subset sizes from 2 to n
+
+    matrix = as_distance_matrix(cities, distances)
+    weights = matrix.array
+
+    if table_dir is not None and table_size(len(weights) - 1) > MAX_TABLE_BYTES:
+        order = held_karp_on_disk(weights, table_dir)
+    else:
+        cost, parent = held_karp_table(weights)
+        order = reconstruct_order(cost, parent, weights)
+
+    # Table positions are offset by one from matrix ids (home is id 0)
+    route = [0] + [i + 1 for i in order] + [0]
+    return matrix.labels(route), matrix.route_length(route)
+
+
+def held_karp_table(weights):
+    """
+    Build the Held-Karp cost and parent tables over bitmask subsets
+    :param weights: Square distance matrix with the home city at index 0
+    :return: Tuple of (cost, parent) arrays indexed by [subset mask, last city],
+             where bit i of the mask and last city i refer to weights[i + 1]
+    """
+    n = len(weights) - 1
+    check_table_size(n)
+
+    cost = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int8)
+
+    # Subsets of size 1: travel straight from home
+    singles = np.arange(n)
+    cost[1 << singles, singles] = weights[0, 1:]
+
+    fill_layers(cost, parent, weights)
+    return cost, parent
+
+
+def extend_table(cost, parent, weights):
+    """
+    Add one city to filled Held-Karp tables, computing only the subsets that contain it
+    :param cost: Filled cost table over the first len(weights) - 2 non-home cities
+    :param parent: Filled parent table matching `cost`
+    :param weights: Square distance matrix with the home city at index 0 and the new city last
+    :return: Tuple of (cost, parent) tables including the new city as the highest bit
+    """
+    n = cost.shape[1] + 1
+    check_table_size(n)
+
+    new_cost = np.full((1 << n, n), np.inf)
+    new_parent = np.full((1 << n, n), -1, dtype=np.int8)
+
+    # Subsets without the new city are unchanged
+    new_cost[:1 << (n - 1), :n - 1] = cost
+    new_parent[:1 << (n - 1), :n - 1] = parent
+    new_cost[1 << (n - 1), n - 1] = weights[0, n]
+
+    fill_layers(new_cost, new_parent, weights, required_bit=n - 1)
+    return new_cost, new_parent
+
+
+def shrink_table(cost, parent, bit):
+    """
+    Remove one city from filled Held-Karp tables without recomputing anything
+    :param cost: Filled cost table
+    :param parent: Filled parent table
+    :param bit: Table position of the city to remove
+    :return: Tuple of (cost, parent) tables over the remaining cities
+    """
+    n = cost.shape[1]
+    masks = np.arange(1 << n, dtype=np.int64)
+
+    # Subsets without the city, in mask order, compact onto 0 .. 2^(n-1) - 1
+    keep = masks[(masks >> bit) & 1 == 0]
+    columns = [column for column in range(n) if column != bit]
+
+    new_cost = cost[keep][:, columns]
+    new_parent = parent[keep][:, columns]
+    new_parent[new_parent > bit] -= 1
+    return new_cost, new_parent
+
+
+def table_size(n):
+    """Bytes of the in-memory tables over n non-home cities"""
+    return (1 << n) * n * 9
+
+
+def check_table_size(n):
+    """Reject tables over n non-home cities that would exceed MAX_TABLE_BYTES"""
+    table_bytes = table_size(n)
+    if table_bytes > MAX_TABLE_BYTES:
+        raise ValueError(f"Held-Karp table for {n + 1} cities needs {table_bytes} bytes "
+                         f"(limit {MAX_TABLE_BYTES})")
+
+
+def fill_layers(cost, parent, weights, required_bit=None):
+    """
+    Fill the Held-Karp tables layer by layer in order of subset size
+    :param cost: Cost table indexed by [subset mask, last city]
+    :param parent: Parent table indexed by [subset mask, last city]
+    :param weights: Square distance matrix with the home city at index 0
+    :param required_bit: Only (re)compute subsets containing this city bit
+    """
+    n = cost.shape[1]
+    between = weights[1:, 1:]
+
+    masks = np.arange(1 << n, dtype=np.int64)
+    if required_bit is not None:
+        masks = masks[(masks >> required_bit) & 1 == 1]
+    sizes = popcount(masks, n)
+
+    # Group the masks by subset size so each layer only reads the previous one
+    order = np.argsort(sizes, kind='stable')
+    masks, sizes = masks[order], sizes[order]
+    bounds = np.searchsorted(sizes, np.arange(n + 2))
+
     for subset_size in range(2, n + 1):
-        new_memo = {}
-        
-        for subset in itertools.combinations(other_cities, subset_size):
-            subset = frozenset(subset)
-            
-            for last_city in subset:
-                # Initialize min distance for this (subset, last_city)
-                min_dist = float('inf')
-                best_path = None
-                
-                # Try all possible previous cities in the subset
-                for prev_city in subset:
-                    if prev_city == last_city:
-                        continue
-                    
-                    # Previous subset without last_city
-                    prev_subset = subset - {last_city}
-                    key = (prev_subset, prev_city)
-                    
-                    if key in memo:
-                        dist, path = memo[key]
-                        total_dist = dist + distances[f"{prev_city}-{last_city}"]
-                        
-                        if total_dist < min_dist:
-                            min_dist = total_dist
-                            best_path = path + [last_city]
-                
-                if best_path is not None:
-                    new_key = (subset, last_city)
-                    new_memo[new_key] = (min_dist, best_path)
-        
-        memo = new_memo
-    
-    # Find the minimal distance by connecting back to home city
-    min_distance = float('inf')
-    best_route = None
-    
-    for last_city in other_cities:
-        key = (frozenset(other_cities), last_city)
-        if key in memo:
-            dist, path = memo[key]
-            total_dist = dist + distances[f"{last_city}-{home}"]
-            
-            if total_dist < min_distance:
-                min_distance = total_dist
-                best_route = path + [home]
-    
-    return best_route, min_distance
\ No newline at end of file
+        layer = masks[bounds[subset_size]:bounds[subset_size + 1]]
+
+        for last in range(n):
+            subset = layer[(layer >> last) & 1 == 1]
+            if not subset.size:
+                continue
+
+            # Cost of reaching `last` from every possible previous city at once;
+            # cities outside the previous subset are still infinite
+            totals = cost[subset ^ (1 << last)] + between[:, last]
+            best = totals.argmin(axis=1)
+            cost[subset, last] = totals[np.arange(len(subset)), best]
+            parent[subset, last] = best
+
+
+def reconstruct_order(cost, parent, weights):
+    """
+    Walk the parent table back from the full subset
+    :param cost: Filled Held-Karp cost table
+    :param parent: Filled Held-Karp parent table
+    :param weights: Square distance matrix with the home city at index 0
+    :return: Visiting order as indices into the non-home cities
+    """
+    n = cost.shape[1]
+    mask = (1 << n) - 1
+    last = int(np.argmin(cost[mask] + weights[1:, 0]))
+
+    order = []
+    while last >= 0:
+        order.append(last)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+
+    order.reverse()
+    return order
+
+
+def popcount(values, bits):
+    """Count the set bits of every mask in an integer array"""
+    counts = np.zeros_like(values)
+    for bit in range(bits):
+        counts += (values >> bit) & 1
+    return counts
@@ -0,0 +1,323 @@
+import math
+import numpy as np
+from .local_search import CANDIDATES, improve_tour, rotate_to_home
+
+CONSTRUCTIONS = ('nearest_neighbour', 'greedy', 'space_filling_curve')
+
+# Largest coordinate instance (cities including home) accepted on request
+MAX_EUCLIDEAN_CITIES = 5000
+
+# Cities per grid cell the spatial index aims for
+CELL_OCCUPANCY = 2
+
+# Resolution of the Hilbert curve used by the space-filling construction
+HILBERT_ORDER = 16
+
+
+def euclidean_tsp(cities, points, construction='greedy', local_search=True, candidates=CANDIDATES):
+    """
+    Solve TSP on cities placed in the plane, without building a distance matrix
+    :param cities: List of cities to visit (including home city)
+    :param points: List of (x, y) coordinates, one per city
+    :param construction: 'nearest_neighbour', 'greedy' or 'space_filling_curve'
+    :param local_search: Polish the constructed tour with 2-opt and Or-opt
+    :param candidates: Number of nearest neighbours considered per city
+    :return: Tuple of (best route, best distance)
+    """
+    if construction not in CONSTRUCTIONS:
+        raise ValueError(f"construction must be one of: {', '.join(CONSTRUCTIONS)}")
+    if len(cities) <= 1:
+        return cities, 0
+
+    instance = EuclideanInstance(cities, points)
+    if construction == 'nearest_neighbour':
+        tour = nearest_neighbour_tour(instance)
+    elif construction == 'greedy':
+        tour = greedy_edge_tour(instance, candidates)
+    else:
+        tour = space_filling_curve_tour(instance)
+
+    if local_search:
+        tour = improve_tour(tour, instance.rows, instance.neighbours(candidates))
+
+    route = rotate_to_home(tour) + [0]
+    return instance.labels(route), instance.route_length(route)
+
+
+class EuclideanInstance:
+    """
+    Cities at planar coordinates. Distances are computed on demand, and
+    `rows` mimics DistanceMatrix rows so the local search runs unchanged.
+    """
+
+    def __init__(self, cities, points):
+        """
+        :param cities: List of city labels, in id order
+        :param points: List of (x, y) coordinates, one per city
+        """
+        self.cities = list(cities)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self._ids = {city: i for i, city in enumerate(self.cities)}
+        self._grid = None
+
+        if len(self._ids) != len(self.cities):
+            raise ValueError("City labels must be unique")
+        if len(self.points) != len(self.cities):
+            raise ValueError("Every city needs exactly one (x, y) point")
+        if not np.isfinite(self.points).all():
+            raise ValueError("Coordinates must be finite numbers")
+
+        xs, ys = self.points[:, 0].tolist(), self.points[:, 1].tolist()
+        self.rows = [_DistanceRow(xs, ys, i) for i in range(len(xs))]
+
+    def __len__(self):
+        return len(self.cities)
+
+    def __contains__(self, city):
+        return city in self._ids
+
+    def __getitem__(self, pair):
+        i, j = pair
+        return self.rows[i][j]
+
+    def index(self, city):
+        """Return the integer id of a city label"""
+        return self._ids[city]
+
+    @property
+    def grid(self):
+        """Spatial index over every city, built on first use"""
+        if self._grid is None:
+            self._grid = SpatialGrid(self.points)
+        return self._grid
+
+    def neighbours(self, k):
+        """
+        For each city, the k nearest other cities, closest first
+        :param k: Candidates per city
+        :return: List of candidate lists indexed by city id
+        """
+        grid = self.grid
+        return [grid.nearest(i, k) for i in range(len(self.cities))]
+
+    def labels(self, order):
+        """Map a sequence of city ids back to city labels"""
+        return [self.cities[i] for i in order]
+
+    def route_length(self, order):
+        """
+        Total length of a route given as city ids
+        :param order: Sequence of city ids, walked in order (not closed automatically)
+        :return: Route distance
+        """
+        if len(order) < 2:
+            return 0
+        steps = np.diff(self.points[list(order)], axis=0)
+        return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
+
+
+class _DistanceRow:
+    """Distances from one city, computed when indexed"""
+
+    __slots__ = ('xs', 'ys', 'x', 'y')
+
+    def __init__(self, xs, ys, i):
+        self.xs, self.ys = xs, ys
+        self.x, self.y = xs[i], ys[i]
+
+    def __getitem__(self, j):
+        return math.hypot(self.xs[j] - self.x, self.ys[j] - self.y)
+
+
+class SpatialGrid:
+    """
+    Uniform bucket grid over a point set, sized for a few points per cell.
+    Supports k-nearest queries and removing points (for greedy walks).
+    """
+
+    def __init__(self, points):
+        """
+        :param points: NumPy array of (x, y) coordinates
+        """
+        self.xs, self.ys = points[:, 0].tolist(), points[:, 1].tolist()
+        self.size = len(points)
+
+        low, high = points.min(axis=0), points.max(axis=0)
+        width, height = (high - low).tolist()
+        # Collinear cities still get about one cell per city along the line
+        area = max(width * height, max(width, height) ** 2 / len(points))
+        self.cell = max(math.sqrt(area * CELL_OCCUPANCY / len(points)), 1e-9)
+
+        columns = ((points - low) // self.cell).astype(np.int64)
+        self.shape = tuple(int(v) + 1 for v in columns.max(axis=0))
+        self.cell_of = [tuple(column) for column in columns.tolist()]
+        self.cells = {}
+        for i, key in enumerate(self.cell_of):
+            self.cells.setdefault(key, []).append(i)
+
+    def remove(self, i):
+        """Remove point i from the index"""
+        self.cells[self.cell_of[i]].remove(i)
+        self.size -= 1
+
+    def nearest(self, i, k):
+        """
+        The k nearest indexed points to point i (excluding i), closest first
+        Cells are scanned in growing square rings; the search stops once no
+        unscanned ring can hold anything closer than the k-th point found.
+        """
+        x, y = self.xs[i], self.ys[i]
+        cx, cy = self.cell_of[i]
+        found = []
+        limit = max(self.shape)
+
+        for radius in range(limit + 1):
+            for key in _ring(cx, cy, radius):
+                for j in self.cells.get(key, ()):
+                    if j != i:
+                        found.append((math.hypot(self.xs[j] - x, self.ys[j] - y), j))
+
+            # Anything outside the rings scanned so far is at least this far away
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= radius * self.cell:
+                    break
+
+        found.sort()
+        return [j for _, j in found[:k]]
+
+
+def _ring(cx, cy, radius):
+    """Grid cells at Chebyshev distance `radius` from (cx, cy)"""
+    if radius == 0:
+        yield cx, cy
+        return
+    for dx in range(-radius, radius + 1):
+        yield cx + dx, cy - radius
+        yield cx + dx, cy + radius
+    for dy in range(-radius + 1, radius):
+        yield cx - radius, cy + dy
+        yield cx + radius, cy + dy
+
+
+def nearest_neighbour_tour(instance):
+    """
+    Walk from the home city (id 0) to the nearest unvisited city each step
+    :param instance: EuclideanInstance
+    :return: Cyclic tour as a list of city ids
+    """
+    grid = SpatialGrid(instance.points)
+    tour = [0]
+    while grid.size > 1:
+        current = tour[-1]
+        following = grid.nearest(current, 1)[0]
+        grid.remove(current)
+        tour.append(following)
+    return tour
+
+
+def greedy_edge_tour(instance, candidates=CANDIDATES):
+    """
+    Add candidate edges shortest first, skipping any that would give a city
+    a third edge or close a cycle early, then join the remaining fragments
+    :param instance: EuclideanInstance
+    :param candidates: Nearest neighbours per city offered as edges
+    :return: Cyclic tour as a list of city ids
+    """
+    n = len(instance)
+    if n <= 3:
+        return list(range(n))
+
+    rows = instance.rows
+    edges = sorted({(rows[i][j], min(i, j), max(i, j))
+                    for i, near in enumerate(instance.neighbours(candidates)) for j in near})
+
+    links = [[] for _ in range(n)]
+    fragment = list(range(n))
+
+    def find(i):
+        while fragment[i] != i:
+            fragment[i] = fragment[fragment[i]]
+            i = fragment[i]
+        return i
+
+    for _, i, j in edges:
+        if len(links[i]) < 2 and len(links[j]) < 2 and find(i) != find(j):
+            links[i].append(j)
+            links[j].append(i)
+            fragment[find(i)] = find(j)
+
+    chains = _chains(links)
+    return _join_chains(chains, rows)
+
+
+def _chains(links):
+    """Split a graph of paths (every degree at most 2, no cycles) into lists"""
+    seen = set()
+    chains = []
+    for start in range(len(links)):
+        if start in seen or len(links[start]) == 2:
+            continue
+        chain, previous, current = [], None, start
+        while current is not None:
+            chain.append(current)
+            seen.add(current)
+            following = [city for city in links[current] if city != previous]
+            previous, current = current, (following[0] if following else None)
+        chains.append(chain)
+    return chains
+
+
+def _join_chains(chains, rows):
+    """Link path fragments into one tour, always to the nearest free endpoint"""
+    tour = chains.pop(next(k for k, chain in enumerate(chains) if 0 in chain))
+    while chains:
+        tail = tour[-1]
+        k, reverse = min(((k, reverse) for k in range(len(chains)) for reverse in (False, True)),
+                         key=lambda pick: rows[tail][chains[pick[0]][-1 if pick[1] else 0]])
+        chain = chains.pop(k)
+        tour.extend(reversed(chain) if reverse else chain)
+    return tour
+
+
+def space_filling_curve_tour(instance):
+    """
+    Visit cities in the order of a Hilbert curve through the bounding box
+    :param instance: EuclideanInstance
+    :return: Cyclic tour as a list of city ids
+    """
+    points = instance.points
+    low = points.min(axis=0)
+    span = max(float((points.max(axis=0) - low).max()), 1e-12)
+    side = 1 << HILBERT_ORDER
+    cells = np.minimum(((points - low) / span * side).astype(np.int64), side - 1)
+    keys = hilbert_index(cells[:, 0], cells[:, 1], HILBERT_ORDER)
+    return np.argsort(keys, kind='stable').tolist()
+
+
+def hilbert_index(x, y, order):
+    """
+    Distance along a Hilbert curve of every (x, y) cell, vectorized
+    :param x: Integer array of column coordinates in [0, 2^order)
+    :param y: Integer array of row coordinates in [0, 2^order)
+    :param order: Curve order (the grid is 2^order cells wide)
+    :return: Integer array of curve positions
+    """
+    x, y = x.copy(), y.copy()
+    index = np.zeros_like(x)
+    last = (1 << order) - 1
+    s = 1 << (order - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+
+        # Rotate the quadrant so the sub-curve has the standard orientation
+        flip = ~ry & rx
+        x = np.where(flip, last - x, x)
+        y = np.where(flip, last - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return index
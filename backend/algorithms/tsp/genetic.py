@@ -1,106 +1,193 @@
-import random
+import numpy as np
+from .distance_matrix import as_distance_matrix
+from .local_search import EPSILON, make_polisher
 
-def genetic_algorithm_tsp(cities, distances, population_size=50, generations=100, mutation_rate=0.01):
+# Diversity band the adaptive mode steers the population into
+LOW_DIVERSITY = 0.15
+HIGH_DIVERSITY = 0.5
+
+# Limits on the adapted parameters
+MAX_MUTATION_RATE = 0.5
+MIN_PRESSURE = 0.5
+MAX_PRESSURE = 4.0
+
+def genetic_algorithm_tsp(cities, distances, population_size=50, generations=100, mutation_rate=0.01, seed=None,
+                          local_search=False, adaptive=False, patience=40, stats=None):
     """
     Solve TSP using a genetic algorithm
     :param cities: List of cities to visit (including home city)
-    :param distances: Dictionary of distances between cities
+    :param distances: DistanceMatrix or dictionary of distances between cities
     :param population_size: Number of individuals in each generation
-    :param generations: Number of generations to evolve
-    :param mutation_rate: Probability of mutation
+    :param generations: Number of generations to evolve (an upper bound in adaptive mode)
+    :param mutation_rate: Probability of mutation (the starting rate in adaptive mode)
+    :param seed: Optional random seed for reproducible runs
+    :param local_search: Polish routes with 2-opt/Or-opt every generation (memetic GA)
+    :param adaptive: Adjust mutation and selection pressure to the population
+                     diversity, and stop once the best route stalls
+    :param patience: Generations without improvement before an adaptive run stops
+    :param stats: Optional dict, filled with generations and stop_reason
     :return: Tuple of (best route, best distance)
     """
+    stats = stats if stats is not None else {}
+    stats.update(generations=0, stop_reason='generations')
     if len(cities) <= 1:
         return cities, 0
-    
-    home = cities[0]
-    other_cities = cities[1:]
-    
-    # Fitness function (inverse of route distance)
-    def calculate_fitness(route):
-        total_distance = 0
-        for i in range(len(route) - 1):
-            key = f"{route[i]}-{route[i+1]}"
-            total_distance += distances[key]
-        return 1 / total_distance
-    
-    # Create initial population
-    def create_individual():
-        individual = [home] + random.sample(other_cities, len(other_cities)) + [home]
-        return individual
-    
-    population = [create_individual() for _ in range(population_size)]
-    
+
+    matrix = as_distance_matrix(cities, distances)
+    polish = make_polisher(matrix.rows) if local_search else None
+    engine = PopulationEngine(matrix.array, population_size, mutation_rate, np.random.default_rng(seed), polish=polish)
+
     # Evolve the population
+    best, stalled = engine.lengths.min(), 0
     for _ in range(generations):
-        # Evaluate fitness
-        fitnesses = [calculate_fitness(individual) for individual in population]
-        total_fitness = sum(fitnesses)
-        probabilities = [f / total_fitness for f in fitnesses]
-        
-        # Select parents (roulette wheel selection)
-        parents = []
-        for _ in range(population_size):
-            r = random.random()
-            cumulative_probability = 0
-            for i, prob in enumerate(probabilities):
-                cumulative_probability += prob
-                if r <= cumulative_probability:
-                    parents.append(population[i])
-                    break
-        
-        # Crossover (ordered crossover)
-        new_population = []
-        for i in range(0, population_size, 2):
-            parent1, parent2 = parents[i], parents[i+1]
-            
-            # Select crossover points (excluding home cities)
-            start, end = sorted(random.sample(range(1, len(other_cities) + 1), 2))
-            
-            # Create child1
-            child1 = [None] * (len(other_cities) + 2)
-            child1[0] = child1[-1] = home
-            child1[start:end] = parent1[start:end]
-            
-            # Fill remaining cities from parent2 in order
-            remaining = [city for city in parent2[1:-1] if city not in child1[start:end]]
-            ptr = 1
-            for city in remaining:
-                while ptr < len(child1) - 1 and child1[ptr] is not None:
-                    ptr += 1
-                if ptr >= len(child1) - 1:
-                    break
-                child1[ptr] = city
-                ptr += 1
-            
-            # Create child2 similarly
-            child2 = [None] * (len(other_cities) + 2)
-            child2[0] = child2[-1] = home
-            child2[start:end] = parent2[start:end]
-            
-            remaining = [city for city in parent1[1:-1] if city not in child2[start:end]]
-            ptr = 1
-            for city in remaining:
-                while ptr < len(child2) - 1 and child2[ptr] is not None:
-                    ptr += 1
-                if ptr >= len(child2) - 1:
-                    break
-                child2[ptr] = city
-                ptr += 1
-            
-            new_population.extend([child1, child2])
-        
-        # Mutation (swap mutation)
-        for i in range(len(new_population)):
-            if random.random() < mutation_rate:
-                # Select two random positions (excluding home cities) to swap
-                idx1, idx2 = random.sample(range(1, len(other_cities) + 1), 2)
-                new_population[i][idx1], new_population[i][idx2] = new_population[i][idx2], new_population[i][idx1]
-        
-        population = new_population
-    
-    # Find the best individual in the final population
-    best_individual = min(population, key=lambda x: calculate_fitness(x))
-    best_distance = 1 / calculate_fitness(best_individual)
-    
-    return best_individual, best_distance
\ No newline at end of file
+        engine.step()
+        stats['generations'] += 1
+        if not adaptive:
+            continue
+
+        adapt_parameters(engine, mutation_rate)
+        if engine.lengths.min() < best - EPSILON:
+            best, stalled = engine.lengths.min(), 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                stats['stop_reason'] = 'converged'
+                break
+
+    # Home (id 0) is implicit at both ends of every individual
+    order, _ = engine.best()
+    best_route = [0] + order + [0]
+
+    return matrix.labels(best_route), matrix.route_length(best_route)
+
+
+class PopulationEngine:
+    """
+    Genetic algorithm population held as a 2-D array of city-id permutations.
+    Each row lists the non-home cities in visiting order; the home city
+    (id 0) is implicit at both ends of every route.
+    """
+
+    def __init__(self, weights, population_size, mutation_rate, rng, population=None, polish=None, pressure=1.0):
+        """
+        :param weights: Square NumPy distance matrix with the home city at index 0
+        :param population_size: Number of individuals in each generation
+        :param mutation_rate: Probability of mutation per individual
+        :param rng: numpy.random.Generator driving every random choice
+        :param population: Optional initial population array to start from
+        :param polish: Optional local search applied to a few routes each generation
+        :param pressure: Selection pressure; fitness is (shortest length / length) ** pressure
+        """
+        self.weights = weights
+        self.mutation_rate = mutation_rate
+        self.pressure = pressure
+        self.rng = rng
+        self.polish = polish
+
+        if population is None:
+            cities = np.arange(1, len(weights), dtype=np.int64)
+            population = rng.permuted(np.tile(cities, (max(population_size, 2), 1)), axis=1)
+        self.population = population
+        self.lengths = self.route_lengths(population)
+
+    def route_lengths(self, population):
+        """Length of every route in one vectorized gather-and-sum"""
+        weights = self.weights
+        return (weights[0, population[:, 0]]
+                + weights[population[:, :-1], population[:, 1:]].sum(axis=1)
+                + weights[population[:, -1], 0])
+
+    def select(self, count):
+        """Roulette wheel selection of `count` parents (fitness is inverse length)"""
+        cumulative = np.cumsum((self.lengths.min() / self.lengths) ** self.pressure)
+        picks = np.searchsorted(cumulative, self.rng.random(count) * cumulative[-1], side='right')
+        return self.population[np.minimum(picks, len(cumulative) - 1)]
+
+    def crossover(self, first, second):
+        """
+        Ordered crossover of each row of `first` with the same row of `second`
+        :return: Children keeping a slice of `first`, the rest in `second`'s order
+        """
+        count, length = first.shape
+        rows = np.arange(count)[:, None]
+
+        cuts = np.sort(self.rng.integers(0, length + 1, size=(count, 2)), axis=1)
+        columns = np.arange(length)
+        segment = (columns >= cuts[:, :1]) & (columns < cuts[:, 1:])
+
+        # Mark which cities each child already inherited from `first`
+        taken = np.zeros((count, len(self.weights)), dtype=bool)
+        taken[rows, first] = segment
+        keep = ~taken[rows, second]
+
+        # Both masks hold the same number of cells per row, so row-major
+        # boolean assignment fills each child's gaps in `second`'s order
+        children = np.empty_like(first)
+        children[segment] = first[segment]
+        children[~segment] = second[keep]
+        return children
+
+    def mutate(self, population):
+        """Swap mutation applied in place to a random subset of rows"""
+        mutants = np.flatnonzero(self.rng.random(len(population)) < self.mutation_rate)
+        if mutants.size:
+            length = population.shape[1]
+            a = self.rng.integers(0, length, size=mutants.size)
+            b = self.rng.integers(0, length, size=mutants.size)
+            population[mutants, a], population[mutants, b] = population[mutants, b], population[mutants, a]
+        return population
+
+    def step(self):
+        """Evolve the population by one generation, keeping the best route"""
+        size = len(self.population)
+        best = self.lengths.argmin()
+        elite, elite_length = self.population[best].copy(), self.lengths[best]
+
+        parents = self.select(size + size % 2)
+        first, second = parents[0::2], parents[1::2]
+        children = np.concatenate([self.crossover(first, second), self.crossover(second, first)])[:size]
+
+        self.population = self.mutate(children)
+        self.lengths = self.route_lengths(self.population)
+
+        # Elitism: the best route so far replaces the worst child
+        worst = self.lengths.argmax()
+        if self.lengths[worst] > elite_length:
+            self.population[worst] = elite
+            self.lengths[worst] = elite_length
+
+        # Memetic step: locally optimize the best route and one random route
+        if self.polish is not None:
+            self.polish_routes(np.unique([self.lengths.argmin(), self.rng.integers(size)]))
+
+    def polish_routes(self, indices):
+        """Replace the given individuals with their locally optimized versions"""
+        for index in indices:
+            self.population[index] = self.polish(self.population[index].tolist())
+        self.lengths[indices] = self.route_lengths(self.population[indices])
+
+    def diversity(self):
+        """Fraction of route positions where individuals differ from the best route"""
+        return float((self.population != self.population[self.lengths.argmin()]).mean())
+
+    def best(self):
+        """Return (order of non-home city ids, length) of the best individual"""
+        index = self.lengths.argmin()
+        return self.population[index].tolist(), float(self.lengths[index])
+
+
+def adapt_parameters(engine, base_mutation_rate):
+    """
+    Steer an engine's mutation rate and selection pressure by diversity:
+    a converging population mutates more and selects less greedily, a
+    diverse one returns towards the base rate and selects harder
+    :param engine: PopulationEngine to adjust in place
+    :param base_mutation_rate: Rate the engine started with
+    """
+    diversity = engine.diversity()
+    if diversity < LOW_DIVERSITY:
+        engine.mutation_rate = min(max(engine.mutation_rate, 0.01) * 1.5, MAX_MUTATION_RATE)
+        engine.pressure = max(engine.pressure * 0.8, MIN_PRESSURE)
+    elif diversity > HIGH_DIVERSITY:
+        engine.mutation_rate = max(engine.mutation_rate * 0.9, base_mutation_rate)
+        engine.pressure = min(engine.pressure * 1.25, MAX_PRESSURE)
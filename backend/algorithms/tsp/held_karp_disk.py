@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from math import comb
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Without flock, solves are only serialized within one process
+    fcntl = None
+
+# Subsets processed per vectorized step; bounds the RAM used per step
+CHUNK_MASKS = 1 << 16
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+def held_karp_on_disk(weights, table_dir, stats=None):
+    """
+    Held-Karp with its tables in memory-mapped files under `table_dir`
+    Subsets are stored layer by layer (by subset size, then mask order),
+    so filling a layer only reads the previous one. Cost layers are deleted
+    once the next layer is written; parents are kept for the walk back.
+    A checkpoint after every layer lets an interrupted solve resume. Solves
+    of the same instance take turns through a lock file next to its
+    directory, and the directory is removed once the route is found or the
+    solve fails with an error.
+    :param weights: Square distance matrix with the home city at index 0
+    :param table_dir: Directory for the table files (one subdirectory per instance)
+    :param stats: Optional dict, filled with resumed_from (last layer found on disk, or 0)
+    :return: Visiting order as indices into the non-home cities
+    """
+    n = len(weights) - 1
+    stats = stats if stats is not None else {}
+    key = hashlib.sha256(np.ascontiguousarray(weights, dtype=np.float64).tobytes()).hexdigest()
+    directory = os.path.join(table_dir, key[:32])
+    os.makedirs(table_dir, exist_ok=True)
+
+    # Concurrent solves of one instance share the directory, so they take turns
+    with _exclusive(directory + '.lock'):
+        os.makedirs(directory, exist_ok=True)
+        try:
+            order = _solve(weights, n, key, directory, stats)
+        except Exception:
+            # Errors leave nothing to resume; interrupts keep the checkpoint
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        shutil.rmtree(directory)
+    return order
+
+
+def _solve(weights, n, key, directory, stats):
+    """Fill the tables in `directory`, resuming from its checkpoint, and walk back the route"""
+    layout = LayerLayout(n)
+    done = _load_checkpoint(directory, key)
+    stats['resumed_from'] = done
+    parent = np.lib.format.open_memmap(os.path.join(directory, 'parent.npy'), mode='r+' if done else 'w+',
+                                       dtype=np.int8, shape=(1 << n, n))
+
+    if not done:
+        cost = _open_layer(directory, layout, 1, 'w+')
+        cost[:] = np.inf
+        # Layer 1 in mask order is city 0, 1, ..., n - 1
+        cost[np.arange(n), np.arange(n)] = weights[0, 1:]
+        parent[layout.offsets[1]:layout.offsets[2]] = -1
+        _save_checkpoint(directory, key, 1, parent, cost)
+        done = 1
+
+    for subset_size in range(done + 1, n + 1):
+        previous = _open_layer(directory, layout, subset_size - 1, 'r')
+        cost = _open_layer(directory, layout, subset_size, 'w+')
+        fill_disk_layer(weights, layout, subset_size, previous, cost,
+                        parent[layout.offsets[subset_size]:layout.offsets[subset_size + 1]])
+        del previous
+        _save_checkpoint(directory, key, subset_size, parent, cost)
+        os.remove(_layer_path(directory, subset_size - 1))
+
+    # Walk back from the full subset, the only entry of the last layer
+    cost = _open_layer(directory, layout, n, 'r')
+    mask = (1 << n) - 1
+    last = int(np.argmin(cost[0] + weights[1:, 0]))
+    order = []
+    while last >= 0:
+        order.append(last)
+        subset_size = bin(mask).count('1')
+        previous = int(parent[layout.offsets[subset_size] + layout.rank(mask), last])
+        mask ^= 1 << last
+        last = previous
+    del cost, parent
+
+    order.reverse()
+    return order
+
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _exclusive(path):
+    """
+    Hold an exclusive lock on `path` (a lock file created as needed and removed
+    on release). flock also excludes other threads, since each opens its own file.
+    """
+    if fcntl is None:
+        with _thread_locks_guard:
+            lock = _thread_locks.setdefault(path, threading.Lock())
+        with lock:
+            yield
+        return
+
+    while True:
+        handle = open(path, 'a')
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            # The holder before us may have removed the file; only the one on disk counts
+            if os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        handle.close()
+    try:
+        yield
+    finally:
+        os.remove(path)
+        handle.close()
+
+
+class LayerLayout:
+    """
+    Position of every subset in a layer-contiguous table. Within a layer,
+    subsets keep mask order, and a mask's row is its colexicographic rank.
+    """
+
+    def __init__(self, n):
+        """
+        :param n: Number of non-home cities
+        """
+        self.n = n
+        self.sizes = [comb(n, k) for k in range(n + 1)]
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)]).tolist()
+        # binomial[b, k] = C(b, k), the number of k-subsets of bits below b
+        self.binomial = np.array([[comb(b, k) for k in range(n + 2)] for b in range(n)], dtype=np.int64)
+
+    def rank(self, mask):
+        """Row of a single mask within its layer"""
+        return int(self.ranks(np.array([mask], dtype=np.int64))[0])
+
+    def ranks(self, masks):
+        """Rows of an array of equal-size masks within their layer"""
+        ranks = np.zeros_like(masks)
+        seen = np.zeros_like(masks)
+        for bit in range(self.n):
+            present = (masks >> bit) & 1
+            seen += present
+            ranks += present * self.binomial[bit, seen]
+        return ranks
+
+    def masks(self, subset_size):
+        """Every mask of a layer in mask order, in chunks of at most CHUNK_MASKS"""
+        for start in range(0, 1 << self.n, CHUNK_MASKS):
+            block = np.arange(start, min(start + CHUNK_MASKS, 1 << self.n), dtype=np.int64)
+            counts = np.zeros_like(block)
+            for bit in range(self.n):
+                counts += (block >> bit) & 1
+            block = block[counts == subset_size]
+            if block.size:
+                yield block
+
+
+def fill_disk_layer(weights, layout, subset_size, previous, cost, parent):
+    """
+    Fill one Held-Karp layer from the layer before it
+    :param weights: Square distance matrix with the home city at index 0
+    :param layout: LayerLayout of the tables
+    :param subset_size: Size of the subsets in this layer
+    :param previous: Cost rows of layer subset_size - 1
+    :param cost: Cost rows of this layer (written)
+    :param parent: Parent rows of this layer (written)
+    """
+    n = layout.n
+    between = weights[1:, 1:]
+    row = 0
+
+    for block in layout.masks(subset_size):
+        rows = np.arange(row, row + block.size)
+        block_cost = np.full((block.size, n), np.inf)
+        block_parent = np.full((block.size, n), -1, dtype=np.int8)
+
+        for last in range(n):
+            inside = np.flatnonzero((block >> last) & 1)
+            if not inside.size:
+                continue
+            # Cost of reaching `last` from every possible previous city at once;
+            # cities outside the previous subset are still infinite
+            totals = previous[layout.ranks(block[inside] ^ (1 << last))] + between[:, last]
+            best = totals.argmin(axis=1)
+            block_cost[inside, last] = totals[np.arange(inside.size), best]
+            block_parent[inside, last] = best
+
+        cost[rows] = block_cost
+        parent[rows] = block_parent
+        row += block.size
+
+
+def _layer_path(directory, subset_size):
+    return os.path.join(directory, f'cost_{subset_size}.npy')
+
+
+def _open_layer(directory, layout, subset_size, mode):
+    """Memory-map the cost rows of one layer"""
+    path = _layer_path(directory, subset_size)
+    if mode == 'r':
+        return np.load(path, mmap_mode='r')
+    return np.lib.format.open_memmap(path, mode=mode, dtype=np.float64,
+                                     shape=(layout.sizes[subset_size], layout.n))
+
+
+def _load_checkpoint(directory, key):
+    """Last completed layer recorded for this instance, or 0"""
+    try:
+        with open(os.path.join(directory, CHECKPOINT_FILE)) as checkpoint:
+            data = json.load(checkpoint)
+    except (OSError, ValueError):
+        return 0
+    if data.get('key') != key or not os.path.exists(_layer_path(directory, data.get('layer', 0))):
+        return 0
+    return data['layer']
+
+
+def _save_checkpoint(directory, key, subset_size, parent, cost):
+    """Flush the tables, then atomically record the completed layer"""
+    parent.flush()
+    cost.flush()
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    with open(path + '.tmp', 'w') as checkpoint:
+        json.dump({'key': key, 'layer': subset_size}, checkpoint)
+    os.replace(path + '.tmp', path)
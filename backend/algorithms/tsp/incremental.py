@@ -0,0 +1,148 @@
+import numpy as np
+from .distance_matrix import as_distance_matrix
+from .dynamic import MAX_TABLE_BYTES, extend_table, held_karp_table, reconstruct_order, shrink_table, table_size
+from .local_search import CANDIDATES, candidate_lists, improve_tour, rotate_to_home
+
+# Solvers that can re-solve from the previous result of a game
+INCREMENTAL_ALGORITHMS = ('local_search', 'dynamic')
+
+# Largest instance (cities including home) re-solved incrementally with Held-Karp;
+# the tables are kept in memory, so they must fit in MAX_TABLE_BYTES
+MAX_INCREMENTAL_CITIES = max(n for n in range(2, 32) if table_size(n - 1) <= MAX_TABLE_BYTES)
+
+
+def insertion_resolve_tsp(cities, distances, previous_route, candidates=CANDIDATES):
+    """
+    Re-solve TSP heuristically after cities were added or removed
+    Removed cities are dropped from the previous route, new cities are
+    placed at their cheapest insertion point, and the result is polished
+    with 2-opt and Or-opt.
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param previous_route: Route found before the change (city labels, closed or open)
+    :param candidates: Number of nearest neighbours considered per city
+    :return: Tuple of (best route, best distance)
+    """
+    if len(cities) <= 1:
+        return cities, 0
+
+    matrix = as_distance_matrix(cities, distances)
+    rows = matrix.rows
+
+    # Keep the surviving cities in their previous order (the closing home
+    # city collapses into the first visit)
+    tour = [matrix.index(city) for city in dict.fromkeys(previous_route) if city in matrix]
+    if 0 not in tour:
+        tour.insert(0, 0)
+
+    placed = set(tour)
+    for city in range(len(matrix)):
+        if city not in placed:
+            cheapest_insertion(tour, city, rows)
+
+    tour = improve_tour(tour, rows, candidate_lists(rows, candidates))
+    route = rotate_to_home(tour) + [0]
+
+    return matrix.labels(route), matrix.route_length(route)
+
+
+def cheapest_insertion(tour, city, rows):
+    """
+    Insert a city into a cyclic tour (in place) where it lengthens the tour least
+    :param tour: Cyclic tour as a list of city ids
+    :param city: City id to insert
+    :param rows: Distance matrix rows
+    """
+    best_increase, best_position = None, len(tour)
+    for i in range(len(tour)):
+        a, b = tour[i - 1], tour[i]
+        increase = rows[a][city] + rows[city][b] - rows[a][b]
+        if best_increase is None or increase < best_increase:
+            best_increase, best_position = increase, i
+    tour.insert(best_position, city)
+
+
+class HeldKarpState:
+    """
+    Filled Held-Karp tables together with the instance they were built for.
+    Bit i of the tables refers to cities[i + 1]; cities[0] is home.
+    """
+
+    def __init__(self, cities, weights, cost, parent):
+        """
+        :param cities: City labels in table order, home city first
+        :param weights: Distance matrix in the same order
+        :param cost: Filled Held-Karp cost table
+        :param parent: Filled Held-Karp parent table
+        """
+        self.cities = list(cities)
+        self.weights = weights
+        self.cost = cost
+        self.parent = parent
+
+    @property
+    def nbytes(self):
+        """Memory held by the tables and distances"""
+        return self.cost.nbytes + self.parent.nbytes + self.weights.nbytes
+
+
+def incremental_held_karp(cities, distances, previous=None, stats=None):
+    """
+    Solve TSP exactly, reusing the Held-Karp tables of a previous solve
+    Subsets that involve neither an added nor a removed city keep their
+    values: removing a city only drops table entries, and adding one only
+    computes the subsets that contain it.
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param previous: Optional HeldKarpState from an earlier solve
+    :param stats: Optional dict, filled with reused, cities_added and cities_removed
+    :return: Tuple of (optimal route, optimal distance, HeldKarpState for the next call)
+    """
+    stats = stats if stats is not None else {}
+    stats.update(reused=False, cities_added=0, cities_removed=0)
+
+    if len(cities) <= 1:
+        return cities, 0, None
+
+    home = cities[0]
+    wanted = set(cities)
+    kept, removed = [home], []
+    if previous is not None and previous.cities[0] == home:
+        kept = [city for city in previous.cities if city in wanted]
+        removed = [city for city in previous.cities if city not in wanted]
+    kept_set = set(kept)
+    added = [city for city in cities if city not in kept_set]
+
+    # Table order: surviving cities first, new cities appended as the highest bits
+    matrix = as_distance_matrix(kept + added, distances)
+    weights = matrix.array
+
+    if len(kept) > 1 and _same_distances(previous, kept, weights):
+        cost, parent = previous.cost, previous.parent
+        table_cities = list(previous.cities)
+        for city in removed:
+            cost, parent = shrink_table(cost, parent, table_cities.index(city) - 1)
+            table_cities.remove(city)
+        for city in added:
+            size = len(table_cities) + 1
+            cost, parent = extend_table(cost, parent, weights[:size, :size])
+            table_cities.append(city)
+        stats.update(reused=True, cities_added=len(added), cities_removed=len(removed))
+    else:
+        cost, parent = held_karp_table(weights)
+
+    order = reconstruct_order(cost, parent, weights)
+
+    # Table positions are offset by one from matrix ids (home is id 0)
+    route = [0] + [i + 1 for i in order] + [0]
+    state = HeldKarpState(matrix.cities, weights, cost, parent)
+    return matrix.labels(route), matrix.route_length(route), state
+
+
+def _same_distances(previous, kept, weights):
+    """Check that every distance between the surviving cities is unchanged"""
+    if previous is None:
+        return False
+    ids = [previous.cities.index(city) for city in kept]
+    k = len(kept)
+    return np.array_equal(previous.weights[np.ix_(ids, ids)], weights[:k, :k])
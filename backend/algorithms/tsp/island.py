@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .distance_matrix import as_distance_matrix
+from .genetic import PopulationEngine
+from .local_search import make_polisher
+
+TOPOLOGIES = ('ring', 'complete')
+
+
+def island_genetic_tsp(cities, distances, islands=4, population_size=50, generations=100, mutation_rate=0.01,
+                       migration_interval=10, migrants=2, topology='ring', seed=None, workers=None,
+                       local_search=False):
+    """
+    Solve TSP with an island-model genetic algorithm
+    Each island evolves its own population in a worker process; every
+    `migration_interval` generations the best routes of each island
+    replace the worst routes of its neighbours in the topology.
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param islands: Number of independent populations
+    :param population_size: Number of individuals on each island
+    :param generations: Number of generations each island evolves
+    :param mutation_rate: Probability of mutation
+    :param migration_interval: Generations between migrations
+    :param migrants: Number of routes each island sends per migration
+    :param topology: 'ring' (island i sends to i + 1) or 'complete' (every island sends to all others)
+    :param seed: Optional random seed; each island gets its own derived stream
+    :param workers: Number of worker processes (defaults to one per island, capped at CPU count)
+    :param local_search: Polish routes with 2-opt/Or-opt every generation (memetic GA)
+    :return: Tuple of (best route, best distance)
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"topology must be one of: {', '.join(TOPOLOGIES)}")
+    if not isinstance(islands, int) or islands < 1:
+        raise ValueError("islands must be a positive integer")
+    if population_size < 1:
+        raise ValueError("population_size must be at least 1")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be at least 1")
+    if len(cities) <= 1:
+        return cities, 0
+
+    matrix = as_distance_matrix(cities, distances)
+    weights = matrix.array
+
+    # Per-island generators travel with the populations, so results do not
+    # depend on which worker runs which island
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(islands)]
+    populations = [None] * islands
+
+    workers = min(workers or os.cpu_count() or 1, islands)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        done = 0
+        # The first round always runs, so generations=0 still evaluates the initial populations
+        while True:
+            steps = min(migration_interval, generations - done)
+            tasks = ([weights] * islands, populations, rngs, [steps] * islands,
+                     [population_size] * islands, [mutation_rate] * islands, [local_search] * islands)
+            results = list(pool.map(evolve_island, *tasks) if pool else map(evolve_island, *tasks))
+            populations, lengths, rngs = (list(column) for column in zip(*results))
+            done += steps
+
+            if done >= generations:
+                break
+            migrate(populations, lengths, migrants, topology)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    # Return the global best over every island
+    island = min(range(islands), key=lambda i: lengths[i].min())
+    order = populations[island][lengths[island].argmin()].tolist()
+    best_route = [0] + order + [0]
+
+    return matrix.labels(best_route), matrix.route_length(best_route)
+
+
+def evolve_island(weights, population, rng, generations, population_size, mutation_rate, local_search):
+    """
+    Evolve one island for a number of generations (runs in a worker process)
+    :return: Tuple of (population, route lengths, generator state)
+    """
+    polish = make_polisher(weights.tolist()) if local_search else None
+    engine = PopulationEngine(weights, population_size, mutation_rate, rng, population=population, polish=polish)
+    for _ in range(generations):
+        engine.step()
+    return engine.population, engine.lengths, engine.rng
+
+
+def migrate(populations, lengths, migrants, topology):
+    """
+    Copy each island's best routes over the worst routes of its neighbours (in place)
+    :param populations: Population array of every island
+    :param lengths: Route length array of every island
+    :param migrants: Number of routes each island sends
+    :param topology: 'ring' or 'complete'
+    """
+    count = len(populations)
+
+    # Pick every emigrant before anything is overwritten
+    emigrants = []
+    for population, length in zip(populations, lengths):
+        best = np.argsort(length, kind='stable')[:migrants]
+        emigrants.append((population[best].copy(), length[best].copy()))
+
+    for target in range(count):
+        if topology == 'ring':
+            sources = [(target - 1) % count]
+        else:
+            sources = [source for source in range(count) if source != target]
+        sources = [source for source in sources if source != target]
+        if not sources:
+            continue
+
+        routes = np.concatenate([emigrants[source][0] for source in sources])
+        route_lengths = np.concatenate([emigrants[source][1] for source in sources])
+
+        # Never replace more than half of an island
+        limit = min(len(routes), len(populations[target]) // 2)
+        order = np.argsort(route_lengths, kind='stable')[:limit]
+        worst = np.argsort(lengths[target], kind='stable')[::-1][:limit]
+        populations[target][worst] = routes[order]
+        lengths[target][worst] = route_lengths[order]
@@ -0,0 +1,272 @@
+from collections import deque
+from .distance_matrix import as_distance_matrix
+
+# Number of nearest neighbours each city considers when looking for moves
+CANDIDATES = 8
+
+# Minimum gain for a move to count as an improvement (guards float noise)
+EPSILON = 1e-9
+
+
+def local_search_tsp(cities, distances, candidates=CANDIDATES):
+    """
+    Solve TSP heuristically: a nearest neighbour route polished with 2-opt and Or-opt
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param candidates: Number of nearest neighbours considered per city
+    :return: Tuple of (best route, best distance)
+    """
+    if len(cities) <= 1:
+        return cities, 0
+
+    matrix = as_distance_matrix(cities, distances)
+    neighbours = candidate_lists(matrix.rows, len(cities) - 1)
+
+    route = nearest_neighbour_route(matrix.rows, neighbours)
+    tour = improve_tour(route[:-1], matrix.rows, [row[:candidates] for row in neighbours])
+    route = rotate_to_home(tour) + [0]
+
+    return matrix.labels(route), matrix.route_length(route)
+
+
+def candidate_lists(rows, k):
+    """
+    For each city, the k nearest other cities, closest first
+    :param rows: Distance matrix rows
+    :param k: Candidates per city
+    :return: List of candidate lists indexed by city id
+    """
+    n = len(rows)
+    return [sorted((j for j in range(n) if j != i), key=rows[i].__getitem__)[:k] for i in range(n)]
+
+
+def nearest_neighbour_route(rows, nearest):
+    """
+    Build a closed route greedily from the home city (id 0)
+    :param rows: Distance matrix rows
+    :param nearest: For each city, every other city sorted by distance
+    :return: Route as city ids, starting and ending at 0
+    """
+    route = [0]
+    visited = {0}
+    while len(route) < len(rows):
+        city = next(c for c in nearest[route[-1]] if c not in visited)
+        route.append(city)
+        visited.add(city)
+    return route + [0]
+
+
+def rotate_to_home(tour):
+    """Rotate a cyclic tour so it starts at the home city (id 0)"""
+    start = tour.index(0)
+    return tour[start:] + tour[:start]
+
+
+def improve_tour(tour, rows, neighbours):
+    """
+    Apply 2-opt and Or-opt moves until neither finds an improvement
+    :param tour: Cyclic tour as a list of city ids (modified in place)
+    :param rows: Distance matrix rows
+    :param neighbours: Candidate lists, sorted closest first
+    :return: The improved tour
+    """
+    while True:
+        two_opt(tour, rows, neighbours)
+        if not or_opt(tour, rows, neighbours):
+            return tour
+
+
+def two_opt(tour, rows, neighbours):
+    """
+    Improve a cyclic tour in place with 2-opt moves restricted to candidate lists.
+    Don't-look bits keep a queue of cities whose surroundings changed, so a
+    pass only revisits the parts of the tour that can still improve.
+    :return: True if any move was applied
+    """
+    n = len(tour)
+    if n < 4:
+        return False
+
+    position = {city: i for i, city in enumerate(tour)}
+    queue = deque(tour)
+    queued = set(tour)
+    improved = False
+
+    while queue:
+        a = queue.popleft()
+        queued.discard(a)
+
+        for forward in (True, False):
+            i = position[a]
+            b = tour[(i + 1) % n] if forward else tour[i - 1]
+            d_ab = rows[a][b]
+
+            move = None
+            for c in neighbours[a]:
+                d_ac = rows[a][c]
+                # Candidates are sorted, so no later one can shorten the tour
+                if d_ac >= d_ab:
+                    break
+                j = position[c]
+                d = tour[(j + 1) % n] if forward else tour[j - 1]
+                if c == b or d == a:
+                    continue
+                if d_ac + rows[b][d] - d_ab - rows[c][d] < -EPSILON:
+                    move = (c, d, j)
+                    break
+
+            if move is None:
+                continue
+
+            c, d, j = move
+            # Replace edges a-b and c-d with a-c and b-d
+            if forward:
+                _reverse(tour, position, (i + 1) % n, j)
+            else:
+                _reverse(tour, position, i, (j - 1) % n)
+            improved = True
+
+            for city in (a, b, c, d):
+                if city not in queued:
+                    queue.append(city)
+                    queued.add(city)
+            break
+
+    return improved
+
+
+def or_opt(tour, rows, neighbours):
+    """
+    Improve a cyclic tour in place by moving segments of 1-3 cities
+    next to one of their candidate neighbours (in either orientation)
+    :return: True if any move was applied
+    """
+    n = len(tour)
+    if n < 5:
+        return False
+
+    position = {city: i for i, city in enumerate(tour)}
+    queue = deque(tour)
+    queued = set(tour)
+    improved = False
+
+    while queue:
+        first = queue.popleft()
+        queued.discard(first)
+
+        for length in (1, 2, 3):
+            if length > n - 3:
+                break
+            i = position[first]
+            segment = [tour[(i + k) % n] for k in range(length)]
+            last = segment[-1]
+            before, after = tour[i - 1], tour[(i + length) % n]
+
+            # Gain from closing the gap the segment leaves behind
+            removal = rows[before][first] + rows[last][after] - rows[before][after]
+            if removal <= EPSILON:
+                continue
+
+            move = _best_insertion(segment, removal, tour, position, rows, neighbours)
+            if move is None:
+                continue
+
+            touched = _move_segment(tour, position, i, segment, *move)
+            improved = True
+
+            for city in (before, after, *touched):
+                if city not in queued:
+                    queue.append(city)
+                    queued.add(city)
+            break
+
+    return improved
+
+
+def _best_insertion(segment, removal, tour, position, rows, neighbours):
+    """Find the candidate edge (c, e) where inserting the segment gains most"""
+    n = len(tour)
+    inside = set(segment)
+    best_gain, best_move = EPSILON, None
+
+    for end, other in ((segment[0], segment[-1]), (segment[-1], segment[0])):
+        for c in neighbours[end]:
+            if rows[end][c] >= removal:
+                break
+            if c in inside:
+                continue
+            j = position[c]
+            for e in (tour[(j + 1) % n], tour[j - 1]):
+                if e in inside:
+                    continue
+                gain = removal - (rows[c][end] + rows[other][e] - rows[c][e])
+                if gain > best_gain:
+                    best_gain, best_move = gain, (c, e, end)
+
+    return best_move
+
+
+def _move_segment(tour, position, i, segment, c, e, end):
+    """
+    Move `segment` (starting at index i) between adjacent cities c and e, with
+    `end` next to c. Only the stretch between the segment and its new place is
+    rewritten, going whichever way round the tour is shorter.
+    """
+    n = len(tour)
+    length = len(segment)
+    j = position[c]
+    if tour[(j + 1) % n] == e:
+        # Insert after c: the segment must start at `end`
+        p = j
+        piece = segment if end == segment[0] else segment[::-1]
+    else:
+        # Insert after e, before c: the segment must finish at `end`
+        p = position[e]
+        piece = segment[::-1] if end == segment[0] else segment
+
+    ahead = (p - i - length + 1) % n
+    if ahead <= n - length - ahead:
+        # Shift the cities between the segment and c back over it
+        start = i
+        block = [tour[(i + length + k) % n] for k in range(ahead)] + piece
+    else:
+        # Shift the cities between the insertion point and the segment forward
+        start = (p + 1) % n
+        block = piece + [tour[(start + k) % n] for k in range(n - length - ahead)]
+
+    for k, city in enumerate(block):
+        index = (start + k) % n
+        tour[index] = city
+        position[city] = index
+    return (c, e, *segment)
+
+
+def _reverse(tour, position, i, j):
+    """Reverse the cyclic slice tour[i..j], or its complement when that is shorter"""
+    n = len(tour)
+    length = (j - i) % n + 1
+    if 2 * length > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        length = n - length
+
+    for _ in range(length // 2):
+        a, b = tour[i], tour[j]
+        tour[i], tour[j] = b, a
+        position[a], position[b] = j, i
+        i = (i + 1) % n
+        j = (j - 1) % n
+
+
+def make_polisher(rows, candidates=CANDIDATES):
+    """
+    Build a function that locally optimizes a visiting order
+    :param rows: Distance matrix rows (home city is id 0)
+    :param candidates: Number of nearest neighbours considered per city
+    :return: Function mapping a list of non-home city ids to an improved list
+    """
+    neighbours = candidate_lists(rows, candidates)
+
+    def polish(order):
+        return rotate_to_home(improve_tour([0] + list(order), rows, neighbours))[1:]
+
+    return polish
@@ -0,0 +1,99 @@
+import math
+from statistics import median
+from .solver import MAX_CITIES
+
+# Exact solvers, tried fastest-predicted first
+EXACT_SOLVERS = ('dynamic', 'branch_and_bound', 'bruteforce')
+
+# Heuristics in order of preference when no exact solver fits the budget
+HEURISTIC_SOLVERS = ('local_search', 'genetic', 'island_genetic')
+
+# Work each solver does on n cities (including home), up to a constant factor
+COST_MODELS = {
+    'bruteforce': lambda n: math.factorial(max(n - 1, 1)) / 2,
+    'dynamic': lambda n: n * n * 2 ** n,
+    'branch_and_bound': lambda n: 2 ** n,
+    'genetic': lambda n: 100 + n,
+    'island_genetic': lambda n: 400 + n,
+    'local_search': lambda n: n * n,
+}
+
+# Seconds per unit of modelled work: the slowest of three random 50-100 km
+# instances per size, rounded up; branch_and_bound also covers a slower
+# server taking 15 s at 20 cities and 180 s at 24
+DEFAULT_SECONDS_PER_UNIT = {
+    'bruteforce': 1e-8,
+    'dynamic': 8e-9,
+    'branch_and_bound': 2e-5,
+    'genetic': 3.5e-4,
+    'island_genetic': 6.5e-4,
+    'local_search': 8e-7,
+}
+
+# Recorded runs needed before history replaces the built-in constant
+MIN_SAMPLES = 3
+
+# Largest time budget an auto solve may ask for, in seconds
+MAX_TIME_BUDGET = 60
+
+
+class RuntimePredictor:
+    """
+    Predicts solver runtimes as (seconds per unit) x (cost model units).
+    Each solver's constant is the median of its recorded server-side runs
+    once there are MIN_SAMPLES of them, and the built-in constant before that.
+    """
+
+    def __init__(self, history=()):
+        """
+        :param history: Iterable of (algorithm, city count, seconds) tuples
+        """
+        samples = {}
+        for algorithm, cities, seconds in history:
+            if algorithm in COST_MODELS and cities > 0 and seconds > 0:
+                samples.setdefault(algorithm, []).append(seconds / COST_MODELS[algorithm](cities))
+
+        self.seconds_per_unit = dict(DEFAULT_SECONDS_PER_UNIT)
+        self.samples = {algorithm: len(samples.get(algorithm, ())) for algorithm in COST_MODELS}
+        for algorithm, rates in samples.items():
+            if len(rates) >= MIN_SAMPLES:
+                self.seconds_per_unit[algorithm] = median(rates)
+
+    def predict(self, algorithm, cities):
+        """
+        Predicted runtime in seconds
+        :param algorithm: Key of COST_MODELS
+        :param cities: Number of cities (including home)
+        :return: Seconds
+        """
+        return self.seconds_per_unit[algorithm] * COST_MODELS[algorithm](cities)
+
+
+def select_algorithm(cities, time_budget, predictor=None):
+    """
+    Choose the solver for an instance: the fastest exact solver predicted
+    to finish within the budget, otherwise a heuristic
+    :param cities: Number of cities (including home)
+    :param time_budget: Seconds the caller is willing to wait
+    :param predictor: RuntimePredictor (defaults to the built-in constants)
+    :return: Dictionary with algorithm, exact, predicted_time and predictions per solver
+    """
+    predictor = predictor or RuntimePredictor()
+    supported = [algorithm for algorithm in COST_MODELS if cities <= MAX_CITIES[algorithm]]
+    predictions = {algorithm: predictor.predict(algorithm, cities) for algorithm in supported}
+
+    exact = [algorithm for algorithm in EXACT_SOLVERS
+             if algorithm in predictions and predictions[algorithm] <= time_budget]
+    if exact:
+        algorithm = min(exact, key=predictions.get)
+    else:
+        heuristics = [algorithm for algorithm in HEURISTIC_SOLVERS if algorithm in predictions]
+        fitting = [algorithm for algorithm in heuristics if predictions[algorithm] <= time_budget]
+        algorithm = fitting[0] if fitting else min(heuristics, key=predictions.get)
+
+    return {
+        'algorithm': algorithm,
+        'exact': algorithm in EXACT_SOLVERS,
+        'predicted_time': predictions[algorithm],
+        'predictions': predictions
+    }
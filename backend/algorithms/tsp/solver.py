@@ -0,0 +1,74 @@
+import time
+from .branch_and_bound import branch_and_bound_tsp
+from .bruteforce import brute_force_tsp
+from .distance_matrix import as_distance_matrix
+from .dynamic import dynamic_programming_tsp
+from .genetic import genetic_algorithm_tsp
+from .island import island_genetic_tsp
+from .local_search import local_search_tsp
+
+SOLVERS = {
+    'bruteforce': brute_force_tsp,
+    'dynamic': dynamic_programming_tsp,
+    'branch_and_bound': branch_and_bound_tsp,
+    'genetic': genetic_algorithm_tsp,
+    'island_genetic': island_genetic_tsp,
+    'local_search': local_search_tsp,
+}
+
+# Largest instance (cities including home) each solver accepts on request;
+# dynamic needs a table directory above 20 cities (22 measured at about 10 s), and
+# branch_and_bound has no time budget (20 measured at up to 15 s, 24 at 180 s)
+MAX_CITIES = {
+    'bruteforce': 13,
+    'dynamic': 22,
+    'branch_and_bound': 20,
+    'genetic': 200,
+    'island_genetic': 200,
+    'local_search': 1000,
+}
+
+
+def solve_tsp(cities, distances, algorithm, cache=None, **options):
+    """
+    Solve a TSP instance with a named solver, reusing cached results
+    Results are cached under the canonical form of the instance, so the
+    same map with its cities relabeled is answered from the cache too.
+    :param cities: List of cities to visit (including home city)
+    :param distances: DistanceMatrix or dictionary of distances between cities
+    :param algorithm: Key of SOLVERS
+    :param cache: Optional cache with get(key) and put(key, value)
+    :param options: Extra keyword arguments for the solver
+    :return: Dictionary with route, distance, algorithm, time_taken and cached
+    """
+    matrix = as_distance_matrix(cities, distances)
+    instance_key, order = matrix.canonical()
+    cache_key = f"{algorithm}:{instance_key}"
+
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        # Cached routes are stored as canonical positions
+        canonical_route, distance = cached
+        return {
+            'route': matrix.labels(order[position] for position in canonical_route),
+            'distance': distance,
+            'algorithm': algorithm,
+            'time_taken': 0,
+            'cached': True
+        }
+
+    start = time.perf_counter()
+    route, distance = SOLVERS[algorithm](matrix.cities, matrix, **options)
+    time_taken = time.perf_counter() - start
+
+    if cache is not None:
+        position = {city: k for k, city in enumerate(order)}
+        cache.put(cache_key, ([position[matrix.index(city)] for city in route], distance))
+
+    return {
+        'route': route,
+        'distance': distance,
+        'algorithm': algorithm,
+        'time_taken': time_taken,
+        'cached': False
+    }
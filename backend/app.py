@@ -1,12 +1,14 @@
 import sys
 from os.path import dirname, abspath
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from .extensions import db
 import os
 import json
 from datetime import datetime
 import random
+import time
 from .utils.validators import GameValidator, ValidationError
+from .utils.cache import LRUCache, TieredCache
 import re
 import uuid
 
@@ -16,11 +18,26 @@ sys.path.insert(0, project_root)
 
 # Import models
 from backend.models.tic_tac_toe import TicTacToeGame, TicTacToeMove
-from backend.models.tsp import TSPGame, TSPAlgorithmTime
+from backend.models.tsp import TSPGame, TSPAlgorithmTime, TSPSolutionStore, TSPSolverRun
 from backend.models.hanoi import HanoiGame, HanoiAlgorithmTime
 from backend.models.queens import QueensGame, QueensAlgorithmTime
 from backend.models.knights_tour import KnightsTourGame, KnightsAlgorithmTime
 
+# Import algorithms
+from backend.algorithms.tic_tac_toe import mnk
+from backend.algorithms.tic_tac_toe.engine import ENGINES, computer_move
+from backend.algorithms.tic_tac_toe.mcts import MonteCarloSearch
+from backend.algorithms.tic_tac_toe.opening_book import OpeningBook
+from backend.algorithms.tic_tac_toe.parallel import ParallelSearch
+from backend.algorithms.tic_tac_toe.tablebase import Tablebase
+from backend.algorithms.tsp.anytime import ANYTIME_ALGORITHMS, HEARTBEAT_INTERVAL, MAX_TIME_LIMIT, anytime_tsp
+from backend.algorithms.tsp.distance_matrix import DistanceMatrix
+from backend.algorithms.tsp.euclidean import CONSTRUCTIONS, MAX_EUCLIDEAN_CITIES, euclidean_tsp
+from backend.algorithms.tsp.incremental import (INCREMENTAL_ALGORITHMS, MAX_INCREMENTAL_CITIES, incremental_held_karp,
+                                                insertion_resolve_tsp)
+from backend.algorithms.tsp.portfolio import MAX_TIME_BUDGET, RuntimePredictor, select_algorithm
+from backend.algorithms.tsp.solver import MAX_CITIES, solve_tsp
+
 def create_app():
     app = Flask(__name__)
     
@@ -29,6 +46,34 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # TSP solve cache: in-memory LRU size, plus an optional table-backed tier
+    app.config['TSP_CACHE_SIZE'] = 256
+    app.config['TSP_PERSISTENT_CACHE'] = False
+    
+    # Memory-mapped Held-Karp tables for exact solves too big for RAM (None disables)
+    app.config['TSP_TABLE_DIR'] = os.path.join(os.path.dirname(db_path), 'tsp_tables')
+    
+    # Held-Karp tables kept per game for incremental exact re-solves, bounded
+    # by count and by total bytes (one 20-city table is about 90 MB)
+    app.config['TSP_TABLE_CACHE_SIZE'] = 4
+    app.config['TSP_TABLE_CACHE_BYTES'] = 128 * 1024 * 1024
+    
+    # Tic-tac-toe AI: search budget per move and cached canonical positions
+    app.config['TIC_TAC_TOE_TIME_LIMIT'] = 0.5
+    app.config['TIC_TAC_TOE_CACHE_SIZE'] = 4096
+    
+    # Opening book generated offline with `python -m backend.algorithms.tic_tac_toe.opening_book`
+    app.config['TIC_TAC_TOE_OPENING_BOOK'] = os.path.join(os.path.dirname(db_path), 'opening_book.bin')
+    
+    # Endgame tablebase generated offline with `python -m backend.algorithms.tic_tac_toe.tablebase`
+    app.config['TIC_TAC_TOE_TABLEBASE'] = os.path.join(os.path.dirname(db_path), 'tablebase.bin')
+    
+    # Processes for the root-split alpha-beta search (1 searches in the request thread)
+    app.config['TIC_TAC_TOE_WORKERS'] = 1
+    
+    # Games whose MCTS trees are kept between moves
+    app.config['TIC_TAC_TOE_MCTS_GAMES'] = 32
+    
     # Initialize extensions
     db.init_app(app)
     
@@ -63,6 +108,27 @@ def register_error_handlers(app):
         }), 500
 
 def register_routes(app):
+    tsp_cache = app.extensions['tsp_cache'] = LRUCache(app.config.get('TSP_CACHE_SIZE', 256))
+    tsp_tables = app.extensions['tsp_tables'] = LRUCache(app.config.get('TSP_TABLE_CACHE_SIZE', 4),
+                                                         app.config.get('TSP_TABLE_CACHE_BYTES'),
+                                                         lambda state: state.nbytes if state is not None else 0)
+    ai_move_cache = app.extensions['tic_tac_toe_cache'] = LRUCache(app.config.get('TIC_TAC_TOE_CACHE_SIZE', 4096))
+    
+    # The book is memory-mapped, so worker processes share its pages
+    book_path = app.config.get('TIC_TAC_TOE_OPENING_BOOK')
+    app.extensions['opening_book'] = OpeningBook(book_path) if book_path and os.path.exists(book_path) else None
+    tablebase_path = app.config.get('TIC_TAC_TOE_TABLEBASE')
+    app.extensions['tablebase'] = Tablebase(tablebase_path) if tablebase_path and os.path.exists(tablebase_path) else None
+    
+    # The worker pool starts on the first search, not with the app
+    workers = app.config.get('TIC_TAC_TOE_WORKERS', 1)
+    app.extensions['tic_tac_toe_search'] = ParallelSearch(
+        workers, tablebase_path=tablebase_path if app.extensions['tablebase'] is not None else None
+    ) if workers > 1 else None
+    
+    # One MCTS tree per game, reused between that game's moves
+    mcts_trees = app.extensions['tic_tac_toe_mcts'] = LRUCache(app.config.get('TIC_TAC_TOE_MCTS_GAMES', 32))
+
     @app.route('/')
     def index():
         return render_template('index.html')
@@ -182,6 +248,91 @@ def register_routes(app):
         except Exception as e:
             return jsonify({'error': 'Internal server error'}), 500
 
+    @app.route('/api/tic-tac-toe/moves/batch', methods=['POST'])
+    def add_tic_tac_toe_moves():
+        try:
+            data = request.get_json()
+            if not data:
+                raise ValidationError("No data provided")
+            
+            GameValidator.validate_game_id(data.get('game_id'))
+            if TicTacToeGame.query.get(data['game_id']) is None:
+                return jsonify({'error': 'Game not found'}), 404
+            
+            # Checked against the moves already logged, so a retried or late batch cannot repeat them
+            stored = TicTacToeMove.query.filter_by(game_id=data['game_id']).order_by(TicTacToeMove.id).all()
+            GameValidator.validate_tic_tac_toe_moves(data.get('moves'),
+                                                     previous=[move.move_details for move in stored],
+                                                     algorithms=ENGINES)
+            
+            # One multi-row insert and one commit for the whole game, instead of one per move
+            db.session.bulk_insert_mappings(TicTacToeMove, [{
+                'game_id': data['game_id'],
+                'algorithm_used': move.get('algorithm_used', 'minimax'),
+                'time_taken': move.get('time_taken', 0),
+                'move_details': move['move_details']
+            } for move in data['moves']])
+            db.session.commit()
+            return jsonify({'message': 'Moves recorded', 'count': len(data['moves'])}), 201
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Error recording tic-tac-toe moves: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+
+    @app.route('/api/tic-tac-toe/ai-move', methods=['POST'])
+    def tic_tac_toe_ai_move():
+        try:
+            data = request.get_json()
+            if not data:
+                raise ValidationError("No data provided")
+            
+            if 'board' not in data:
+                raise ValidationError("Board is required")
+            # Other m,n,k variants (e.g. 7x7 four in a row) use the general board engine
+            width, height, k = (data.get(field, default) for field, default in zip(('width', 'height', 'k'),
+                                                                                   mnk.DEFAULT_VARIANT))
+            GameValidator.validate_board_variant(width, height, k, mnk.MAX_SIZE)
+            GameValidator.validate_board_state(data['board'], width, height)
+            
+            algorithm = data.get('algorithm', 'alphabeta')
+            if algorithm not in ENGINES:
+                raise ValidationError(f"Algorithm must be one of: {', '.join(ENGINES)}")
+            variant = (width, height, k) != mnk.DEFAULT_VARIANT
+            if variant and algorithm != 'alphabeta':
+                raise ValidationError("Only the alphabeta engine plays other board sizes")
+            
+            # Without a game id the MCTS tree lasts for this move only
+            monte_carlo = None
+            if algorithm == 'mcts' and data.get('game_id') is not None:
+                GameValidator.validate_game_id(data['game_id'])
+                monte_carlo = mcts_trees.get(data['game_id'])
+                if monte_carlo is None:
+                    monte_carlo = MonteCarloSearch()
+                    mcts_trees.put(data['game_id'], monte_carlo)
+            
+            time_limit = app.config.get('TIC_TAC_TOE_TIME_LIMIT', 0.5)
+            try:
+                if variant:
+                    result = mnk.computer_move(data['board'], width, height, k, time_limit)
+                else:
+                    result = computer_move(data['board'], algorithm, time_limit,
+                                           cache=ai_move_cache, book=app.extensions['opening_book'],
+                                           tablebase=app.extensions['tablebase'],
+                                           parallel=app.extensions['tic_tac_toe_search'],
+                                           monte_carlo=monte_carlo)
+            except ValueError as e:
+                # Finished or full board
+                raise ValidationError(str(e))
+            
+            return jsonify(result), 200
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error choosing tic-tac-toe move: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+
     # ========== TSP API ==========
     @app.route('/api/tsp/games', methods=['GET', 'POST'])
     def create_tsp_game():
@@ -231,12 +382,42 @@ def register_routes(app):
             if 'distance' in data:
                 game.distance = float(data['distance'])
             
+            # Re-solve from the previous route when the client sends the distances
+            if 'distances' in data:
+                resolve_tsp_game(game, data)
+            
             db.session.commit()
             return jsonify(game.to_dict()), 200
         except Exception as e:
             db.session.rollback()
             return jsonify({'error': str(e)}), 400
 
+    def resolve_tsp_game(game, data):
+        """
+        Re-solve a game's route after its selected cities changed, starting
+        from the previously stored route (or cached exact tables)
+        """
+        algorithm = data.get('algorithm', 'local_search')
+        if algorithm not in INCREMENTAL_ALGORITHMS:
+            raise ValidationError(f"algorithm must be one of: {', '.join(INCREMENTAL_ALGORITHMS)}")
+        
+        selected = json.loads(game.selected_cities) if game.selected_cities else []
+        cities = [game.home_city] + [city for city in selected if city != game.home_city]
+        # Incremental Held-Karp keeps its tables in memory, so it cannot go as far as a full solve
+        limit = MAX_INCREMENTAL_CITIES if algorithm == 'dynamic' else MAX_CITIES[algorithm]
+        if len(cities) > limit:
+            raise ValidationError(f"{algorithm} supports at most {limit} cities")
+        
+        if algorithm == 'dynamic':
+            route, distance, state = incremental_held_karp(cities, data['distances'], tsp_tables.get(game.id))
+            tsp_tables.put(game.id, state)
+        else:
+            previous_route = json.loads(game.shortest_route) if game.shortest_route else []
+            route, distance = insertion_resolve_tsp(cities, data['distances'], previous_route)
+        
+        game.shortest_route = json.dumps(route)
+        game.distance = float(distance)
+
     @app.route('/api/tsp/games/<int:game_id>', methods=['GET'])
     def get_tsp_game(game_id):
         game = TSPGame.query.get_or_404(game_id)
@@ -273,6 +454,119 @@ def register_routes(app):
             db.session.rollback()
             return jsonify({'error': str(e)}), 400
 
+    @app.route('/api/tsp/solve', methods=['POST'])
+    def solve_tsp_instance():
+        try:
+            data = request.get_json()
+            if not data:
+                raise ValidationError("No data provided")
+            
+            GameValidator.validate_tsp_solve_data(data, {**MAX_CITIES, 'auto': max(MAX_CITIES.values())})
+            
+            home_city = data['home_city']
+            cities = [home_city] + [city for city in data['selected_cities'] if city != home_city]
+            
+            # 'auto' picks a solver from predicted runtimes within the caller's budget
+            algorithm, selection = data['algorithm'], None
+            if algorithm == 'auto':
+                time_budget = data.get('time_budget', 2)
+                GameValidator.validate_time_limit(time_budget, MAX_TIME_BUDGET, 'time_budget')
+                predictor = RuntimePredictor(TSPSolverRun.runtime_history())
+                selection = select_algorithm(len(cities), time_budget, predictor)
+                algorithm = selection['algorithm']
+            
+            store = TSPSolutionStore() if app.config.get('TSP_PERSISTENT_CACHE') else None
+            options = {}
+            if algorithm == 'dynamic':
+                options['table_dir'] = app.config.get('TSP_TABLE_DIR')
+            try:
+                result = solve_tsp(cities, data['distances'], algorithm,
+                                   cache=TieredCache(tsp_cache, store), **options)
+            except ValueError as e:
+                # Incomplete or asymmetric distances
+                raise ValidationError(str(e))
+            
+            if not result['cached']:
+                # Server-side timings feed the auto predictor; browser-reported times are not comparable
+                db.session.add(TSPSolverRun(algorithm=algorithm, cities=len(cities), time_taken=result['time_taken']))
+                db.session.commit()
+            
+            if selection is not None:
+                result['selection'] = selection
+            return jsonify(result), 200
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error solving TSP: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+
+    @app.route('/api/tsp/solve/euclidean', methods=['POST'])
+    def solve_euclidean_tsp():
+        try:
+            data = request.get_json()
+            if not data:
+                raise ValidationError("No data provided")
+            
+            GameValidator.validate_tsp_coordinates_data(data, CONSTRUCTIONS, MAX_EUCLIDEAN_CITIES)
+            construction = data.get('construction', 'greedy')
+            
+            home_city = data['home_city']
+            cities = [home_city] + list(dict.fromkeys(city for city in data['selected_cities'] if city != home_city))
+            missing = [city for city in cities if city not in data['coordinates']]
+            if missing:
+                raise ValidationError(f"Missing coordinates for {', '.join(missing)}")
+            
+            start = time.perf_counter()
+            route, distance = euclidean_tsp(cities, [data['coordinates'][city] for city in cities],
+                                            construction, data.get('local_search', True))
+            
+            return jsonify({
+                'route': route,
+                'distance': distance,
+                'construction': construction,
+                'time_taken': time.perf_counter() - start
+            }), 200
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error solving Euclidean TSP: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+
+    @app.route('/api/tsp/solve/stream', methods=['POST'])
+    def stream_tsp_solutions():
+        try:
+            data = request.get_json()
+            if not data:
+                raise ValidationError("No data provided")
+            
+            GameValidator.validate_tsp_solve_data(data, {name: MAX_CITIES[name] for name in ANYTIME_ALGORITHMS})
+            time_limit = data.get('time_limit', 5)
+            GameValidator.validate_time_limit(time_limit, MAX_TIME_LIMIT)
+            
+            home_city = data['home_city']
+            cities = [home_city] + [city for city in data['selected_cities'] if city != home_city]
+            try:
+                matrix = DistanceMatrix.from_dict(data['distances'], cities)
+            except ValueError as e:
+                raise ValidationError(str(e))
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def generate():
+            # One JSON object per line for every improving route, then a summary line.
+            # Werkzeug closes this generator when a write to a disconnected client fails,
+            # which stops the search; heartbeat lines make sure a stalled search still writes.
+            stats = {}
+            for route, distance, elapsed in anytime_tsp(cities, matrix, data['algorithm'], time_limit, stats=stats,
+                                                        heartbeat=HEARTBEAT_INTERVAL):
+                if route is None:
+                    yield json.dumps({'heartbeat': True, 'elapsed': elapsed}) + '\n'
+                    continue
+                yield json.dumps({'route': route, 'distance': distance, 'elapsed': elapsed}) + '\n'
+            yield json.dumps({'done': True, 'stop_reason': stats['stop_reason'], 'iterations': stats['iterations']}) + '\n'
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+
     # ========== HANOI API ==========
     @app.route('/api/hanoi/games', methods=['GET', 'POST'])
     def hanoi_games():
@@ -1,4 +1,5 @@
 from ..extensions import db
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 class TSPGame(db.Model):
@@ -36,4 +37,44 @@ class TSPAlgorithmTime(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     game_id = db.Column(db.Integer, db.ForeignKey('tsp_game.id'), nullable=False)
     algorithm_used = db.Column(db.String(50), nullable=False)  # bruteforce, dynamic, genetic
-    time_taken = db.Column(db.Float, nullable=False)  # in seconds
\ No newline at end of file
+    time_taken = db.Column(db.Float, nullable=False)  # in seconds
+
+class TSPSolverRun(db.Model):
+    """Solve times measured on the server, the history behind algorithm=auto"""
+    id = db.Column(db.Integer, primary_key=True)
+    algorithm = db.Column(db.String(50), nullable=False)
+    cities = db.Column(db.Integer, nullable=False)  # including home
+    time_taken = db.Column(db.Float, nullable=False)  # in seconds
+    date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def runtime_history(cls, limit=1000):
+        """Most recent runs as (algorithm, city count including home, seconds) tuples"""
+        rows = (db.session.query(cls.algorithm, cls.cities, cls.time_taken)
+                .order_by(cls.id.desc()).limit(limit))
+        return [tuple(row) for row in rows]
+
+class TSPSolution(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    instance_key = db.Column(db.String(100), nullable=False, unique=True)  # algorithm:canonical hash
+    route = db.Column(db.JSON, nullable=False)  # canonical city positions
+    distance = db.Column(db.Float, nullable=False)
+    date = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TSPSolutionStore:
+    """Persistent solve cache tier backed by the tsp_solution table"""
+
+    def get(self, key):
+        solution = TSPSolution.query.filter_by(instance_key=key).first()
+        if solution is None:
+            return None
+        return solution.route, solution.distance
+
+    def put(self, key, value):
+        route, distance = value
+        try:
+            db.session.add(TSPSolution(instance_key=key, route=route, distance=distance))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same instance first
+            db.session.rollback()
@@ -14,6 +14,7 @@ document.addEventListener('DOMContentLoaded', () => {
     let timerInterval;
     let seconds = 0;
     let gameId = null;
+    let pendingMoves = []; // Moves logged at the end of the game in one request
     let selectedAlgorithm = 'minimax'; // Default algorithm
     
     // Handle algorithm selection
@@ -45,8 +46,9 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
         
-        // Make player move
+        // Make player move (logged too, so the stored moves alternate)
         makeMove(clickedCell, clickedCellIndex, 'X');
+        saveMove(clickedCellIndex, 'X', 0);
         
         // Check for win or draw
         if (checkWin('X')) {
@@ -82,16 +84,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const startTime = performance.now();
             let moveIndex;
             
-            switch (selectedAlgorithm) {
-                case 'minimax':
-                    moveIndex = await findBestMove([...gameState]);
-                    break;
-                case 'alphabeta':
-                    moveIndex = await findBestMoveAlphaBeta([...gameState]);
-                    break;
-                default:
-                    moveIndex = await findBestMove([...gameState]);
-            }
+            moveIndex = await findServerMove([...gameState]);
             
             const endTime = performance.now();
             const timeTaken = (endTime - startTime) / 1000; // Convert to seconds
@@ -121,6 +114,37 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
     
+    // Ask the server engine for a move, falling back to the in-browser search
+    async function findServerMove(board) {
+        try {
+            const response = await fetch('/api/tic-tac-toe/ai-move', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    board: board,
+                    algorithm: selectedAlgorithm,
+                    // Lets the server keep this game's search tree between moves
+                    game_id: gameId
+                })
+            });
+            if (!response.ok) {
+                throw new Error(`Server returned ${response.status}`);
+            }
+            const data = await response.json();
+            return data.move;
+        } catch (error) {
+            console.error('Error fetching AI move:', error);
+            switch (selectedAlgorithm) {
+                case 'alphabeta':
+                    return findBestMoveAlphaBeta(board);
+                default:
+                    return findBestMove(board);
+            }
+        }
+    }
+    
     // Random move algorithm
     async function findRandomMove(board) {
         return new Promise((resolve) => {
@@ -174,30 +198,42 @@ document.addEventListener('DOMContentLoaded', () => {
     function saveMove(index, player, timeTaken) {
         if (!gameId) return;
         
-        const row = Math.floor(index / 5);
-        const col = index % 5;
+        pendingMoves.push({
+            algorithm_used: selectedAlgorithm,
+            time_taken: timeTaken,
+            move_details: {
+                row: Math.floor(index / 5),
+                col: index % 5,
+                player: player
+            }
+        });
+    }
+    
+    // Send the buffered moves as one batch (one database commit per game)
+    function flushMoves() {
+        if (!gameId || pendingMoves.length === 0) return;
         
-        fetch('/api/tic-tac-toe/moves', {
+        const moves = pendingMoves;
+        pendingMoves = [];
+        fetch('/api/tic-tac-toe/moves/batch', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
                 game_id: gameId,
-                algorithm_used: selectedAlgorithm,
-                time_taken: timeTaken,
-                move_details: {
-                    row: row,
-                    col: col,
-                    player: player
-                }
-            })
+                moves: moves
+            }),
+            keepalive: true
         })
         .catch(error => {
-            console.error('Error saving move:', error);
+            console.error('Error saving moves:', error);
         });
     }
     
+    // Don't lose the moves of a game left unfinished
+    window.addEventListener('pagehide', flushMoves);
+    
     // Check for a win
     function checkWin(player) {
         // Winning combinations for 5x5 (need 5 in a row)
@@ -266,7 +302,8 @@ document.addEventListener('DOMContentLoaded', () => {
             cell.classList.remove('x', 'o');
         });
         
-        // Create new game in database
+        // Create new game in database, logging any unfinished one first
+        flushMoves();
         createNewGame();
         
         // Update UI
@@ -450,6 +487,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function saveGameResult(result) {
         if (!gameId) return;
         
+        flushMoves();
         fetch(`/api/tic-tac-toe/games/${gameId}`, {
             method: 'PATCH',
             headers: {
@@ -1,5 +1,16 @@
+import json
+import random
+import time
 import pytest
-from backend.models.tic_tac_toe import TicTacToeGame, Algorithm
+from backend.models.tic_tac_toe import TicTacToeGame, TicTacToeMove, Algorithm
+from backend.algorithms.tic_tac_toe import alphabeta, bitboard, mcts, minimax, mnk
+from backend.algorithms.tic_tac_toe.arena import openings, percentile, run_arena
+from backend.algorithms.tic_tac_toe.engine import computer_move
+from backend.algorithms.tic_tac_toe.evaluation import MAX_SCORE, LineThreats
+from backend.algorithms.tic_tac_toe.mmap_table import MappedTable, write_table
+from backend.algorithms.tic_tac_toe.opening_book import OpeningBook, book_positions, generate_book
+from backend.algorithms.tic_tac_toe.parallel import ParallelSearch
+from backend.algorithms.tic_tac_toe.tablebase import Tablebase, generate_tablebase
 
 def test_tic_tac_toe_game_creation():
     """Test creating a new Tic-Tac-Toe game."""
@@ -171,4 +182,473 @@ def test_tic_tac_toe_api_get_game(client):
     assert data['id'] == game_id
     assert 'board' in data
     assert 'current_player' in data
-    assert 'algorithm' in data 
\ No newline at end of file
+    assert 'algorithm' in data 
+
+def _random_board(rng, stones):
+    """Place `stones` alternating X/O stones on random cells of a 5x5 board."""
+    board = [''] * 25
+    for i, cell in enumerate(rng.sample(range(25), stones)):
+        board[cell] = 'X' if i % 2 == 0 else 'O'
+    return board
+
+def _has_line(board, player):
+    """Reference five-in-a-row check over explicit index lists."""
+    lines = ([[r * 5 + c for c in range(5)] for r in range(5)]
+             + [[r * 5 + c for r in range(5)] for c in range(5)]
+             + [[i * 6 for i in range(5)], [4 + i * 4 for i in range(5)]])
+    return any(all(board[i] == player for i in line) for line in lines)
+
+def test_bitboard_win_checks_match_board_scan():
+    """Test bitboard win detection against a straightforward scan."""
+    rng = random.Random(0)
+    assert len(bitboard.LINES) == 12
+    for _ in range(500):
+        board = _random_board(rng, rng.randint(0, 25))
+        for player in 'XO':
+            bits = bitboard.from_board(board, player)
+            assert bitboard.has_won(bits) == _has_line(board, player)
+            assert minimax.check_win(board, player) == _has_line(board, player)
+        x, o = bitboard.from_board(board, 'X'), bitboard.from_board(board, 'O')
+        assert bitboard.to_board(x, o) == board
+        assert list(bitboard.empty_cells(x | o)) == [i for i, cell in enumerate(board) if cell == '']
+
+def test_bitboard_won_by_move_only_checks_touched_lines():
+    """Test the last-move win check."""
+    x = bitboard.from_board(['X'] * 4 + [''] * 21, 'X')
+    assert not bitboard.won_by_move(x, 3)
+    assert bitboard.won_by_move(x | 1 << 4, 4)
+    assert not bitboard.won_by_move(x | 1 << 24, 24)
+
+def test_minimax_wins_and_blocks():
+    """Test minimax completes its own line and blocks the player's."""
+    board = [''] * 25
+    for cell in (0, 1, 2, 3):
+        board[cell + 5] = 'O'
+    for cell in (0, 1, 2, 20):
+        board[cell] = 'X'
+    assert minimax.find_best_move(board, depth=2) == 9
+
+    board = [''] * 25
+    for cell in (0, 6, 12, 18):
+        board[cell] = 'X'
+    for cell in (1, 2, 3):
+        board[cell] = 'O'
+    assert minimax.find_best_move(board, depth=2) == 24
+
+def test_alphabeta_wins_and_blocks():
+    """Test alpha-beta takes an immediate win and blocks a four."""
+    board = [''] * 25
+    for cell in (5, 6, 7, 8):
+        board[cell] = 'O'
+    for cell in (0, 1, 2, 20):
+        board[cell] = 'X'
+    stats = {}
+    assert alphabeta.find_best_move(board, stats=stats) == 9
+    assert stats['score'] > alphabeta.WIN_THRESHOLD
+
+    board = [''] * 25
+    for cell in (0, 6, 12, 18):
+        board[cell] = 'X'
+    for cell in (1, 2, 3):
+        board[cell] = 'O'
+    assert alphabeta.find_best_move(board, time_limit=0.5) == 24
+
+def test_alphabeta_agrees_with_minimax():
+    """Test alpha-beta finds the same game value as plain minimax at fixed depth."""
+    rng = random.Random(1)
+    for _ in range(40):
+        board = _random_board(rng, rng.randint(8, 14))
+        if minimax.check_win(board, 'X') or minimax.check_win(board, 'O'):
+            continue
+        o, x = bitboard.from_board(board, 'O'), bitboard.from_board(board, 'X')
+        _, score = alphabeta.AlphaBetaSearch(heuristic=False).run(o, x, 0, time_limit=60, max_depth=3)
+        best = max(minimax.WIN_SCORE if bitboard.won_by_move(o | 1 << cell, cell)
+                   else minimax.search(o | 1 << cell, x, 2, False) for cell in bitboard.empty_cells(o | x))
+        assert (score > 0) == (best > 0) and (score < 0) == (best < 0)
+
+def test_alphabeta_iterative_deepening_respects_time_limit():
+    """Test the search deepens past minimax's depth and stops on time."""
+    board = [''] * 25
+    board[0], board[12] = 'X', 'O'
+    stats = {}
+    start = time.perf_counter()
+    move = alphabeta.find_best_move(board, time_limit=0.3, stats=stats)
+    assert time.perf_counter() - start < 1.0
+    assert board[move] == ''
+    assert stats['depth'] >= 4
+    assert stats['pv'][0] == move
+
+def test_transposition_table_replacement():
+    """Test depth-preferred replacement with aging in a tiny table."""
+    table = alphabeta.TranspositionTable(size=1)
+    table.store(1, 5, alphabeta.EXACT, 10, 3)
+    table.store(2, 2, alphabeta.EXACT, 0, 4)
+    assert table.probe(1) == (5, alphabeta.EXACT, 10, 3)
+    assert table.probe(2) is None
+    table.new_search()
+    table.store(2, 2, alphabeta.LOWER, 7, 4)
+    assert table.probe(2) == (2, alphabeta.LOWER, 7, 4)
+
+def test_canonical_position_is_shared_by_symmetric_boards():
+    """Test all eight orientations of a position have one canonical form."""
+    rng = random.Random(2)
+    board = _random_board(rng, 7)
+    x, o = bitboard.from_board(board, 'X'), bitboard.from_board(board, 'O')
+    forms = {bitboard.canonical(bitboard.transform(x, s), bitboard.transform(o, s))[:2] for s in bitboard.SYMMETRIES}
+    assert len(forms) == 1
+    for symmetry, inverse in zip(bitboard.SYMMETRIES, bitboard.INVERSE_SYMMETRIES):
+        assert all(inverse[symmetry[cell]] == cell for cell in range(25))
+        assert {bitboard.transform(line, symmetry) for line in bitboard.LINES} == set(bitboard.LINES)
+
+def test_tic_tac_toe_api_ai_move(app, client):
+    """Test the AI move endpoint blocks a four and caches symmetric positions."""
+    board = [''] * 25
+    for cell in (0, 1, 2, 3):
+        board[cell] = 'X'
+    for cell in (6, 7, 12):
+        board[cell] = 'O'
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': board})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['move'] == 4
+    assert data['cached'] is False
+
+    # The mirror image is answered from the cache, mapped onto the new orientation
+    mirrored = [board[row * 5 + 4 - col] for row in range(5) for col in range(5)]
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': mirrored})
+    data = response.get_json()
+    assert data['cached'] is True
+    assert data['move'] == 0
+    assert len(app.extensions['tic_tac_toe_cache']) == 1
+
+    # MCTS moves are never cached, and each game keeps its own tree
+    app.config['TIC_TAC_TOE_TIME_LIMIT'] = 0.05
+    for game_id in (1, 2):
+        response = client.post('/api/tic-tac-toe/ai-move', json={'board': board, 'algorithm': 'mcts', 'game_id': game_id})
+        assert response.status_code == 200
+        assert response.get_json()['cached'] is False
+    assert len(app.extensions['tic_tac_toe_cache']) == 1
+    assert len(app.extensions['tic_tac_toe_mcts']) == 2
+
+def test_tic_tac_toe_api_ai_move_validation(client):
+    """Test bad boards and finished games are rejected."""
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': [''] * 9})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': [''] * 25, 'algorithm': 'random'})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': ['X'] * 5 + [''] * 20})
+    assert response.status_code == 400
+
+def test_mapped_table_binary_search(tmp_path):
+    """Test the sorted binary table finds present keys and rejects absent ones."""
+    path = str(tmp_path / 'table.bin')
+    records = [(key * 7, key - 50, key % 25, 3) for key in range(100, 0, -1)]
+    write_table(path, records)
+    table = MappedTable(path)
+    assert len(table) == 100
+    for key, score, move, depth in records:
+        assert table.get(key) == (score, move, depth)
+    assert table.get(8) is None
+    assert table.get(7 * 101) is None
+    table.close()
+
+    # Byte-string keys of different lengths are padded to the file's key width
+    write_table(path, [(b'\x02ab', 5, 1, 2), (b'\x01a', -5, 0, 1)], key_size=4)
+    table = MappedTable(path)
+    assert table.key_size == 4
+    assert table.get(b'\x01a') == (-5, 0, 1)
+    assert table.get(b'\x02ab') == (5, 1, 2)
+    assert table.get(b'\x02a') is None
+    assert table.record(1)[0] == b'\x02ab\x00'
+    table.close()
+    with pytest.raises(ValueError):
+        write_table(path, [(b'too long', 0, 0, 0)], key_size=4)
+
+    (tmp_path / 'bad.bin').write_bytes(b'nope')
+    with pytest.raises(ValueError):
+        MappedTable(str(tmp_path / 'bad.bin'))
+
+def test_opening_book_answers_every_orientation(tmp_path):
+    """Test book moves are found for all symmetric openings and mapped back."""
+    assert len(book_positions(1)) == 6
+    path = str(tmp_path / 'book.bin')
+    assert generate_book(path, plies=1, time_limit=5, max_depth=2) == 6
+    book = OpeningBook(path)
+    for cell in range(25):
+        board = [''] * 25
+        board[cell] = 'X'
+        result = computer_move(board, book=book)
+        assert result['source'] == 'book'
+        assert board[result['move']] == ''
+    board = [''] * 25
+    board[0], board[12] = 'X', 'O'
+    assert computer_move(board, book=book)['source'] == 'search'
+    book.close()
+
+def test_tablebase_matches_exhaustive_search(tmp_path):
+    """Test tablebase scores and moves against full-depth alpha-beta on endgames."""
+    path = str(tmp_path / 'tablebase.bin')
+    assert generate_tablebase(path, max_empties=3, samples=2000) > 0
+    tablebase = Tablebase(path)
+    assert tablebase.max_empties == 3
+    rng = random.Random(3)
+    checked = 0
+    while checked < 60:
+        stones = rng.randint(22, 24)
+        board = _random_board(rng, stones)
+        if _has_line(board, 'X') or _has_line(board, 'O'):
+            continue
+        side, other = ('X', 'O') if stones % 2 == 0 else ('O', 'X')
+        me, opp = bitboard.from_board(board, side), bitboard.from_board(board, other)
+        move, score = alphabeta.AlphaBetaSearch().run(me, opp, 0, time_limit=60)
+        solved = tablebase.probe(me, opp)
+        assert solved is not None and solved[0] == score
+        assert board[solved[1]] == ''
+        # The stored move keeps the exact score
+        stone = 1 << solved[1]
+        if not bitboard.won_by_move(me | stone, solved[1]) and (me | opp | stone) != bitboard.FULL:
+            reply = alphabeta.AlphaBetaSearch().run(opp, me | stone, 1, time_limit=60)[1]
+            assert alphabeta._from_table(-reply, 1) == score
+        assert alphabeta.AlphaBetaSearch(tablebase=tablebase).run(me, opp, 0)[1] == score
+        checked += 1
+
+    # Positions with more empty squares fall through to the search
+    assert tablebase.probe(0, 0) is None
+    board = [''] * 25
+    board[0], board[12] = 'X', 'O'
+    assert computer_move(board, tablebase=tablebase)['move'] is not None
+    tablebase.close()
+
+def test_parallel_search_matches_sequential():
+    """Test the root-split search returns the sequential move and score at fixed depth."""
+    rng = random.Random(4)
+    with ParallelSearch(workers=2) as search:
+        checked = 0
+        while checked < 12:
+            board = _random_board(rng, rng.randint(2, 12))
+            if _has_line(board, 'X') or _has_line(board, 'O'):
+                continue
+            o, x = bitboard.from_board(board, 'O'), bitboard.from_board(board, 'X')
+            expected = alphabeta.AlphaBetaSearch().run(o, x, 0, time_limit=60, max_depth=3)
+            assert search.run(o, x, 0, time_limit=60, max_depth=3) == expected
+            assert search.stats['depth'] == 3 and search.stats['pv'][0] == expected[0]
+            checked += 1
+
+        # Every root move of an iteration shares one deadline
+        board = [''] * 25
+        board[0], board[6], board[12] = 'X', 'O', 'X'
+        o, x = bitboard.from_board(board, 'O'), bitboard.from_board(board, 'X')
+        start = time.perf_counter()
+        search.run(o, x, 0, time_limit=0.3)
+        assert time.perf_counter() - start < 0.5
+
+        # Forced wins are taken without starting a search
+        board = [''] * 25
+        for cell in (5, 6, 7, 8):
+            board[cell] = 'O'
+        for cell in (0, 1, 2, 20):
+            board[cell] = 'X'
+        assert computer_move(board, parallel=search)['move'] == 9
+
+def test_mcts_wins_blocks_and_respects_budget():
+    """Test MCTS takes a win, blocks a four and stops at its playout budget."""
+    board = [''] * 25
+    for cell in (5, 6, 7, 8):
+        board[cell] = 'O'
+    for cell in (0, 1, 2, 20):
+        board[cell] = 'X'
+    stats = {}
+    assert mcts.find_best_move(board, time_limit=None, playouts=500, search=mcts.MonteCarloSearch(seed=0),
+                               stats=stats) == 9
+    assert stats['playouts'] == 500 and stats['visits'] == 500
+
+    board = [''] * 25
+    for cell in (0, 6, 12, 18):
+        board[cell] = 'X'
+    for cell in (1, 2, 3):
+        board[cell] = 'O'
+    assert mcts.find_best_move(board, time_limit=None, playouts=2000, search=mcts.MonteCarloSearch(seed=0)) == 24
+
+    start = time.perf_counter()
+    mcts.find_best_move([''] * 25, time_limit=0.2, stats=stats)
+    assert time.perf_counter() - start < 0.4
+    assert stats['playouts'] > 0
+
+def test_mcts_reuses_tree_between_moves():
+    """Test the subtree under the computer's move and the reply is kept."""
+    search = mcts.MonteCarloSearch(seed=1)
+    board = [''] * 25
+    board[12] = 'X'
+    move = computer_move(board, 'mcts', time_limit=0.2, monte_carlo=search)['move']
+    board[move] = 'O'
+    board[next(cell for cell in range(25) if board[cell] == '')] = 'X'
+    stats = {}
+    mcts.find_best_move(board, time_limit=None, playouts=200, search=search, stats=stats)
+    assert stats['reused'] > 0
+    assert stats['visits'] == stats['reused'] + 200
+
+def test_line_threats_update_incrementally():
+    """Test make/unmake keeps the open-line scores equal to a fresh count."""
+    rng = random.Random(5)
+    for _ in range(100):
+        threats, stones = LineThreats(0, 0), [0, 0]
+        made = []
+        for cell in rng.sample(range(25), rng.randint(1, 20)):
+            if bitboard.won_by_move(stones[threats.turn] | 1 << cell, cell):
+                break
+            stones[threats.turn] |= 1 << cell
+            threats.make(cell)
+            made.append(cell)
+            fresh = LineThreats(stones[threats.turn], stones[1 - threats.turn])
+            assert threats.scores[threats.turn] == fresh.scores[0]
+            assert threats.scores[1 - threats.turn] == fresh.scores[1]
+            assert abs(threats.evaluate()) <= MAX_SCORE
+        for cell in reversed(made):
+            threats.unmake(cell)
+        assert threats.scores == [0, 0] and threats.turn == 0
+
+def test_heuristic_guides_shallow_search():
+    """Test depth-limited searches prefer open lines over an arbitrary first cell."""
+    board = [''] * 25
+    assert minimax.find_best_move(board, depth=1, heuristic=False) == 0
+    assert minimax.find_best_move(board, depth=1) == 12
+
+    # 'X' holds three of the bottom row; a blind depth-2 search ignores it
+    board[21], board[22], board[23] = 'X', 'X', 'X'
+    board[12] = 'O'
+    move = alphabeta.find_best_move(board, max_depth=2, time_limit=60)
+    assert move in (20, 24)
+
+def test_mnk_window_counts_update_incrementally():
+    """Test make/unmake keeps window counts, keys and wins in step with the board."""
+    rng = random.Random(6)
+    state = mnk.MNKState(mnk.get_board(7, 6, 4))
+    made = []
+    for cell in rng.sample(range(42), 30):
+        won = state.make(cell)
+        made.append(cell)
+        fresh = mnk.MNKState(state.board, state.bits[0], state.bits[1], state.turn)
+        assert (state.counts, state.scores, state.key) == (fresh.counts, fresh.scores, fresh.key)
+        assert won == (state.winner() is not None)
+        if won:
+            break
+    for cell in reversed(made):
+        state.unmake(cell)
+    assert state.bits == [0, 0] and state.key == 0 and state.scores == [0, 0]
+
+def test_mnk_search_on_other_variants():
+    """Test the general engine solves 3x3, blocks on 7x7 and only looks near stones on 15x15."""
+    state = mnk.MNKState(mnk.get_board(3, 3, 3))
+    search = mnk.MNKSearch()
+    move, score = search.run(state, time_limit=60)
+    assert score == 0 and move == 4
+    assert mnk.check_win(['X'] * 3 + [''] * 6, 'X', 3, 3, 3)
+
+    board = [''] * 49
+    for cell in (22, 23, 24):
+        board[cell] = 'X'
+    board[0] = board[48] = 'O'
+    assert mnk.find_best_move(board, 7, 7, 4, time_limit=0.5) in (21, 25)
+
+    board = [''] * 225
+    board[112] = 'X'
+    state = mnk.from_board(board, 15, 15, 5)
+    assert len(state.candidates()) == 24
+    stats = {}
+    start = time.perf_counter()
+    table = alphabeta.TranspositionTable(mnk.TABLE_SIZE)
+    move = mnk.find_best_move(board, 15, 15, 5, time_limit=0.3, table=table, stats=stats)
+    assert time.perf_counter() - start < 0.4
+    assert board[move] == '' and abs(move // 15 - 7) <= 2 and abs(move % 15 - 7) <= 2
+    assert stats['depth'] >= 1
+    assert any(slot is not None for slot in table.slots)
+    # Boards are shared between moves, but only for recently played variants
+    assert mnk.get_board(15, 15, 5) is state.board
+    for variant in range(mnk.MAX_CACHED_BOARDS):
+        mnk.get_board(3 + variant % 16, 3 + variant // 16, 3)
+    assert mnk.get_board(15, 15, 5) is not state.board
+
+def test_tic_tac_toe_api_ai_move_variant(client):
+    """Test the AI move endpoint plays other board sizes and validates them."""
+    board = [''] * 49
+    for cell in (0, 1, 2):
+        board[cell] = 'X'
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': board, 'width': 7, 'height': 7, 'k': 4})
+    assert response.status_code == 200
+    assert response.get_json()['move'] == 3
+
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': board, 'width': 7, 'height': 7, 'k': 9})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/ai-move', json={'board': board, 'width': 7, 'height': 6, 'k': 4})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/ai-move',
+                           json={'board': board, 'width': 7, 'height': 7, 'k': 4, 'algorithm': 'mcts'})
+    assert response.status_code == 400
+
+def test_arena_report():
+    """Test the arena plays each seeded opening from both sides and reports JSON-ready stats."""
+    assert openings(4, seed=1) == openings(4, seed=1)
+    assert len({tuple(board) for board in openings(4, seed=1)}) == 4
+    assert percentile([3, 1, 2, 4], 50) == 2 and percentile([3, 1, 2, 4], 99) == 4
+
+    report = run_arena(('alphabeta', 'mcts'), games=1, time_limit=0.02, workers=1, seed=1)
+    assert report['games'] == 2
+    json.dumps(report)
+    for engine in ('alphabeta', 'mcts'):
+        results = report['results'][engine]
+        assert results['wins'] + results['draws'] + results['losses'] == 2
+        assert results['nodes_per_second'] > 0
+        assert results['latency']['p50'] <= results['latency']['p95'] <= results['latency']['p99']
+    assert report['results']['alphabeta']['wins'] == report['results']['mcts']['losses']
+
+    stats = {}
+    minimax.find_best_move(openings(1)[0], depth=1, stats=stats)
+    assert stats['nodes'] > 0
+
+    # Minimax deepens only as far as the shared time budget allows
+    report = run_arena(('minimax', 'alphabeta'), games=1, time_limit=0.05, workers=1, seed=1)
+    assert report['results']['minimax']['latency']['p50'] < 0.1
+
+def test_tic_tac_toe_api_batch_moves(app, client):
+    """Test a game's moves are validated together and stored in one commit."""
+    from sqlalchemy import event
+    from backend.extensions import db
+    game_id = client.post('/api/tic-tac-toe/games', json={'player_name': 'Batch Player'}).get_json()['game_id']
+    moves = [{'algorithm_used': 'alphabeta', 'time_taken': 0.1 * i,
+              'move_details': {'row': i // 5, 'col': i % 5, 'player': 'XO'[i % 2]}} for i in range(10)]
+
+    commits = []
+    def count_commit(session):
+        commits.append(session)
+    event.listen(db.session, 'after_commit', count_commit)
+    try:
+        response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': game_id, 'moves': moves})
+    finally:
+        event.remove(db.session, 'after_commit', count_commit)
+    assert response.status_code == 201
+    assert response.get_json()['count'] == 10
+    assert len(commits) == 1
+    stored = TicTacToeMove.query.filter_by(game_id=game_id).order_by(TicTacToeMove.id).all()
+    assert [move.move_details for move in stored] == [move['move_details'] for move in moves]
+
+    # One bad move rejects the whole batch
+    later = [{'algorithm_used': 'alphabeta', 'time_taken': 0.1,
+              'move_details': {'row': 3, 'col': col, 'player': 'XO'[col % 2]}} for col in range(3)]
+    for bad in (later[:2] + [later[0]],
+                later[:2] + [dict(later[2], move_details={'row': 3, 'col': 2, 'player': 'O'})],
+                later[:2] + [dict(later[2], algorithm_used='x' * 60)]):
+        response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': game_id, 'moves': bad})
+        assert response.status_code == 400
+        assert 'Move 2' in response.get_json()['error']
+
+    # A retried batch repeats stored positions, and the next player must follow the last stored move
+    response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': game_id, 'moves': moves})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': game_id, 'moves': later[1:]})
+    assert response.status_code == 400
+    assert 'out of turn' in response.get_json()['error']
+    response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': game_id, 'moves': []})
+    assert response.status_code == 400
+    response = client.post('/api/tic-tac-toe/moves/batch', json={'game_id': 10 ** 6, 'moves': moves})
+    assert response.status_code == 404
+    assert TicTacToeMove.query.filter_by(game_id=game_id).count() == 10
@@ -1,5 +1,23 @@
+import itertools
+import json
+import math
+import random
+import numpy as np
 import pytest
-from backend.models.tsp import TSPGame, TSPAlgorithmTime
+from backend.extensions import db
+from backend.models.tsp import TSPGame, TSPAlgorithmTime, TSPSolution, TSPSolverRun
+from backend.algorithms.tsp.anytime import anytime_tsp
+from backend.algorithms.tsp.branch_and_bound import branch_and_bound_tsp
+from backend.algorithms.tsp.bruteforce import brute_force_tsp
+from backend.algorithms.tsp.distance_matrix import DistanceMatrix
+from backend.algorithms.tsp import dynamic, held_karp_disk
+from backend.algorithms.tsp.dynamic import dynamic_programming_tsp
+from backend.algorithms.tsp.euclidean import CONSTRUCTIONS, EuclideanInstance, euclidean_tsp
+from backend.algorithms.tsp.genetic import HIGH_DIVERSITY, PopulationEngine, adapt_parameters, genetic_algorithm_tsp
+from backend.algorithms.tsp.incremental import incremental_held_karp, insertion_resolve_tsp
+from backend.algorithms.tsp.island import island_genetic_tsp
+from backend.algorithms.tsp.local_search import local_search_tsp, two_opt
+from backend.algorithms.tsp.portfolio import MIN_SAMPLES, RuntimePredictor, select_algorithm
 from datetime import datetime
 
 def test_tsp_game_creation():
@@ -136,4 +154,511 @@ def test_tsp_api_save_algorithm_time(client):
     assert response.status_code == 201
     data = response.get_json()
     assert data['algorithm_used'] == 'bruteforce'
-    assert data['time_taken'] == 1.5 
\ No newline at end of file
+    assert data['time_taken'] == 1.5 
+
+def _random_instance(count, seed=0):
+    """Build a symmetric "A-B" distance dictionary over `count` cities."""
+    rng = random.Random(seed)
+    cities = [f"C{i}" for i in range(count)]
+    distances = {}
+    for a, b in itertools.combinations(cities, 2):
+        distances[f"{a}-{b}"] = distances[f"{b}-{a}"] = rng.randint(50, 100)
+    return cities, distances
+
+def test_dynamic_programming_matches_brute_force():
+    """Test Held-Karp finds the same optimum as exhaustive search."""
+    for seed in range(3):
+        cities, distances = _random_instance(8, seed)
+        route, distance = dynamic_programming_tsp(cities, distances)
+        assert route[0] == route[-1] == cities[0]
+        assert sorted(route[1:-1]) == sorted(cities[1:])
+        assert distance == brute_force_tsp(cities, distances)[1]
+
+def test_dynamic_programming_small_inputs():
+    """Test Held-Karp on trivial instances."""
+    assert dynamic_programming_tsp(['A'], {}) == (['A'], 0)
+    assert dynamic_programming_tsp(['A', 'B'], {'A-B': 5, 'B-A': 5}) == (['A', 'B', 'A'], 10)
+
+def test_distance_matrix_from_dict():
+    """Test compiling the client's distance dictionary into a matrix."""
+    matrix = DistanceMatrix.from_dict({'A-B': 5, 'B-A': 5, 'A-C': 7, 'B-C': 9})
+    assert matrix.cities == ['A', 'B', 'C']
+    assert matrix.rows == [[0, 5, 7], [5, 0, 9], [7, 9, 0]]
+    assert matrix[matrix.index('C'), matrix.index('A')] == 7
+    assert matrix.route_length([0, 1, 2, 0]) == 21
+    assert matrix.subset(['C', 'A']).rows == [[0, 7], [7, 0]]
+
+def test_distance_matrix_rejects_bad_input():
+    """Test that incomplete or asymmetric distances are rejected."""
+    with pytest.raises(ValueError):
+        DistanceMatrix.from_dict({'A-B': 5, 'B-A': 6})
+    with pytest.raises(ValueError):
+        DistanceMatrix.from_dict({'A-B': 5}, cities=['A', 'B', 'C'])
+
+def test_distance_matrix_canonical_ignores_labels():
+    """Test relabeled copies of an instance with tied cities share a canonical key."""
+    # Only two distinct distances, so many cities have the same profile
+    rng = random.Random(0)
+    n = 10
+    rows = [[0] * n for _ in range(n)]
+    for i, j in itertools.combinations(range(n), 2):
+        rows[i][j] = rows[j][i] = rng.choice([1, 2])
+    key = DistanceMatrix(list(range(n)), rows).canonical()[0]
+    for _ in range(20):
+        perm = [0] + rng.sample(range(1, n), n - 1)
+        relabeled = [[rows[perm[i]][perm[j]] for j in range(n)] for i in range(n)]
+        assert DistanceMatrix(list(range(n)), relabeled).canonical()[0] == key
+
+def test_solvers_accept_distance_matrix():
+    """Test every solver takes a DistanceMatrix as well as the dictionary form."""
+    cities, distances = _random_instance(6)
+    matrix = DistanceMatrix.from_dict(distances)
+    optimum = brute_force_tsp(cities, distances)[1]
+    for solver in (brute_force_tsp, dynamic_programming_tsp):
+        assert solver(cities, matrix)[1] == optimum
+    route, distance = genetic_algorithm_tsp(cities, matrix)
+    assert route[0] == route[-1] == cities[0]
+    assert distance >= optimum
+
+def test_genetic_algorithm_returns_valid_route():
+    """Test the vectorized GA returns a closed permutation and is reproducible by seed."""
+    cities, distances = _random_instance(10, seed=4)
+    route, distance = genetic_algorithm_tsp(cities, distances, population_size=200,
+                                            generations=50, mutation_rate=0.1, seed=7)
+    assert route[0] == route[-1] == cities[0]
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert distance == DistanceMatrix.from_dict(distances, cities).route_length(
+        [cities.index(city) for city in route])
+    assert genetic_algorithm_tsp(cities, distances, population_size=200,
+                                 generations=50, mutation_rate=0.1, seed=7) == (route, distance)
+
+def test_branch_and_bound_matches_held_karp():
+    """Test branch and bound is exact and reports its search effort."""
+    for seed in range(3):
+        cities, distances = _random_instance(11, seed)
+        stats = {}
+        route, distance = branch_and_bound_tsp(cities, distances, stats=stats)
+        assert route[0] == route[-1] == cities[0]
+        assert sorted(route[1:-1]) == sorted(cities[1:])
+        assert distance == dynamic_programming_tsp(cities, distances)[1]
+        assert stats['nodes_expanded'] > 0
+        assert stats['nodes_pruned'] > 0
+
+def test_brute_force_parallel_matches_sequential():
+    """Test the process pool fan-out finds the same optimum as the in-process search."""
+    cities, distances = _random_instance(10, seed=5)
+    route, distance = brute_force_tsp(cities, distances, workers=2)
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert distance == brute_force_tsp(cities, distances, workers=1)[1]
+    assert distance == dynamic_programming_tsp(cities, distances)[1]
+
+def test_tsp_api_solve(client):
+    """Test solving an instance on the server and answering repeats from the cache."""
+    cities, distances = _random_instance(7, seed=2)
+    payload = {
+        'home_city': cities[0],
+        'selected_cities': cities[1:],
+        'distances': distances,
+        'algorithm': 'dynamic'
+    }
+    response = client.post('/api/tsp/solve', json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['route'][0] == data['route'][-1] == cities[0]
+    assert data['distance'] == brute_force_tsp(cities, distances)[1]
+    assert data['cached'] is False
+
+    response = client.post('/api/tsp/solve', json=payload)
+    assert response.get_json()['cached'] is True
+    assert response.get_json()['route'] == data['route']
+
+def test_tsp_api_solve_relabeled_instance_hits_cache(client):
+    """Test the cache key is invariant under renaming the cities."""
+    cities, distances = _random_instance(6, seed=3)
+    client.post('/api/tsp/solve', json={
+        'home_city': cities[0], 'selected_cities': cities[1:],
+        'distances': distances, 'algorithm': 'bruteforce'
+    })
+
+    rename = {city: f"R{len(cities) - i}" for i, city in enumerate(cities)}
+    renamed = {}
+    for key, value in distances.items():
+        a, b = key.split('-')
+        renamed[f"{rename[a]}-{rename[b]}"] = value
+    response = client.post('/api/tsp/solve', json={
+        'home_city': rename[cities[0]], 'selected_cities': [rename[c] for c in reversed(cities[1:])],
+        'distances': renamed, 'algorithm': 'bruteforce'
+    })
+    data = response.get_json()
+    assert data['cached'] is True
+    assert data['route'][0] == data['route'][-1] == rename[cities[0]]
+    assert sorted(data['route'][1:-1]) == sorted(rename[c] for c in cities[1:])
+    assert data['distance'] == brute_force_tsp(cities, distances)[1]
+    matrix = DistanceMatrix.from_dict(renamed)
+    assert matrix.route_length([matrix.index(c) for c in data['route']]) == data['distance']
+
+def test_tsp_api_solve_persistent_cache(app, client):
+    """Test results survive in the persistent tier when the memory tier is cold."""
+    app.config['TSP_PERSISTENT_CACHE'] = True
+    cities, distances = _random_instance(5, seed=1)
+    payload = {'home_city': cities[0], 'selected_cities': cities[1:],
+               'distances': distances, 'algorithm': 'genetic'}
+    first = client.post('/api/tsp/solve', json=payload).get_json()
+    assert TSPSolution.query.count() == 1
+
+    app.extensions['tsp_cache'].clear()
+    second = client.post('/api/tsp/solve', json=payload).get_json()
+    assert second['cached'] is True
+    assert second['distance'] == first['distance']
+
+def test_tsp_api_solve_validation(client):
+    """Test bad solve requests are rejected."""
+    response = client.post('/api/tsp/solve', json={
+        'home_city': 'A', 'selected_cities': ['B', 'C'],
+        'distances': {'A-B': 1, 'B-A': 1}, 'algorithm': 'dynamic'
+    })
+    assert response.status_code == 400
+    response = client.post('/api/tsp/solve', json={
+        'home_city': 'A', 'selected_cities': ['B'],
+        'distances': {'A-B': 1}, 'algorithm': 'unknown'
+    })
+    assert response.status_code == 400
+
+def test_local_search_improves_route():
+    """Test 2-opt/Or-opt returns a valid route no longer than its starting tour."""
+    cities, distances = _random_instance(40, seed=6)
+    matrix = DistanceMatrix.from_dict(distances, cities)
+    route, distance = local_search_tsp(cities, distances)
+    assert route[0] == route[-1] == cities[0]
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert distance == matrix.route_length([matrix.index(city) for city in route])
+    assert distance <= matrix.route_length(list(range(40)) + [0])
+
+def test_two_opt_uncrosses_tour():
+    """Test a single crossing on a square is removed."""
+    rows = [[0, 1, 1.5, 1], [1, 0, 1, 1.5], [1.5, 1, 0, 1], [1, 1.5, 1, 0]]
+    tour = [0, 2, 1, 3]
+    assert two_opt(tour, rows, [[1, 3, 2], [0, 2, 3], [1, 3, 0], [0, 2, 1]]) is True
+    assert sorted(tour) == [0, 1, 2, 3]
+    assert sum(rows[tour[i - 1]][tour[i]] for i in range(4)) == 4
+
+def test_genetic_algorithm_with_local_search():
+    """Test the memetic GA returns a valid route."""
+    cities, distances = _random_instance(9, seed=8)
+    route, distance = genetic_algorithm_tsp(cities, distances, population_size=20,
+                                            generations=10, seed=1, local_search=True)
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert distance >= dynamic_programming_tsp(cities, distances)[1]
+
+def test_island_genetic_is_reproducible_across_workers():
+    """Test island seeds make the result independent of the process layout."""
+    cities, distances = _random_instance(12, seed=9)
+    kwargs = dict(islands=3, population_size=60, generations=20, migration_interval=5,
+                  mutation_rate=0.1, seed=11)
+    route, distance = island_genetic_tsp(cities, distances, workers=1, **kwargs)
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert island_genetic_tsp(cities, distances, workers=2, **kwargs) == (route, distance)
+    assert island_genetic_tsp(cities, distances, workers=1, topology='complete', **kwargs)[1] >= \
+        dynamic_programming_tsp(cities, distances)[1]
+
+def test_island_genetic_rejects_bad_parameters():
+    """Test island counts and intervals that cannot run raise ValueError."""
+    cities, distances = _random_instance(6)
+    for options in ({'islands': 0}, {'islands': 2.5}, {'population_size': 0}, {'migration_interval': 0}):
+        with pytest.raises(ValueError):
+            island_genetic_tsp(cities, distances, workers=1, **options)
+
+    # No generations returns the best of the initial populations
+    route, distance = island_genetic_tsp(cities, distances, generations=0, workers=1, seed=1)
+    assert sorted(route[1:-1]) == sorted(cities[1:]) and distance > 0
+
+def test_tsp_api_solve_stream(client):
+    """Test the anytime endpoint streams improving routes as NDJSON until the deadline."""
+    cities, distances = _random_instance(15, seed=12)
+    response = client.post('/api/tsp/solve/stream', json={
+        'home_city': cities[0], 'selected_cities': cities[1:], 'distances': distances,
+        'algorithm': 'local_search', 'time_limit': 0.2
+    })
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    updates, summary = [line for line in lines[:-1] if 'route' in line], lines[-1]
+    assert updates
+    assert all(a['distance'] > b['distance'] for a, b in zip(updates, updates[1:]))
+    assert all(update['route'][0] == cities[0] for update in updates)
+    assert summary['done'] is True
+    assert summary['stop_reason'] == 'deadline'
+
+def test_anytime_tsp_heartbeat():
+    """Test a stalled anytime search still yields heartbeats between improvements."""
+    cities, distances = _random_instance(12, seed=3)
+    results = list(anytime_tsp(cities, distances, 'local_search', time_limit=0.3, seed=1, heartbeat=0.05))
+    heartbeats = [elapsed for route, distance, elapsed in results if route is None]
+    assert heartbeats
+    assert all(distance is None for route, distance, _ in results if route is None)
+    assert all(b - a >= 0.05 for a, b in zip(heartbeats, heartbeats[1:]))
+
+def test_tsp_api_solve_stream_validation(client):
+    """Test exact solvers and unbounded deadlines are rejected for streaming."""
+    cities, distances = _random_instance(5)
+    payload = {'home_city': cities[0], 'selected_cities': cities[1:], 'distances': distances}
+    response = client.post('/api/tsp/solve/stream', json={**payload, 'algorithm': 'dynamic'})
+    assert response.status_code == 400
+    response = client.post('/api/tsp/solve/stream', json={**payload, 'algorithm': 'genetic', 'time_limit': 600})
+    assert response.status_code == 400
+
+def test_incremental_held_karp_matches_full_solve():
+    """Test exact re-solves reuse the previous tables and stay optimal."""
+    cities, distances = _random_instance(10, seed=4)
+    stats = {}
+    _, _, state = incremental_held_karp(cities[:8], distances, stats=stats)
+    assert stats['reused'] is False
+
+    # Remove two cities and add two others
+    changed = cities[:3] + cities[5:]
+    route, distance, state = incremental_held_karp(changed, distances, state, stats=stats)
+    assert stats == {'reused': True, 'cities_added': 2, 'cities_removed': 2}
+    assert sorted(route[1:-1]) == sorted(changed[1:])
+    assert distance == dynamic_programming_tsp(changed, distances)[1]
+
+    # Changed distances between kept cities force a full solve
+    distances = {**distances, 'C1-C2': 1, 'C2-C1': 1}
+    _, distance, _ = incremental_held_karp(changed, distances, state, stats=stats)
+    assert stats['reused'] is False
+    assert distance == dynamic_programming_tsp(changed, distances)[1]
+
+def test_insertion_resolve_from_previous_route():
+    """Test heuristic re-solves drop removed cities and insert new ones."""
+    cities, distances = _random_instance(12, seed=5)
+    previous_route, _ = local_search_tsp(cities[:9], distances)
+    changed = cities[:4] + cities[6:]
+    route, distance = insertion_resolve_tsp(changed, distances, previous_route)
+    assert route[0] == route[-1] == cities[0]
+    assert sorted(route[1:-1]) == sorted(changed[1:])
+    assert distance == DistanceMatrix.from_dict(distances, changed).route_length(
+        [changed.index(city) for city in route])
+
+def test_tsp_api_update_game_resolves_route(app, client):
+    """Test PATCH re-solves the route when distances are sent."""
+    cities = list('ABCDEFG')
+    _, numbered = _random_instance(len(cities), seed=6)
+    distances = {f"{cities[int(a[1:])]}-{cities[int(b[1:])]}": value
+                 for a, b, value in ((*key.split('-'), value) for key, value in numbered.items())}
+    response = client.post('/api/tsp/games', json={
+        'player_name': 'Test Player',
+        'home_city': 'A',
+        'selected_cities': '[]',
+        'shortest_route': '[]',
+        'distance': 0
+    })
+    game_id = response.get_json()['game_id']
+
+    for selected, algorithm in ((cities[1:5], 'dynamic'), (cities[2:], 'dynamic'), (cities[1:4], 'local_search')):
+        response = client.patch(f'/api/tsp/games/{game_id}', json={
+            'selected_cities': json.dumps(selected),
+            'distances': distances,
+            'algorithm': algorithm
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        route = json.loads(data['shortest_route'])
+        assert route[0] == route[-1] == 'A'
+        assert sorted(route[1:-1]) == sorted(selected)
+        optimal = dynamic_programming_tsp(['A'] + selected, distances)[1]
+        assert data['distance'] == optimal if algorithm == 'dynamic' else data['distance'] >= optimal
+    tables = app.extensions['tsp_tables']
+    assert tables.get(game_id) is not None
+    assert tables.weight == tables.get(game_id).nbytes
+
+    response = client.patch(f'/api/tsp/games/{game_id}', json={'distances': distances, 'algorithm': 'genetic'})
+    assert response.status_code == 400
+
+    # Incremental tables are kept in memory, so exact re-solves stop at 20 cities
+    response = client.patch(f'/api/tsp/games/{game_id}', json={
+        'selected_cities': json.dumps([f"C{i}" for i in range(20)]),
+        'distances': distances,
+        'algorithm': 'dynamic'
+    })
+    assert response.status_code == 400
+    assert 'at most 20 cities' in response.get_json()['error']
+
+def test_euclidean_constructions_visit_every_city():
+    """Test each construction heuristic returns a valid, polished tour."""
+    rng = random.Random(7)
+    cities = [f"P{i}" for i in range(300)]
+    points = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in cities]
+    for construction in CONSTRUCTIONS:
+        raw_route, raw_distance = euclidean_tsp(cities, points, construction, local_search=False)
+        route, distance = euclidean_tsp(cities, points, construction)
+        assert route[0] == route[-1] == cities[0]
+        assert sorted(route[1:-1]) == sorted(cities[1:])
+        assert distance <= raw_distance
+
+def test_spatial_grid_nearest_matches_brute_force():
+    """Test grid k-nearest queries against a full scan."""
+    rng = random.Random(8)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 50)) for _ in range(150)]
+    instance = EuclideanInstance([str(i) for i in range(150)], points)
+    for i, near in enumerate(instance.neighbours(6)):
+        expected = sorted((j for j in range(150) if j != i), key=lambda j: math.dist(points[i], points[j]))[:6]
+        assert near == expected
+
+def test_euclidean_matches_exact_on_small_instance():
+    """Test coordinate instances agree with the dense solvers."""
+    rng = random.Random(9)
+    cities = list('ABCDEFG')
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in cities]
+    distances = {f"{a}-{b}": math.dist(p, q) for (a, p), (b, q) in itertools.permutations(zip(cities, points), 2)}
+    _, distance = euclidean_tsp(cities, points)
+    assert distance == pytest.approx(dynamic_programming_tsp(cities, distances)[1])
+
+def test_tsp_api_solve_euclidean(client):
+    """Test solving a coordinate instance through the API."""
+    rng = random.Random(10)
+    cities = [f"P{i}" for i in range(500)]
+    coordinates = {city: [rng.uniform(0, 1000), rng.uniform(0, 1000)] for city in cities}
+    response = client.post('/api/tsp/solve/euclidean', json={
+        'home_city': cities[0],
+        'selected_cities': cities[1:],
+        'coordinates': coordinates,
+        'construction': 'space_filling_curve'
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['route'][0] == data['route'][-1] == cities[0]
+    assert len(data['route']) == len(cities) + 1
+    assert data['construction'] == 'space_filling_curve'
+
+    response = client.post('/api/tsp/solve/euclidean', json={
+        'home_city': 'A', 'selected_cities': ['B'], 'coordinates': {'A': [0, 0]}
+    })
+    assert response.status_code == 400
+
+def test_dynamic_programming_on_disk_matches_memory(tmp_path, monkeypatch):
+    """Test the memory-mapped tables give the same optimum and clean up."""
+    cities, distances = _random_instance(12, seed=11)
+    expected = dynamic_programming_tsp(cities, distances)[1]
+    monkeypatch.setattr(dynamic, 'MAX_TABLE_BYTES', 1024)
+    route, distance = dynamic_programming_tsp(cities, distances, table_dir=str(tmp_path))
+    assert distance == expected
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert list(tmp_path.iterdir()) == []
+
+def test_held_karp_on_disk_resumes_after_interrupt(tmp_path, monkeypatch):
+    """Test an interrupted solve continues from its last checkpoint."""
+    _, distances = _random_instance(11, seed=12)
+    weights = DistanceMatrix.from_dict(distances).array
+    expected = held_karp_disk.held_karp_on_disk(weights, str(tmp_path))
+
+    fill_layer = held_karp_disk.fill_disk_layer
+    def interrupted(weights, layout, subset_size, *args):
+        if subset_size == 6:
+            raise KeyboardInterrupt
+        fill_layer(weights, layout, subset_size, *args)
+    monkeypatch.setattr(held_karp_disk, 'fill_disk_layer', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        held_karp_disk.held_karp_on_disk(weights, str(tmp_path))
+    monkeypatch.setattr(held_karp_disk, 'fill_disk_layer', fill_layer)
+
+    stats = {}
+    assert held_karp_disk.held_karp_on_disk(weights, str(tmp_path), stats=stats) == expected
+    assert stats['resumed_from'] == 5
+
+def test_held_karp_on_disk_concurrent_solves_and_cleanup(tmp_path, monkeypatch):
+    """Test solves of one instance take turns, and a failed solve removes its tables."""
+    from concurrent.futures import ThreadPoolExecutor
+    _, distances = _random_instance(11, seed=13)
+    weights = DistanceMatrix.from_dict(distances).array
+    expected = held_karp_disk.held_karp_on_disk(weights, str(tmp_path))
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: held_karp_disk.held_karp_on_disk(weights, str(tmp_path)), range(4)))
+    assert results == [expected] * 4
+    assert list(tmp_path.iterdir()) == []
+
+    def failing(weights, layout, subset_size, *args):
+        raise OSError("No space left on device")
+    monkeypatch.setattr(held_karp_disk, 'fill_disk_layer', failing)
+    with pytest.raises(OSError):
+        held_karp_disk.held_karp_on_disk(weights, str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+def test_select_algorithm_prefers_exact_within_budget():
+    """Test the portfolio picks exact solvers when they fit and heuristics otherwise."""
+    assert select_algorithm(8, 1)['algorithm'] in ('dynamic', 'bruteforce', 'branch_and_bound')
+    assert select_algorithm(8, 1)['exact'] is True
+    large = select_algorithm(60, 1)
+    assert large['exact'] is False
+    assert large['algorithm'] == 'local_search'
+    assert 'dynamic' not in large['predictions']
+
+def test_runtime_predictor_fits_history():
+    """Test recorded runs replace the built-in constants."""
+    history = [('dynamic', 10, 2.0)] * 3
+    predictor = RuntimePredictor(history)
+    assert predictor.predict('dynamic', 10) == pytest.approx(2.0)
+    assert predictor.predict('genetic', 10) == RuntimePredictor().predict('genetic', 10)
+
+    # Slow recorded dynamic runs push a tight budget onto another solver
+    assert select_algorithm(10, 1, predictor)['algorithm'] != 'dynamic'
+
+def test_tsp_api_solve_auto(app, client):
+    """Test the auto algorithm reports its selection and uses recorded history."""
+    cities, distances = _random_instance(9)
+    payload = {'home_city': cities[0], 'selected_cities': cities[1:], 'distances': distances, 'algorithm': 'auto'}
+    response = client.post('/api/tsp/solve', json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['selection']['exact'] is True
+    assert data['algorithm'] == data['selection']['algorithm']
+    assert data['distance'] == dynamic_programming_tsp(cities, distances)[1]
+
+    # The solve above is recorded; browser-reported times are not
+    assert TSPSolverRun.runtime_history() == [(data['algorithm'], 9, data['time_taken'])]
+    game = TSPGame(player_name="Test Player", home_city=cities[0],
+                   selected_cities=json.dumps(cities[1:]), shortest_route="[]", distance=0)
+    db.session.add(game)
+    db.session.commit()
+    db.session.add(TSPAlgorithmTime(game_id=game.id, algorithm_used='dynamic', time_taken=0.001))
+    for algorithm in ('dynamic', 'branch_and_bound', 'bruteforce'):
+        for _ in range(MIN_SAMPLES):
+            db.session.add(TSPSolverRun(algorithm=algorithm, cities=9, time_taken=30.0))
+    db.session.commit()
+    assert len(TSPSolverRun.runtime_history()) == 3 * MIN_SAMPLES + 1
+
+    response = client.post('/api/tsp/solve', json={**payload, 'time_budget': 1})
+    data = response.get_json()
+    assert data['selection']['exact'] is False
+    assert data['selection']['predictions']['dynamic'] == pytest.approx(30.0)
+
+    response = client.post('/api/tsp/solve', json={**payload, 'time_budget': 0})
+    assert response.status_code == 400
+
+def test_adaptive_genetic_algorithm_stops_when_converged():
+    """Test the adaptive GA stops early and reports why."""
+    cities, distances = _random_instance(8, seed=13)
+    stats = {}
+    genetic_algorithm_tsp(cities, distances, generations=100, seed=1, stats=stats)
+    assert stats == {'generations': 100, 'stop_reason': 'generations'}
+
+    route, distance = genetic_algorithm_tsp(cities, distances, generations=1000, seed=1,
+                                            adaptive=True, patience=30, stats=stats)
+    assert stats['stop_reason'] == 'converged'
+    assert 30 <= stats['generations'] < 1000
+    assert sorted(route[1:-1]) == sorted(cities[1:])
+    assert distance == DistanceMatrix.from_dict(distances, cities).route_length(
+        [cities.index(city) for city in route])
+
+def test_adapt_parameters_follows_diversity():
+    """Test a converged population gets more mutation and less selection pressure."""
+    weights = DistanceMatrix.from_dict(_random_instance(10)[1]).array
+    engine = PopulationEngine(weights, 20, 0.01, np.random.default_rng(0))
+    assert engine.diversity() > HIGH_DIVERSITY
+    adapt_parameters(engine, 0.01)
+    assert engine.pressure > 1 and engine.mutation_rate == 0.01
+
+    engine.population[:] = engine.population[0]
+    engine.lengths = engine.route_lengths(engine.population)
+    assert engine.diversity() == 0
+    pressure = engine.pressure
+    adapt_parameters(engine, 0.01)
+    assert engine.pressure < pressure and engine.mutation_rate > 0.01
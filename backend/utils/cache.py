@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe bounded cache that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int = 256, maxweight: Optional[int] = None,
+                 weigh: Optional[Callable[[Any], int]] = None):
+        """
+        :param maxsize: Most entries kept
+        :param maxweight: Optional bound on the total weight of the entries
+        :param weigh: Function giving an entry's weight (such as its size in bytes)
+        """
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used) or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entries when full or too heavy"""
+        with self._lock:
+            self.weight -= self._weights.pop(key, 0)
+            if self.weigh is not None:
+                self._weights[key] = self.weigh(value)
+                self.weight += self._weights[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while self._entries and (len(self._entries) > self.maxsize or
+                                     self.maxweight is not None and self.weight > self.maxweight):
+                oldest, _ = self._entries.popitem(last=False)
+                self.weight -= self._weights.pop(oldest, 0)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """In-memory LRU cache in front of an optional persistent store"""
+
+    def __init__(self, memory: LRUCache, store: Optional[Any] = None):
+        """
+        :param memory: Fast in-process tier
+        :param store: Optional slower tier with get(key) and put(key, value)
+        """
+        self.memory = memory
+        self.store = store
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.memory.put(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from datetime import datetime
 
 class ValidationError(Exception):
@@ -25,17 +25,70 @@ class GameValidator:
             raise ValidationError("Invalid game ID")
 
     @staticmethod
-    def validate_board_state(board: List[str], size: int = 5) -> None:
-        """Validate board state"""
+    def validate_board_state(board: List[str], size: int = 5, height: Optional[int] = None) -> None:
+        """Validate board state (size columns by height rows, square by default)"""
+        height = height or size
         if not isinstance(board, list):
             raise ValidationError("Board must be a list")
-        if len(board) != size * size:
-            raise ValidationError(f"Board must be {size}x{size}")
+        if len(board) != size * height:
+            raise ValidationError(f"Board must be {size}x{height}")
         if not all(isinstance(cell, str) for cell in board):
             raise ValidationError("All board cells must be strings")
         if not all(cell in ['', 'X', 'O'] for cell in board):
             raise ValidationError("Board cells must be empty, 'X', or 'O'")
 
+    @staticmethod
+    def validate_board_variant(width: Any, height: Any, k: Any, max_size: int) -> None:
+        """Validate the dimensions and win length of an m,n,k board"""
+        for name, value in (('width', width), ('height', height), ('k', k)):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValidationError(f"{name} must be an integer")
+        if not 3 <= width <= max_size or not 3 <= height <= max_size:
+            raise ValidationError(f"width and height must be between 3 and {max_size}")
+        if not 3 <= k <= max(width, height):
+            raise ValidationError("k must be at least 3 and fit on the board")
+
+    @staticmethod
+    def validate_tic_tac_toe_moves(moves: Any, size: int = 5, previous: Sequence[Dict[str, Any]] = (),
+                                   algorithms: Optional[Sequence[str]] = None) -> None:
+        """
+        Validate a batch of logged moves for one game, together and against
+        the moves already stored for it (move_details dicts, in order)
+        """
+        if not isinstance(moves, list) or not moves:
+            raise ValidationError("moves must be a non-empty list")
+        if len(previous) + len(moves) > size * size:
+            raise ValidationError(f"A game has at most {size * size} moves")
+
+        cells = {(details.get('row'), details.get('col')) for details in previous}
+        last_player = previous[-1].get('player') if previous else None
+        for index, move in enumerate(moves):
+            if not isinstance(move, dict):
+                raise ValidationError(f"Move {index} must be an object")
+            details = move.get('move_details')
+            if not isinstance(details, dict) or not all(field in details for field in ('row', 'col', 'player')):
+                raise ValidationError(f"Move {index} must include move_details with row, col, and player")
+            row, col = details['row'], details['col']
+            if not all(isinstance(value, int) and not isinstance(value, bool) and 0 <= value < size
+                       for value in (row, col)):
+                raise ValidationError(f"Move {index} is off the board")
+            if details['player'] not in ('X', 'O'):
+                raise ValidationError(f"Move {index} player must be 'X' or 'O'")
+            if details['player'] == last_player:
+                raise ValidationError(f"Move {index} is out of turn; players must alternate")
+            last_player = details['player']
+            if (row, col) in cells:
+                raise ValidationError(f"Move {index} repeats an occupied position")
+            cells.add((row, col))
+            time_taken = move.get('time_taken', 0)
+            if not isinstance(time_taken, (int, float)) or isinstance(time_taken, bool) or time_taken < 0:
+                raise ValidationError(f"Move {index} time_taken must be a non-negative number")
+            algorithm = move.get('algorithm_used', 'minimax')
+            if not isinstance(algorithm, str):
+                raise ValidationError(f"Move {index} algorithm_used must be a string")
+            if algorithms is not None and algorithm not in algorithms:
+                raise ValidationError(f"Move {index} algorithm_used must be one of: {', '.join(algorithms)}")
+
     @staticmethod
     def validate_move(move: int, board: List[str]) -> None:
         """Validate move position"""
@@ -61,6 +114,66 @@ class GameValidator:
         if not all(isinstance(city, str) for city in data['selected_cities']):
             raise ValidationError("All cities must be strings")
 
+    @staticmethod
+    def validate_tsp_solve_data(data: Dict[str, Any], algorithms: Dict[str, int]) -> None:
+        """Validate a TSP solve request against the per-algorithm city limits"""
+        for field in ['home_city', 'selected_cities', 'distances', 'algorithm']:
+            if field not in data:
+                raise ValidationError(f"{field} is required")
+
+        if not isinstance(data['home_city'], str):
+            raise ValidationError("home_city must be a string")
+        if not isinstance(data['selected_cities'], list):
+            raise ValidationError("selected_cities must be a list")
+        if not all(isinstance(city, str) for city in data['selected_cities']):
+            raise ValidationError("All cities must be strings")
+        if not isinstance(data['distances'], dict):
+            raise ValidationError("distances must be an object")
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+                   for value in data['distances'].values()):
+            raise ValidationError("Distances must be non-negative numbers")
+
+        if data['algorithm'] not in algorithms:
+            raise ValidationError(f"algorithm must be one of: {', '.join(algorithms)}")
+        cities = {data['home_city'], *data['selected_cities']}
+        if len(cities) > algorithms[data['algorithm']]:
+            raise ValidationError(f"{data['algorithm']} supports at most {algorithms[data['algorithm']]} cities")
+
+    @staticmethod
+    def validate_tsp_coordinates_data(data: Dict[str, Any], constructions: List[str], max_cities: int) -> None:
+        """Validate a coordinate-based TSP solve request"""
+        for field in ['home_city', 'selected_cities', 'coordinates']:
+            if field not in data:
+                raise ValidationError(f"{field} is required")
+
+        if not isinstance(data['home_city'], str):
+            raise ValidationError("home_city must be a string")
+        if not isinstance(data['selected_cities'], list):
+            raise ValidationError("selected_cities must be a list")
+        if not all(isinstance(city, str) for city in data['selected_cities']):
+            raise ValidationError("All cities must be strings")
+        if not isinstance(data['coordinates'], dict):
+            raise ValidationError("coordinates must be an object")
+        for point in data['coordinates'].values():
+            if (not isinstance(point, list) or len(point) != 2
+                    or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in point)):
+                raise ValidationError("Coordinates must be [x, y] pairs of numbers")
+
+        if data.get('construction', 'greedy') not in constructions:
+            raise ValidationError(f"construction must be one of: {', '.join(constructions)}")
+        if not isinstance(data.get('local_search', True), bool):
+            raise ValidationError("local_search must be a boolean")
+        if len({data['home_city'], *data['selected_cities']}) > max_cities:
+            raise ValidationError(f"At most {max_cities} cities are supported")
+
+    @staticmethod
+    def validate_time_limit(time_limit: Any, maximum: float, field: str = 'time_limit') -> None:
+        """Validate a solver time limit in seconds"""
+        if not isinstance(time_limit, (int, float)) or isinstance(time_limit, bool):
+            raise ValidationError(f"{field} must be a number")
+        if time_limit <= 0 or time_limit > maximum:
+            raise ValidationError(f"{field} must be between 0 and {maximum} seconds")
+
     @staticmethod
     def validate_hanoi_data(data: Dict[str, Any]) -> None:
         """Validate Tower of Hanoi data"""